@@ -0,0 +1,207 @@
+"""
+Adaptive concurrency control for LLM calls in GenAI Underwriting Workbench (Azure version)
+An AIMD controller bounds how many model calls are in flight: the limit grows by roughly one
+per window of successful calls under the latency target, shrinks gently when latency exceeds
+the target, and is halved on throttling (429) or timeouts. A streamed call is timed to its
+first chunk: generation time grows with the output, not with load on the service.
+"""
+
+import sys
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_ERROR_NAMES = {
+    'RateLimitError', 'APITimeoutError', 'Timeout', 'ReadTimeout', 'ReadTimeoutError', 'TimeoutError'
+}
+THROTTLE_ERROR_CODES = {
+    'ThrottlingException', 'TooManyRequestsException', 'ServiceUnavailableException', 'ModelTimeoutException'
+}
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    """True for 429s and timeouts from the OpenAI SDK, botocore or the standard library"""
+    if getattr(error, 'status_code', None) == 429:
+        return True
+    if type(error).__name__ in THROTTLE_ERROR_NAMES:
+        return True
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code') in THROTTLE_ERROR_CODES
+    return False
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on concurrent calls, shared by every thread that issues them"""
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        latency_target: float = 20.0,
+        backoff_factor: float = 0.5,
+        latency_backoff_factor: float = 0.9
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_factor = backoff_factor
+        self.latency_backoff_factor = latency_backoff_factor
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold one call slot for the duration of the block and learn from its outcome. The block
+        receives a timer; calling its first_byte() makes the latency sample time-to-first-byte.
+        """
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+        timer = _SlotTimer()
+        try:
+            yield timer
+        except BaseException as e:
+            self._release(timer.latency(), throttled=is_throttle_error(e))
+            raise
+        else:
+            self._release(timer.latency(), throttled=False)
+
+    def _release(self, latency: float, throttled: bool):
+        with self._condition:
+            self._in_flight -= 1
+            previous = int(self._limit)
+            now = time.monotonic()
+
+            if throttled or latency > self.latency_target:
+                # One decrease per latency window, so a burst of failures from one window counts once
+                if now - self._last_decrease >= min(self.latency_target, latency):
+                    factor = self.backoff_factor if throttled else self.latency_backoff_factor
+                    self._limit = max(float(self.min_limit), self._limit * factor)
+                    self._last_decrease = now
+            else:
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+
+            if int(self._limit) != previous:
+                logger.info(f"Concurrency limit {previous} -> {int(self._limit)} "
+                            f"(latency {latency:.1f}s, throttled={throttled})")
+            self._condition.notify_all()
+
+
+class _SlotTimer:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.first_byte_at = None
+
+    def first_byte(self):
+        if self.first_byte_at is None:
+            self.first_byte_at = time.monotonic()
+
+    def latency(self) -> float:
+        return (self.first_byte_at or time.monotonic()) - self.started
+
+
+class _LimitedCompletions:
+    def __init__(self, completions, limiter: AdaptiveConcurrencyLimiter):
+        self._completions = completions
+        self._limiter = limiter
+
+    def create(self, **kwargs):
+        if kwargs.get('stream'):
+            return self._stream(kwargs)
+        with self._limiter.slot():
+            return self._completions.create(**kwargs)
+
+    def _stream(self, kwargs):
+        # A streamed call holds its slot until the last chunk has been read
+        with self._limiter.slot() as timer:
+            for chunk in self._completions.create(**kwargs):
+                timer.first_byte()
+                yield chunk
+
+    @property
+    def with_raw_response(self):
+        return _LimitedRawCompletions(self._completions.with_raw_response, self._limiter)
+
+
+class _LimitedRawCompletions:
+    """Raw-response form of _LimitedCompletions, for outer wrappers that read rate-limit headers"""
+
+    def __init__(self, raw_completions, limiter: AdaptiveConcurrencyLimiter):
+        self._raw_completions = raw_completions
+        self._limiter = limiter
+
+    def create(self, **kwargs):
+        if kwargs.get('stream'):
+            return _LimitedRawStream(self._raw_completions, self._limiter, kwargs)
+        with self._limiter.slot():
+            return self._raw_completions.create(**kwargs)
+
+
+class _LimitedRawStream:
+    """
+    Raw streamed response whose slot is held from the request until the stream is read to the
+    end, fails, or is closed. Whoever creates it must read parse() or call close().
+    """
+
+    def __init__(self, raw_completions, limiter: AdaptiveConcurrencyLimiter, kwargs):
+        self._slot = limiter.slot()
+        self._timer = self._slot.__enter__()
+        self._released = False
+        try:
+            self._raw = raw_completions.create(**kwargs)
+        except BaseException:
+            self._release(*sys.exc_info())
+            raise
+        self.headers = self._raw.headers
+
+    def parse(self):
+        try:
+            for chunk in self._raw.parse():
+                self._timer.first_byte()
+                yield chunk
+        except BaseException:
+            self._release(*sys.exc_info())
+            raise
+        finally:
+            self.close()
+
+    def close(self):
+        """Release the slot; safe to call more than once"""
+        self._release(None, None, None)
+
+    def _release(self, *exc_info):
+        if not self._released:
+            self._released = True
+            self._slot.__exit__(*exc_info)
+
+
+class ConcurrencyLimitedOpenAI:
+    """Wraps an OpenAI client so chat.completions.create runs under the adaptive limit"""
+
+    def __init__(self, client, limiter: AdaptiveConcurrencyLimiter):
+        self._client = client
+        self.concurrency_limiter = limiter
+        self.chat = SimpleNamespace(completions=_LimitedCompletions(client.chat.completions, limiter))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
@@ -7,7 +7,6 @@ Handles document uploads, job status queries, and provides CORS support for fron
 import os
 import uuid
 import logging
-import time
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 
@@ -21,6 +20,11 @@ from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPerm
 from azure.servicebus import ServiceBusClient, ServiceBusMessage
 from azure.identity import DefaultAzureCredential
 
+from retry_policy import retry_call, retry_stats
+from result_store import HEAVY_FIELDS, ResultStore, ref_field
+from priority_lanes import choose_lane, load_lanes
+import local_fakes
+
 # Configure logging
 logging.basicConfig(
     level=os.environ.get('LOG_LEVEL', 'INFO'),
@@ -28,6 +32,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Service Bus queues jobs are routed onto by document size
+lanes = load_lanes()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="GenAI Underwriting Workbench API",
@@ -53,6 +60,13 @@ app.add_middleware(
 class DocumentUploadRequest(BaseModel):
     filename: str
     insuranceType: Optional[str] = "life"
+    fileSize: Optional[int] = None
+    pageCount: Optional[int] = None
+    priority: Optional[str] = None
+    # Per-job opt-outs of the worker's page cache, duplicate-upload reuse and page-range fan-out
+    disablePageCache: Optional[bool] = False
+    disableDedup: Optional[bool] = False
+    disableFanout: Optional[bool] = False
 
 class DocumentUploadResponse(BaseModel):
     uploadUrl: str
@@ -63,12 +77,16 @@ class JobResponse(BaseModel):
     jobId: str
     filename: str
     insuranceType: Optional[str] = None
+    lane: Optional[str] = None
     status: str
     createdAt: str
     updatedAt: Optional[str] = None
     progress: Optional[Dict[str, Any]] = None
     extractedData: Optional[List[Dict[str, Any]]] = None
     analysis: Optional[Dict[str, Any]] = None
+    extractedDataRef: Optional[Dict[str, Any]] = None
+    analysisRef: Optional[Dict[str, Any]] = None
+    partialAnalysis: Optional[Dict[str, Any]] = None
     error: Optional[Dict[str, str]] = None
 
 class ChatRequest(BaseModel):
@@ -78,6 +96,11 @@ class ChatResponse(BaseModel):
     response: str
     context: Optional[List[str]]
 
+class CancelJobResponse(BaseModel):
+    jobId: str
+    status: str
+    cancelRequestedAt: Optional[str] = None
+
 # Global clients (initialized lazily)
 _cosmos_client = None
 _blob_service_client = None
@@ -92,6 +115,12 @@ def get_cosmos_client():
     if _jobs_container is not None:
         return _jobs_container
     
+    if local_fakes.enabled():
+        _cosmos_client = local_fakes.cosmos_client()
+        database = _cosmos_client.get_database_client(os.environ.get('COSMOS_DB_NAME', 'underwriting'))
+        _jobs_container = database.get_container_client(os.environ.get('COSMOS_JOBS_CONTAINER', 'jobs'))
+        return _jobs_container
+    
     cosmos_endpoint = os.environ.get('COSMOS_DB_ENDPOINT')
     cosmos_key = os.environ.get('COSMOS_DB_KEY')
     
@@ -129,6 +158,10 @@ def get_blob_service_client():
     if _blob_service_client is not None:
         return _blob_service_client
     
+    if local_fakes.enabled():
+        _blob_service_client = local_fakes.blob_service_client()
+        return _blob_service_client
+    
     storage_account_name = os.environ.get('STORAGE_ACCOUNT_NAME')
     storage_conn_string = os.environ.get('STORAGE_CONNECTION_STRING')
     
@@ -160,6 +193,10 @@ def get_servicebus_client():
     if _servicebus_client is not None:
         return _servicebus_client
     
+    if local_fakes.enabled():
+        _servicebus_client = local_fakes.servicebus_client()
+        return _servicebus_client
+    
     servicebus_namespace = os.environ.get('SERVICE_BUS_NAMESPACE')
     servicebus_conn_string = os.environ.get('SERVICE_BUS_CONNECTION_STRING')
     
@@ -187,6 +224,19 @@ def get_servicebus_client():
         raise
 
 
+def resolve_job_fields(job: Dict[str, Any], fields) -> Dict[str, Any]:
+    """Replace claim-check pointers for the requested heavy fields with the stored artifacts"""
+    store = None
+    for field in fields:
+        pointer = job.get(ref_field(field))
+        if not pointer:
+            continue
+        if store is None:
+            store = ResultStore(get_blob_service_client(), pointer['container'])
+        job[field] = retry_call(lambda: store.get(pointer), 'blob', f"Read of {field} for job {job['id']}")
+    return job
+
+
 def parse_connection_string(conn_str: str) -> tuple:
     """Extract account name and key from storage connection string"""
     parts = dict(p.split('=', 1) for p in conn_str.split(';') if '=' in p)
@@ -195,6 +245,10 @@ def parse_connection_string(conn_str: str) -> tuple:
 
 def generate_sas_upload_url(blob_name: str, container: str = 'documents', expiry_minutes: int = 60) -> str:
     """Generate SAS URL for blob upload"""
+    if local_fakes.enabled():
+        # The in-memory store has no SAS; callers write through the blob client directly
+        return get_blob_service_client().get_blob_client(container, blob_name).url
+    
     storage_conn_string = os.environ.get('STORAGE_CONNECTION_STRING')
     
     if not storage_conn_string:
@@ -220,30 +274,11 @@ def generate_sas_upload_url(blob_name: str, container: str = 'documents', expiry
     return f"{blob_client.url}?{sas_token}"
 
 
-def with_retries(func, max_retries: int = 3, base_delay: float = 0.5, factor: float = 2.0):
-    """Execute function with exponential backoff retries"""
-    last_exception = None
-    
-    for attempt in range(1, max_retries + 1):
-        try:
-            return func()
-        except Exception as e:
-            last_exception = e
-            if attempt == max_retries:
-                break
-            
-            delay = base_delay * (factor ** (attempt - 1))
-            logger.warning(f"Attempt {attempt} failed, retrying in {delay}s: {e}")
-            time.sleep(delay)
-    
-    raise last_exception
-
-
 # Health check endpoints
 @app.get("/health")
 async def health_check():
     """Health check endpoint for Kubernetes liveness probe"""
-    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat(), "retries": retry_stats()}
 
 
 @app.get("/ready")
@@ -277,6 +312,7 @@ async def upload_document(request: DocumentUploadRequest):
     try:
         # Generate job ID
         job_id = f"job-{uuid.uuid4().hex}"
+        lane = choose_lane(lanes, request.pageCount, request.fileSize, request.priority)
         
         # Create job in Cosmos DB
         jobs_container = get_cosmos_client()
@@ -286,6 +322,7 @@ async def upload_document(request: DocumentUploadRequest):
             'jobId': job_id,
             'filename': request.filename,
             'insuranceType': request.insuranceType,
+            'lane': lane.name,
             'status': 'pending',
             'createdAt': datetime.utcnow().isoformat(),
             'updatedAt': datetime.utcnow().isoformat()
@@ -294,7 +331,7 @@ async def upload_document(request: DocumentUploadRequest):
         def create_job():
             return jobs_container.create_item(job_item)
         
-        with_retries(create_job)
+        retry_call(create_job, 'cosmos', f'Creation of job {job_id}')
         logger.info(f"Created job {job_id} in Cosmos DB")
         
         # Generate SAS URL for upload
@@ -304,13 +341,17 @@ async def upload_document(request: DocumentUploadRequest):
         
         # Enqueue message to Service Bus for processing
         servicebus_client = get_servicebus_client()
-        queue_name = os.environ.get('SERVICE_BUS_QUEUE_NAME', 'document-extraction')
+        queue_name = lane.queue_name
         
         message_body = {
             'jobId': job_id,
             'filename': request.filename,
             'blobPath': f"{container_name}/{blob_name}",
             'insuranceType': request.insuranceType,
+            'lane': lane.name,
+            'disablePageCache': bool(request.disablePageCache),
+            'disableDedup': bool(request.disableDedup),
+            'disableFanout': bool(request.disableFanout),
             'timestamp': datetime.utcnow().isoformat()
         }
         
@@ -323,8 +364,8 @@ async def upload_document(request: DocumentUploadRequest):
                 )
                 sender.send_messages(message)
         
-        with_retries(send_message)
-        logger.info(f"Enqueued message for job {job_id}")
+        retry_call(send_message, 'servicebus', f'Enqueue of job {job_id}')
+        logger.info(f"Enqueued message for job {job_id} on lane {lane.name}")
         
         return DocumentUploadResponse(
             uploadUrl=upload_url,
@@ -344,7 +385,11 @@ async def list_jobs():
     try:
         jobs_container = get_cosmos_client()
         
-        query = "SELECT * FROM c ORDER BY c.createdAt DESC"
+        # Heavy fields are only returned by the per-job endpoints
+        query = (
+            "SELECT c.id, c.jobId, c.filename, c.insuranceType, c.lane, c.status, c.createdAt, c.updatedAt, "
+            "c.progress, c.error, c.extractedDataRef, c.analysisRef, c.partialAnalysis FROM c ORDER BY c.createdAt DESC"
+        )
         jobs = list(jobs_container.query_items(
             query=query,
             enable_cross_partition_query=True
@@ -358,9 +403,10 @@ async def list_jobs():
 
 
 @app.get("/api/jobs/{job_id}", response_model=JobResponse)
-async def get_job(job_id: str):
+async def get_job(job_id: str, include: Optional[str] = None):
     """
-    Get job details by ID
+    Get job details by ID. Stored heavy fields are resolved only when named in include
+    (comma-separated); otherwise the response carries their references, so polling stays cheap.
     """
     try:
         jobs_container = get_cosmos_client()
@@ -368,8 +414,10 @@ async def get_job(job_id: str):
         def read_job():
             return jobs_container.read_item(item=job_id, partition_key=job_id)
         
-        job = with_retries(read_job)
-        return job
+        job = retry_call(read_job, 'cosmos', f'Read of job {job_id}')
+        
+        fields = [field for field in (include or '').split(',') if field in HEAVY_FIELDS]
+        return resolve_job_fields(job, fields)
     
     except cosmos_exceptions.CosmosResourceNotFoundError:
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
@@ -389,7 +437,7 @@ async def get_job_analysis(job_id: str):
         def read_job():
             return jobs_container.read_item(item=job_id, partition_key=job_id)
         
-        job = with_retries(read_job)
+        job = resolve_job_fields(retry_call(read_job, 'cosmos', f'Read of job {job_id}'), ['analysis'])
         
         if 'analysis' not in job or not job['analysis']:
             raise HTTPException(status_code=404, detail="Analysis not available yet")
@@ -405,6 +453,71 @@ async def get_job_analysis(job_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/jobs/{job_id}/extracted-data")
+async def get_job_extracted_data(job_id: str):
+    """
+    Get per-page extracted data for a job
+    """
+    try:
+        jobs_container = get_cosmos_client()
+        
+        def read_job():
+            return jobs_container.read_item(item=job_id, partition_key=job_id)
+        
+        job = resolve_job_fields(retry_call(read_job, 'cosmos', f'Read of job {job_id}'), ['extractedData'])
+        
+        if not job.get('extractedData'):
+            raise HTTPException(status_code=404, detail="Extracted data not available yet")
+        
+        return job['extractedData']
+    
+    except cosmos_exceptions.CosmosResourceNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching extracted data for job {job_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/jobs/{job_id}/cancel", response_model=CancelJobResponse)
+async def cancel_job(job_id: str):
+    """
+    Cancel a job; workers check the flag between pages and stop without further OpenAI calls
+    """
+    try:
+        jobs_container = get_cosmos_client()
+        cancelled_at = datetime.utcnow().isoformat()
+        
+        def cancel():
+            return jobs_container.patch_item(
+                item=job_id,
+                partition_key=job_id,
+                patch_operations=[
+                    {'op': 'set', 'path': '/cancelRequested', 'value': True},
+                    {'op': 'set', 'path': '/cancelRequestedAt', 'value': cancelled_at},
+                    {'op': 'set', 'path': '/status', 'value': 'cancelled'},
+                    {'op': 'set', 'path': '/updatedAt', 'value': cancelled_at}
+                ],
+                filter_predicate="FROM c WHERE c.status != 'completed' AND c.status != 'failed'"
+            )
+        
+        job = retry_call(cancel, 'cosmos', f'Cancellation of job {job_id}')
+        logger.info(f"Cancelled job {job_id}")
+        return CancelJobResponse(jobId=job_id, status=job['status'], cancelRequestedAt=job['cancelRequestedAt'])
+    
+    except cosmos_exceptions.CosmosResourceNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    except cosmos_exceptions.CosmosHttpResponseError as e:
+        if e.status_code == 412:
+            raise HTTPException(status_code=409, detail=f"Job {job_id} has already finished")
+        logger.error(f"Error cancelling job {job_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error cancelling job {job_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/jobs/{job_id}/chat", response_model=ChatResponse)
 async def chat_with_job(job_id: str, request: ChatRequest):
     """
@@ -416,7 +529,7 @@ async def chat_with_job(job_id: str, request: ChatRequest):
         def read_job():
             return jobs_container.read_item(item=job_id, partition_key=job_id)
         
-        job = with_retries(read_job)
+        job = retry_call(read_job, 'cosmos', f'Read of job {job_id}')
         
         if job['status'] != 'completed':
             raise HTTPException(
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Asyncio document processing worker for GenAI Underwriting Workbench (Azure version)
+Alternative entry point to worker.py that keeps several Service Bus messages in flight
+per process using the async Service Bus client.
+Every message runs worker.process_job on a thread pool sized to WORKER_CONCURRENCY, so job
+semantics (result store, checkpoints, dedup, page cache, packing, quota limiter, fan-out)
+are exactly those of worker.py.
+"""
+
+import os
+import sys
+import json
+import logging
+import asyncio
+import signal
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Set
+
+from azure.servicebus import ServiceBusReceiveMode
+from azure.servicebus.aio import ServiceBusClient
+from azure.identity.aio import DefaultAzureCredential
+
+import worker
+from health_server import start_health_server
+from priority_lanes import LaneScheduler, load_lanes
+from worker_metrics import JOBS, JOBS_IN_FLIGHT, WorkerStatsCollector, record_queue_receive_latency, start_metrics_server
+
+logger = logging.getLogger('async_worker')
+
+
+class AsyncAzureClients:
+    """Manages the async Service Bus client and the synchronous clients the job pipeline runs on"""
+
+    def __init__(self, max_concurrency: int):
+        self._credential = None
+        self._servicebus_client = None
+        self._sync_clients = None
+        self.job_executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='job')
+
+    def _get_credential(self):
+        if self._credential is None:
+            self._credential = DefaultAzureCredential()
+        return self._credential
+
+    def get_servicebus_client(self):
+        """Get Service Bus client"""
+        if self._servicebus_client is not None:
+            return self._servicebus_client
+
+        servicebus_namespace = os.environ.get('SERVICE_BUS_NAMESPACE')
+        servicebus_conn_string = os.environ.get('SERVICE_BUS_CONNECTION_STRING')
+
+        if not servicebus_namespace and not servicebus_conn_string:
+            raise ValueError("SERVICE_BUS_NAMESPACE or SERVICE_BUS_CONNECTION_STRING is required")
+
+        if servicebus_conn_string:
+            logger.info("Using connection string for Service Bus")
+            self._servicebus_client = ServiceBusClient.from_connection_string(servicebus_conn_string)
+        else:
+            logger.info("Using managed identity for Service Bus")
+            self._servicebus_client = ServiceBusClient(
+                fully_qualified_namespace=f"{servicebus_namespace}.servicebus.windows.net",
+                credential=self._get_credential()
+            )
+
+        logger.info("Connected to Service Bus")
+        return self._servicebus_client
+
+    def get_sync_clients(self) -> worker.AzureClients:
+        """Synchronous clients for the job pipeline shared with worker.py"""
+        if self._sync_clients is None:
+            self._sync_clients = worker.AzureClients()
+        return self._sync_clients
+
+    async def open_sync_clients(self):
+        """Connect the shared clients once up front so job threads never race the lazy getters"""
+        sync_clients = self.get_sync_clients()
+
+        def connect():
+            sync_clients.get_cosmos_container()
+            sync_clients.get_blob_service_client()
+            sync_clients.get_openai_client()
+            sync_clients.get_progress_publisher()
+            sync_clients.get_page_cache()
+            sync_clients.get_result_store()
+
+        await asyncio.get_running_loop().run_in_executor(self.job_executor, connect)
+
+    async def close(self):
+        """Close every client that was opened"""
+        if self._sync_clients is not None:
+            await asyncio.get_running_loop().run_in_executor(self.job_executor, self._sync_clients.close)
+        worker.shutdown_extraction_pool()
+        self.job_executor.shutdown(wait=False)
+        for client in (self._servicebus_client, self._credential):
+            if client is None:
+                continue
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close client {type(client).__name__}: {e}")
+
+
+async def process_job(clients: AsyncAzureClients, message_body: Dict[str, Any]):
+    """Run worker.process_job on the job thread pool so both entry points share one pipeline"""
+    timeout = float(os.environ.get('JOB_HEARTBEAT_TIMEOUT_SECONDS', '900'))
+
+    # The heartbeat is per job and bound to the thread the synchronous pipeline beats it from
+    def run_job():
+        with worker.monitored_job(message_body, timeout):
+            worker.process_job(clients.get_sync_clients(), message_body)
+
+    await asyncio.get_running_loop().run_in_executor(clients.job_executor, run_job)
+
+
+class AsyncMessageLockRenewer:
+    """Keeps a PEEK_LOCK message locked from a background task while its job runs"""
+
+    def __init__(self, receiver, message, interval: float):
+        self.receiver = receiver
+        self.message = message
+        self.interval = interval
+        self.lock_lost = False
+        self._task = None
+
+    async def __aenter__(self):
+        # Prefetched messages were locked while buffered; refresh before the job starts
+        if await self._renew():
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._task is None:
+            return False
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return False
+
+    async def _renew(self) -> bool:
+        try:
+            await self.receiver.renew_message_lock(self.message)
+            worker.record_lock_event('renewals')
+            logger.debug(f"Renewed lock for message {self.message.message_id}")
+            return True
+        except Exception as e:
+            self.lock_lost = True
+            worker.record_lock_event('lost')
+            logger.error(f"Lost lock for message {self.message.message_id}: {e}")
+            return False
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if not await self._renew():
+                return
+
+
+async def handle_message(clients: AsyncAzureClients, receiver, message, lane: str = 'standard'):
+    """Process one message and settle it on the receiver of its lane"""
+    record_queue_receive_latency(message, lane)
+    renewer = AsyncMessageLockRenewer(
+        receiver, message, float(os.environ.get('SERVICE_BUS_LOCK_RENEW_INTERVAL', '20'))
+    )
+    JOBS_IN_FLIGHT.inc()
+    try:
+        message_body = json.loads(str(message))
+        logger.info(f"Received message: {message_body}")
+
+        async with renewer:
+            if not renewer.lock_lost:
+                await process_job(clients, message_body)
+
+        if renewer.lock_lost:
+            logger.warning("Message lock was lost during processing; it will be redelivered")
+            JOBS.labels(outcome='lock_lost').inc()
+            return
+
+        await receiver.complete_message(message)
+        JOBS.labels(outcome='completed').inc()
+        logger.info("Message completed successfully")
+
+    except Exception as e:
+        logger.error(f"Error processing message: {e}", exc_info=True)
+        JOBS.labels(outcome='failed').inc()
+        if renewer.lock_lost:
+            logger.warning("Message lock was lost; skipping abandon")
+            return
+        try:
+            await receiver.abandon_message(message)
+            logger.info("Message abandoned for retry")
+        except Exception as abandon_error:
+            logger.error(f"Failed to abandon message: {abandon_error}")
+
+    finally:
+        JOBS_IN_FLIGHT.dec()
+
+
+async def run():
+    """Main async worker loop"""
+    max_concurrency = int(os.environ.get('WORKER_CONCURRENCY', '8'))
+    logger.info(f"Starting async document processing worker (concurrency {max_concurrency})...")
+
+    health_state = worker.health_state
+    start_health_server(health_state, int(os.environ.get('HEALTH_PORT', '8081')))
+
+    shutdown_event = asyncio.Event()
+
+    def begin_drain():
+        shutdown_event.set()
+        health_state.set_condition('accepting', 'draining')
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, begin_drain)
+
+    # A blocked event loop stops beating, which is what liveness has to catch
+    async def beat_event_loop():
+        timeout = float(os.environ.get('LIVENESS_TIMEOUT_SECONDS', '120'))
+        while True:
+            health_state.beat('event-loop', timeout)
+            await asyncio.sleep(5)
+
+    heartbeat_task = asyncio.create_task(beat_event_loop())
+
+    clients = AsyncAzureClients(max_concurrency)
+    await clients.open_sync_clients()
+    sync_clients = clients.get_sync_clients()
+    servicebus_client = clients.get_servicebus_client()
+    lanes = load_lanes()
+    scheduler = LaneScheduler(lanes)
+    prefetch_count = int(os.environ.get('SERVICE_BUS_PREFETCH_COUNT', '0'))
+
+    logger.info(f"Listening to lanes: {lanes} (prefetch {prefetch_count})")
+
+    start_metrics_server(
+        int(os.environ.get('METRICS_PORT', '9090')),
+        WorkerStatsCollector(
+            lock_stats=lambda: dict(worker.lock_renewal_stats),
+            page_cache_stats=lambda: sync_clients._page_cache.stats() if sync_clients._page_cache is not None else None,
+            concurrency_limiter=lambda: getattr(sync_clients._openai_client, 'concurrency_limiter', None),
+            lane_stats=scheduler.stats
+        )
+    )
+
+    slots = asyncio.Semaphore(max_concurrency)
+    in_flight: Set[asyncio.Task] = set()
+
+    def release_slot(task: asyncio.Task):
+        in_flight.discard(task)
+        slots.release()
+        if not shutdown_event.is_set():
+            health_state.set_condition('accepting', None)
+
+    try:
+        async with contextlib.AsyncExitStack() as stack:
+            receivers = {
+                lane.name: await stack.enter_async_context(servicebus_client.get_queue_receiver(
+                    queue_name=lane.queue_name,
+                    receive_mode=ServiceBusReceiveMode.PEEK_LOCK,
+                    max_wait_time=30,
+                    prefetch_count=prefetch_count
+                ))
+                for lane in lanes
+            }
+            health_state.set_condition('clients', None)
+
+            while not shutdown_event.is_set():
+                # Wait for a free slot before pulling more work off the queue
+                await slots.acquire()
+                free_slots = max_concurrency - len(in_flight)
+                if shutdown_event.is_set():
+                    slots.release()
+                    break
+
+                try:
+                    lane, messages = await scheduler.receive_async(
+                        receivers, max_message_count=free_slots, max_wait_time=5
+                    )
+                except Exception as e:
+                    slots.release()
+                    logger.error(f"Error in main loop: {e}", exc_info=True)
+                    await asyncio.sleep(5)
+                    continue
+
+                if not messages:
+                    slots.release()
+                    continue
+
+                # One slot is already held; take one more for every extra message
+                for index, message in enumerate(messages):
+                    if index > 0:
+                        await slots.acquire()
+                    task = asyncio.create_task(handle_message(clients, receivers[lane.name], message, lane.name))
+                    in_flight.add(task)
+                    task.add_done_callback(release_slot)
+                if len(in_flight) >= max_concurrency:
+                    health_state.set_condition('accepting', 'saturated')
+
+            if in_flight:
+                logger.info(f"Draining {len(in_flight)} in-flight job(s) before shutdown")
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+    finally:
+        heartbeat_task.cancel()
+        await clients.close()
+
+    logger.info("Worker shutting down gracefully")
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        logger.error(f"Fatal error: {e}", exc_info=True)
+        sys.exit(1)
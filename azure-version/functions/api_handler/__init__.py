@@ -3,13 +3,14 @@ import json
 import logging
 import os
 import uuid
-import time
 from datetime import datetime, timedelta
 
 from azure.cosmos import CosmosClient
 from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions
 from azure.identity import DefaultAzureCredential
 
+from retry_policy import retry_call
+
 
 def get_clients():
     """Lazily initialize Azure clients using environment variables."""
@@ -74,19 +75,6 @@ def create_upload_sas_url(blob_service: BlobServiceClient, container: str, blob_
     return f"{blob_client.url}?{sas_token}"
 
 
-def _with_retries(fn, retries=4, base_delay=0.5, factor=2.0):
-    last_exc = None
-    for attempt in range(1, retries + 1):
-        try:
-            return fn()
-        except Exception as e:
-            last_exc = e
-            sleep_for = base_delay * (factor ** (attempt - 1))
-            logging.warning('Attempt %s failed, retrying in %.2fs: %s', attempt, sleep_for, str(e))
-            time.sleep(sleep_for)
-    raise last_exc
-
-
 def main(req: func.HttpRequest) -> func.HttpResponse:
     logging.info('API Handler received request: %s %s', req.method, req.url)
 
@@ -120,7 +108,7 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
                 'status': 'pending',
                 'createdAt': datetime.utcnow().isoformat()
             }
-            jobs_container.create_item(job_item)
+            retry_call(lambda: jobs_container.create_item(job_item), 'cosmos', f'Creation of job {job_id}')
 
             # Create upload URL pointing to documents/{jobId}/{filename}
             blob_name = f"{job_id}/{filename}"
@@ -136,7 +124,7 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
     if req.method == 'GET' and route_val.startswith('jobs/'):
         job_id = route_val.split('/', 1)[1] if '/' in route_val else None
         try:
-            job = jobs_container.read_item(job_id, partition_key=job_id)
+            job = retry_call(lambda: jobs_container.read_item(job_id, partition_key=job_id), 'cosmos', f'Read of job {job_id}')
             return func.HttpResponse(json.dumps(job), status_code=200, mimetype='application/json')
         except Exception as e:
             logging.exception('Error fetching job')
@@ -2,7 +2,6 @@ import azure.functions as func
 import logging
 import os
 import json
-import time
 from azure.cosmos import CosmosClient
 from azure.storage.blob import BlobServiceClient
 from azure.identity import DefaultAzureCredential
@@ -15,25 +14,15 @@ from PIL import Image
 import io
 import base64
 
+from progress_publisher import ProgressPublisher
+from retry_policy import retry_call
+
 # Lazy client initialization (avoid import-time failures)
 cosmos_client = None
 jobs_container = None
 blob_service_client = None
 
 
-def _with_retries(fn, retries=4, base_delay=0.5, factor=2.0):
-    last_exc = None
-    for attempt in range(1, retries + 1):
-        try:
-            return fn()
-        except Exception as e:
-            last_exc = e
-            sleep_for = base_delay * (factor ** (attempt - 1))
-            logging.warning('Attempt %s failed, retrying in %.2fs: %s', attempt, sleep_for, str(e))
-            time.sleep(sleep_for)
-    raise last_exc
-
-
 def init_clients():
     global cosmos_client, jobs_container, blob_service_client
     if jobs_container and blob_service_client:
@@ -65,6 +54,22 @@ def init_clients():
     database = cosmos_client.get_database_client('underwriting')
     jobs_container = database.get_container_client('jobs')
 
+def _write_job_update(job_id, status, **fields):
+    """Read-modify-upsert a job record with the given status and fields"""
+    job = retry_call(lambda: jobs_container.read_item(job_id, partition_key=job_id), 'cosmos', f'Read of job {job_id}')
+    job['status'] = status
+    job.update(fields)
+    retry_call(lambda: jobs_container.upsert_item(job), 'cosmos', f'Update of job {job_id}')
+    logging.info(f"Updated job {job_id} status to {status}")
+
+
+# Job progress is coalesced off the page loop; 'extracted' and 'failed' are written immediately
+progress_publisher = ProgressPublisher(
+    _write_job_update,
+    interval=float(os.environ.get('PROGRESS_FLUSH_INTERVAL', '2')),
+    terminal_statuses=('extracted', 'failed')
+)
+
 # Azure OpenAI client
 openai_client = AzureOpenAI(
     api_key=os.environ.get('AZURE_OPENAI_KEY'),
@@ -90,6 +95,7 @@ def main(event: func.EventGridEvent):
     possible_job_id = path_parts[-2]
     
     logging.info(f"Processing blob: {filename}, Possible Job ID: {possible_job_id}")
+    job_id = None
     
     try:
         init_clients()
@@ -103,10 +109,11 @@ def main(event: func.EventGridEvent):
             job_id = None
             
         blob_client = blob_service_client.get_blob_client('documents', blob_name)
-        pdf_content = _with_retries(lambda: blob_client.download_blob().readall())
+        pdf_content = retry_call(lambda: blob_client.download_blob().readall(), 'blob', f'Download of {blob_name}')
         pdf_reader = PdfReader(io.BytesIO(pdf_content))
         
         extracted_data = []
+        total_pages = len(pdf_reader.pages)
         
         # Process each page
         for page_num, page in enumerate(pdf_reader.pages):
@@ -123,16 +130,19 @@ def main(event: func.EventGridEvent):
                 'text': text,
                 'analysis': page_analysis
             })
+            
+            if job_id:
+                progress_publisher.publish(job_id, 'processing', progress={
+                    'message': f'Analyzed {page_num + 1} of {total_pages} pages',
+                    'currentPage': page_num + 1,
+                    'totalPages': total_pages
+                })
         
         # Store results in Cosmos DB
-            if job_id:
+        if job_id:
             # New path: Update specific job by ID
             try:
-                    job = _with_retries(lambda: jobs_container.read_item(job_id, partition_key=job_id))
-                    job['extractedData'] = extracted_data
-                    job['status'] = 'extracted'
-                    _with_retries(lambda: jobs_container.upsert_item(job))
-                    logging.info(f"Updated job {job['id']} with extracted data")
+                progress_publisher.publish(job_id, 'extracted', extractedData=extracted_data)
             except Exception as e:
                 logging.error(f"Failed to update job {job_id}: {str(e)}")
                 raise
@@ -146,13 +156,15 @@ def main(event: func.EventGridEvent):
                 job = jobs[0]
                 job['extractedData'] = extracted_data
                 job['status'] = 'extracted'
-                _with_retries(lambda: jobs_container.upsert_item(job))
+                retry_call(lambda: jobs_container.upsert_item(job), 'cosmos', f"Update of job {job['id']}")
                 logging.info(f"Updated job {job['id']} with extracted data")
             else:
                 logging.warning(f"No pending job found for filename: {filename}")
         
     except Exception as e:
         logging.error(f"Error processing document: {str(e)}")
+        if job_id:
+            progress_publisher.publish(job_id, 'failed', error={'message': str(e)})
         raise
 
 def analyze_page_with_gpt4(text: str, page_num: int) -> dict:
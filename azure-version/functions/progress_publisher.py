@@ -0,0 +1 @@
+../../progress_publisher.py
\ No newline at end of file
@@ -0,0 +1 @@
+../../retry_policy.py
\ No newline at end of file
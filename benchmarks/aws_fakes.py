@@ -0,0 +1,310 @@
+"""
+In-process stand-ins for the S3, DynamoDB and Bedrock Runtime clients the CDK Lambdas use,
+so benchmarks can drive the real handlers (classify, batch-generator, bedrock-extract, analyze)
+without AWS. Handlers create their clients at import time; install() swaps the module-level
+clients for these. Latency uses the distributions of local_fakes.LatencyModel; DynamoDB
+enforces the 400 KB item limit and counts capacity units, and Bedrock counts tokens so
+runs can be priced.
+"""
+
+import io
+import os
+import re
+import json
+import math
+import random
+import shutil
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+from local_fakes import LatencyModel
+
+# Claude bills an image by its pixel area; a 150 DPI letter page lands near the 1600 token cap
+IMAGE_TOKENS = 1600
+DYNAMODB_ITEM_LIMIT_BYTES = 400 * 1024
+
+
+def _client_error(code: str, message: str, operation: str, status: int = 400) -> ClientError:
+    return ClientError({'Error': {'Code': code, 'Message': message}, 'ResponseMetadata': {'HTTPStatusCode': status}},
+                       operation)
+
+
+class _Profile:
+    """Latency, throttling and counters for one fake AWS service"""
+
+    def __init__(self, latency: str, throttle_rate: float, scale: float, rng: random.Random):
+        self.latency = LatencyModel(latency)
+        self.throttle_rate = throttle_rate
+        self.scale = scale
+        self.rng = rng
+        self.counters: Dict[str, float] = {'calls': 0, 'throttled': 0}
+        self._lock = threading.Lock()
+
+    def count(self, name: str, amount: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def call(self, extra_seconds: float = 0.0) -> bool:
+        with self._lock:
+            delay = (self.latency.sample(self.rng) + extra_seconds) * self.scale
+            throttled = self.throttle_rate > 0 and self.rng.random() < self.throttle_rate
+            self.counters['calls'] += 1
+            if throttled:
+                self.counters['throttled'] += 1
+        if delay > 0:
+            time.sleep(delay)
+        return throttled
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: round(value, 3) for name, value in self.counters.items()}
+
+
+class _Body(io.BytesIO):
+    """StreamingBody stand-in"""
+
+    def iter_chunks(self, chunk_size: int = 1024):
+        while True:
+            chunk = self.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class FakeS3:
+    def __init__(self, profile: _Profile):
+        self.profile = profile
+        self.objects: Dict[tuple, bytes] = {}
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket: str, Key: str, Body: Any, **kwargs):
+        data = Body.read() if hasattr(Body, 'read') else Body
+        data = data.encode('utf-8') if isinstance(data, str) else bytes(data)
+        self.profile.call()
+        with self._lock:
+            self.objects[(Bucket, Key)] = data
+        self.profile.count('bytesWritten', len(data))
+        return {'ETag': f'"{hash(data) & 0xffffffff:x}"'}
+
+    def _get(self, bucket: str, key: str, operation: str) -> bytes:
+        self.profile.call()
+        with self._lock:
+            data = self.objects.get((bucket, key))
+        if data is None:
+            raise _client_error('NoSuchKey', f"The specified key does not exist: {key}", operation, 404)
+        self.profile.count('bytesRead', len(data))
+        return data
+
+    def get_object(self, Bucket: str, Key: str, **kwargs):
+        data = self._get(Bucket, Key, 'GetObject')
+        return {'Body': _Body(data), 'ContentLength': len(data)}
+
+    def download_file(self, Bucket: str, Key: str, Filename: str, **kwargs):
+        with open(Filename, 'wb') as f:
+            shutil.copyfileobj(io.BytesIO(self._get(Bucket, Key, 'GetObject')), f)
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = '', **kwargs):
+        self.profile.call()
+        with self._lock:
+            keys = sorted(key for bucket, key in self.objects if bucket == Bucket and key.startswith(Prefix))
+        return {'Contents': [{'Key': key, 'Size': len(self.objects[(Bucket, key)])} for key in keys],
+                'KeyCount': len(keys)}
+
+    def generate_presigned_url(self, ClientMethod: str, Params: Dict[str, Any], **kwargs) -> str:
+        return f"memory://{Params['Bucket']}/{Params['Key']}"
+
+
+def _attribute_size(value: Dict[str, Any]) -> int:
+    """Approximate DynamoDB attribute value size in bytes"""
+    kind, inner = next(iter(value.items()))
+    if kind == 'S':
+        return len(inner.encode('utf-8'))
+    if kind == 'B':
+        return len(inner)
+    if kind == 'N':
+        return len(inner) // 2 + 1
+    if kind == 'M':
+        return 3 + sum(len(k) + _attribute_size(v) + 1 for k, v in inner.items())
+    if kind == 'L':
+        return 3 + sum(_attribute_size(v) + 1 for v in inner)
+    return 1
+
+
+def _item_size(item: Dict[str, Any]) -> int:
+    return sum(len(name) + _attribute_size(value) for name, value in item.items())
+
+
+class FakeDynamoDB:
+    """Low-level DynamoDB client stand-in for the SET/REMOVE update expressions the Lambdas use"""
+
+    def __init__(self, profile: _Profile):
+        self.profile = profile
+        self.tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(key: Dict[str, Any]) -> str:
+        return json.dumps(key, sort_keys=True, default=str)
+
+    def _store(self, table: str, key: Dict[str, Any], item: Dict[str, Any], operation: str):
+        size = _item_size(item)
+        if size > DYNAMODB_ITEM_LIMIT_BYTES:
+            self.profile.count('itemLimitErrors')
+            raise _client_error('ValidationException', 'Item size has exceeded the maximum allowed size', operation)
+        self.tables.setdefault(table, {})[self._key(key)] = item
+        self.profile.count('writeUnits', math.ceil(size / 1024))
+
+    def put_item(self, TableName: str, Item: Dict[str, Any], **kwargs):
+        if self.profile.call():
+            raise _client_error('ProvisionedThroughputExceededException', 'Throughput exceeded', 'PutItem')
+        key = {'jobId': Item['jobId']} if 'jobId' in Item else {name: Item[name] for name in list(Item)[:1]}
+        with self._lock:
+            self._store(TableName, key, dict(Item), 'PutItem')
+        return {}
+
+    def get_item(self, TableName: str, Key: Dict[str, Any], ProjectionExpression: Optional[str] = None, **kwargs):
+        if self.profile.call():
+            raise _client_error('ProvisionedThroughputExceededException', 'Throughput exceeded', 'GetItem')
+        with self._lock:
+            item = self.tables.get(TableName, {}).get(self._key(Key))
+        if item is None:
+            return {}
+        self.profile.count('readUnits', math.ceil(_item_size(item) / 4096) / 2)
+        if ProjectionExpression:
+            names = kwargs.get('ExpressionAttributeNames', {})
+            wanted = [names.get(name.strip(), name.strip()) for name in ProjectionExpression.split(',')]
+            item = {name: value for name, value in item.items() if name in wanted}
+        return {'Item': dict(item)}
+
+    def update_item(self, TableName: str, Key: Dict[str, Any], UpdateExpression: str,
+                    ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+                    ExpressionAttributeValues: Optional[Dict[str, Any]] = None, **kwargs):
+        if self.profile.call():
+            raise _client_error('ProvisionedThroughputExceededException', 'Throughput exceeded', 'UpdateItem')
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        with self._lock:
+            item = dict(self.tables.get(TableName, {}).get(self._key(Key)) or Key)
+            for action, clause in re.findall(r'(SET|REMOVE)\s+(.*?)(?=\s+(?:SET|REMOVE)\s+|$)', UpdateExpression,
+                                             re.IGNORECASE | re.DOTALL):
+                for assignment in clause.split(','):
+                    if action.upper() == 'REMOVE':
+                        item.pop(names.get(assignment.strip(), assignment.strip()), None)
+                        continue
+                    name, value = (part.strip() for part in assignment.split('=', 1))
+                    item[names.get(name, name)] = values[value]
+            self._store(TableName, Key, item, 'UpdateItem')
+        return {}
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeBedrockRuntime:
+    """Converse stand-in returning well-formed answers for the classify, extract and analyze prompts"""
+
+    def __init__(self, profile: _Profile, tokens_per_second: float):
+        self.profile = profile
+        self.tokens_per_second = tokens_per_second
+
+    def _reply(self, texts: List[str], tool_config: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        prompt = '\n'.join(texts)
+        if tool_config:
+            tool = tool_config['tools'][0]['toolSpec']['name']
+            document_type = 'MEDICAL_REPORT' if 'medical' in prompt.lower() else 'ACORD_FORM'
+            return [{'toolUse': {'toolUseId': 'local', 'name': tool, 'input': {'document_type': document_type}}}]
+
+        pages = re.search(r'analyzing pages \[([\d,\s]+)\]', prompt)
+        if pages:
+            page_numbers = [int(number) for number in pages.group(1).split(',')]
+            extracted = {'Applicant Information': [
+                {'page_number': number, 'full_name': 'Jane Doe', 'policy_number': f'POL-{number:05d}',
+                 'notes': 'Extracted by the local Bedrock stand-in'}
+                for number in page_numbers
+            ]}
+            return [{'text': f"```json\n{json.dumps(extracted, indent=2)}\n```"}]
+
+        analysis = {
+            'overall_summary': 'Submission reviewed by the local Bedrock stand-in.',
+            'identified_risks': [{'risk_description': 'Placeholder risk', 'severity': 'Low', 'page_references': ['1']}],
+            'discrepancies': [],
+            'medical_timeline': 'N/A',
+            'property_assessment': 'N/A',
+            'final_recommendation': 'Request additional information.',
+            'missing_information': [],
+            'confidence_score': 0.75
+        }
+        return [{'text': json.dumps(analysis)}]
+
+    def converse(self, modelId: str, messages: List[Dict[str, Any]], inferenceConfig: Optional[Dict[str, Any]] = None,
+                 toolConfig: Optional[Dict[str, Any]] = None, **kwargs):
+        blocks = [block for message in messages for block in message['content']]
+        texts = [block['text'] for block in blocks if 'text' in block]
+        images = sum(1 for block in blocks if 'image' in block)
+        content = self._reply(texts, toolConfig)
+
+        input_tokens = sum(_estimate_tokens(text) for text in texts) + images * IMAGE_TOKENS
+        output_tokens = sum(_estimate_tokens(json.dumps(block)) for block in content)
+        max_tokens = (inferenceConfig or {}).get('maxTokens')
+        if max_tokens:
+            output_tokens = min(output_tokens, max_tokens)
+
+        started = time.perf_counter()
+        if self.profile.call(extra_seconds=output_tokens / self.tokens_per_second):
+            raise _client_error('ThrottlingException', 'Too many requests, please wait before trying again.',
+                                'Converse', 429)
+        self.profile.count('inputTokens', input_tokens)
+        self.profile.count('outputTokens', output_tokens)
+        self.profile.count('images', images)
+        return {
+            'output': {'message': {'role': 'assistant', 'content': content}},
+            'stopReason': 'tool_use' if toolConfig else 'end_turn',
+            'usage': {'inputTokens': input_tokens, 'outputTokens': output_tokens,
+                      'totalTokens': input_tokens + output_tokens},
+            'metrics': {'latencyMs': int((time.perf_counter() - started) * 1000)}
+        }
+
+
+class AwsFakes:
+    """One set of AWS stand-ins; configured with the same LOCAL_* variables as local_fakes"""
+
+    def __init__(self):
+        seed = os.environ.get('LOCAL_FAKE_SEED')
+        rng = random.Random(int(seed) if seed else None)
+        scale = float(os.environ.get('LOCAL_LATENCY_SCALE', '1'))
+
+        def profile(name: str, default_latency: str) -> _Profile:
+            return _Profile(os.environ.get(f'LOCAL_LATENCY_{name}', default_latency),
+                            float(os.environ.get(f'LOCAL_THROTTLE_RATE_{name}', '0')), scale, rng)
+
+        self.s3 = FakeS3(profile('S3', 'lognormal:0.02,0.5'))
+        self.dynamodb = FakeDynamoDB(profile('DYNAMODB', 'lognormal:0.005,0.4'))
+        # The Bedrock stand-in follows the OpenAI latency settings so both pipelines see the same LLM
+        self.bedrock = FakeBedrockRuntime(
+            profile('OPENAI', 'lognormal:0.8,0.5'),
+            float(os.environ.get('LOCAL_OPENAI_TOKENS_PER_SECOND', '60'))
+        )
+
+    def install(self, module):
+        """Replace a Lambda module's AWS clients with the stand-ins"""
+        for name in ('s3', 's3_client'):
+            if hasattr(module, name):
+                setattr(module, name, self.s3)
+        for name in ('dynamodb', 'dynamodb_client'):
+            if hasattr(module, name):
+                setattr(module, name, self.dynamodb)
+        if hasattr(module, 'bedrock_runtime'):
+            module.bedrock_runtime = self.bedrock
+        if hasattr(module, 'get_s3_client'):
+            module.get_s3_client = lambda: self.s3
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            's3': self.s3.profile.stats(),
+            'dynamodb': self.dynamodb.profile.stats(),
+            'bedrock': self.bedrock.profile.stats()
+        }
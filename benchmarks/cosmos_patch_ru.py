@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+RU-charge benchmark: read-modify-upsert vs partial-document patch for job progress updates.
+
+Creates a throwaway job document carrying a synthetic extractedData payload, then replays
+the progress ticks process_job issues for an N-page document with both update strategies
+and reports the request charge reported by Cosmos DB for each.
+
+Usage:
+    COSMOS_DB_ENDPOINT=... COSMOS_DB_KEY=... python benchmarks/cosmos_patch_ru.py --pages 40
+"""
+
+import os
+import sys
+import json
+import uuid
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import worker
+
+
+def last_request_charge(container) -> float:
+    """Request charge of the last operation issued on the container"""
+    headers = container.client_connection.last_response_headers
+    return float(headers.get('x-ms-request-charge', 0))
+
+
+def synthetic_extracted_data(pages: int, chars_per_page: int):
+    """Page entries shaped like the worker's extractedData"""
+    return [
+        {
+            'page': page,
+            'text': 'x' * chars_per_page,
+            'pageType': 'application',
+            'keyValues': {'field': 'value'},
+            'analysis': {'documentType': 'application', 'riskFactors': [], 'concerns': []}
+        }
+        for page in range(1, pages + 1)
+    ]
+
+
+def upsert_progress(container, job_id: str, progress):
+    """The pre-patch strategy: read the whole document and upsert it back"""
+    job = container.read_item(item=job_id, partition_key=job_id)
+    charge = last_request_charge(container)
+    job['status'] = 'processing'
+    job['updatedAt'] = datetime.utcnow().isoformat()
+    job['progress'] = progress
+    container.upsert_item(job)
+    return charge + last_request_charge(container)
+
+
+def patch_progress(container, job_id: str, progress):
+    """The patch strategy used by worker.update_job_status"""
+    operations, filter_predicate = worker.build_job_patch(job_id, 'processing', progress=progress)
+    container.patch_item(
+        item=job_id,
+        partition_key=job_id,
+        patch_operations=operations,
+        filter_predicate=filter_predicate
+    )
+    return last_request_charge(container)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=40, help='pages in the synthetic document')
+    parser.add_argument('--chars-per-page', type=int, default=3000, help='text size of each page')
+    args = parser.parse_args()
+
+    container = worker.AzureClients().get_cosmos_container()
+    job_id = f"job-bench-{uuid.uuid4().hex}"
+    job = {
+        'id': job_id,
+        'jobId': job_id,
+        'filename': 'ru-benchmark.pdf',
+        'status': 'processing',
+        'createdAt': datetime.utcnow().isoformat(),
+        'extractedData': synthetic_extracted_data(args.pages, args.chars_per_page)
+    }
+    container.create_item(job)
+    document_kb = len(json.dumps(job)) / 1024
+
+    try:
+        results = {}
+        for name, strategy in (('read_upsert', upsert_progress), ('patch', patch_progress)):
+            charges = []
+            for page in range(1, args.pages + 1):
+                progress = {
+                    'message': f'Analyzed {page} of {args.pages} pages',
+                    'currentPage': page,
+                    'totalPages': args.pages
+                }
+                charges.append(strategy(container, job_id, progress))
+            results[name] = {
+                'totalRU': round(sum(charges), 2),
+                'meanRUPerUpdate': round(sum(charges) / len(charges), 2)
+            }
+    finally:
+        container.delete_item(item=job_id, partition_key=job_id)
+
+    results['documentKB'] = round(document_kb, 1)
+    results['updates'] = args.pages
+    results['savingRatio'] = round(results['read_upsert']['totalRU'] / max(results['patch']['totalRU'], 0.01), 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Local end-to-end flow against the in-process Azure stand-ins (local_fakes.py).
+
+Each PDF in sample_documents/ goes through the real code paths: the API's upload endpoint
+creates the job and enqueues its message, the document is written to the fake blob store,
+and the worker receives the message, runs process_job and completes it. Reports per-job
+status and wall time, plus the stand-ins' call, throttle, request unit and token counters,
+as JSON. Service latencies and throttling come from the LOCAL_* variables in local_fakes.py.
+
+Usage:
+    AZURE_BACKEND=local LOCAL_LATENCY_SCALE=0.1 python benchmarks/local_flow.py
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import asyncio
+import argparse
+import importlib.util
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import local_fakes
+import worker
+
+SAMPLE_DIR = os.path.join(ROOT, 'sample_documents')
+
+
+def load_api():
+    """Import api-server.py, whose file name is not a valid module name"""
+    spec = importlib.util.spec_from_file_location('api_server', os.path.join(ROOT, 'api-server.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_document(api, clients, path: str):
+    """Upload, process and complete one document; returns the job summary"""
+    filename = os.path.basename(path)
+    started = time.perf_counter()
+    upload = asyncio.run(api.upload_document(
+        api.DocumentUploadRequest(filename=filename, fileSize=os.path.getsize(path))
+    ))
+
+    # The local upload URL is memory://<container>/<blob>; write the document where it points
+    container, blob = upload.uploadUrl[len('memory://'):].split('/', 1)
+    with open(path, 'rb') as f:
+        local_fakes.blob_service_client().get_blob_client(container, blob).upload_blob(f.read(), overwrite=True)
+
+    # The API routed the job onto a priority lane; take it off that lane's queue
+    lane_name = clients.get_cosmos_container().read_item(item=upload.jobId, partition_key=upload.jobId)['lane']
+    queue_name = next(lane.queue_name for lane in api.lanes if lane.name == lane_name)
+    with clients.get_servicebus_client().get_queue_receiver(queue_name=queue_name, max_wait_time=5) as receiver:
+        messages = receiver.receive_messages(max_message_count=1, max_wait_time=5)
+        for message in messages:
+            worker.process_job(clients, json.loads(str(message)))
+            receiver.complete_message(message)
+    clients.get_progress_publisher().flush(upload.jobId)
+
+    job = asyncio.run(api.get_job(upload.jobId))
+    return {
+        'document': filename,
+        'jobId': upload.jobId,
+        'status': job['status'],
+        'lane': lane_name,
+        'pages': len(job.get('extractedData') or []),
+        'risks': len((job.get('analysis') or {}).get('risks', [])),
+        'seconds': round(time.perf_counter() - started, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=1, help='passes over sample_documents/')
+    args = parser.parse_args()
+
+    if not local_fakes.enabled():
+        parser.error("set AZURE_BACKEND=local to run against the in-process stand-ins")
+
+    api = load_api()
+    clients = worker.AzureClients()
+    jobs = [
+        run_document(api, clients, path)
+        for _ in range(args.repeats)
+        for path in sorted(glob.glob(os.path.join(SAMPLE_DIR, '*.pdf')))
+    ]
+    clients.get_progress_publisher().close()
+
+    print(json.dumps({'jobs': jobs, 'services': local_fakes.backend().stats()}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
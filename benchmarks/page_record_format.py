@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Extracted data format benchmark: JSON documents vs compressed page records (page_records.py).
+
+The text of each PDF in sample_documents/ is extracted page by page with pypdf and tiled up to
+--pages pages, giving the list of page entries the worker stores as extractedData. Each format
+is encoded and decoded --repeats times; reports stored size, compression ratio against plain
+JSON and best encode/decode times as JSON. zstd is included when zstandard is installed.
+
+Usage:
+    python benchmarks/page_record_format.py --pages 240 --repeats 5
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import glob
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pypdf import PdfReader
+
+from page_records import decode_page_records, encode_page_records
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sample_documents')
+
+
+def page_entries(pdf_content: bytes, target_pages: int):
+    """Page entries shaped like worker.extract_text_from_pdf output, tiled to target_pages"""
+    texts = [page.extract_text() or '' for page in PdfReader(io.BytesIO(pdf_content)).pages]
+    return [
+        {'page': index + 1, 'text': texts[index % len(texts)], 'pageType': 'unknown'}
+        for index in range(target_pages)
+    ]
+
+
+def formats():
+    """(name, encode, decode) for the current JSON formats and the page record codecs"""
+    candidates = [
+        ('json-pretty', lambda pages: json.dumps(pages, indent=2).encode('utf-8'), json.loads),
+        ('json', lambda pages: json.dumps(pages).encode('utf-8'), json.loads),
+        ('jsonl+gzip', lambda pages: encode_page_records(pages, codec='gzip'), decode_page_records),
+    ]
+    try:
+        import zstandard  # noqa: F401
+        candidates.append(('jsonl+zstd', lambda pages: encode_page_records(pages, codec='zstd'), decode_page_records))
+    except ImportError:
+        pass
+    return candidates
+
+
+def best_of(func, arg, repeats: int):
+    """Best-of-N wall time and the last result of func(arg)"""
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = func(arg)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=240, help='pages per tiled document')
+    parser.add_argument('--repeats', type=int, default=5, help='runs per format (best is kept)')
+    args = parser.parse_args()
+
+    results = []
+
+    for path in sorted(glob.glob(os.path.join(SAMPLE_DIR, '*.pdf'))):
+        with open(path, 'rb') as f:
+            pages = page_entries(f.read(), args.pages)
+
+        baseline = None
+        runs = []
+        for name, encode, decode in formats():
+            encode_seconds, data = best_of(encode, pages, args.repeats)
+            decode_seconds, decoded = best_of(decode, data, args.repeats)
+            if decoded != pages:
+                raise AssertionError(f"{name} did not round-trip {os.path.basename(path)}")
+            if name == 'json':
+                baseline = len(data)
+            runs.append({
+                'format': name,
+                'bytes': len(data),
+                'encodeMs': round(encode_seconds * 1000, 2),
+                'decodeMs': round(decode_seconds * 1000, 2)
+            })
+        for run in runs:
+            run['ratioVsJson'] = round(run['bytes'] / baseline, 3)
+
+        results.append({'document': os.path.basename(path), 'pages': args.pages, 'runs': runs})
+
+    print(json.dumps({'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
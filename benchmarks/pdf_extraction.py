@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+PDF text extraction benchmark: serial vs process-pool extraction in worker.extract_text_from_pdf.
+
+Each PDF in sample_documents/ is tiled up to --pages pages (the samples are only a few pages
+long), then extracted serially and with 2, 4, ... up to --max-processes processes. Reports wall
+time, speedup over serial and speedup per core as JSON.
+
+Usage:
+    python benchmarks/pdf_extraction.py --pages 240 --max-processes 8
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import glob
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pypdf import PdfReader, PdfWriter
+
+import worker
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sample_documents')
+
+
+def tile_pdf(pdf_content: bytes, target_pages: int) -> bytes:
+    """Repeat the pages of a PDF until it has target_pages pages"""
+    reader = PdfReader(io.BytesIO(pdf_content))
+    writer = PdfWriter()
+    for index in range(target_pages):
+        writer.add_page(reader.pages[index % len(reader.pages)])
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def time_extraction(pdf_content: bytes, processes: int, repeats: int) -> float:
+    """Best-of-N wall time for one extraction configuration"""
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        worker.extract_text_from_pdf(pdf_content, parallel_min_pages=1, processes=processes)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def process_counts(max_processes: int):
+    counts, count = [], 2
+    while count <= max_processes:
+        counts.append(count)
+        count *= 2
+    if max_processes > 1 and max_processes not in counts:
+        counts.append(max_processes)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=240, help='pages per tiled document')
+    parser.add_argument('--max-processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeats', type=int, default=3, help='runs per configuration (best is kept)')
+    args = parser.parse_args()
+
+    worker.logger.setLevel('WARNING')
+    results = []
+
+    for path in sorted(glob.glob(os.path.join(SAMPLE_DIR, '*.pdf'))):
+        with open(path, 'rb') as f:
+            pdf_content = tile_pdf(f.read(), args.pages)
+
+        serial = time_extraction(pdf_content, 1, args.repeats)
+        runs = [{'processes': 1, 'seconds': round(serial, 3), 'speedup': 1.0, 'speedupPerCore': 1.0}]
+        for processes in process_counts(args.max_processes):
+            seconds = time_extraction(pdf_content, processes, args.repeats)
+            speedup = serial / seconds
+            runs.append({
+                'processes': processes,
+                'seconds': round(seconds, 3),
+                'speedup': round(speedup, 2),
+                'speedupPerCore': round(speedup / processes, 2)
+            })
+
+        results.append({'document': os.path.basename(path), 'pages': args.pages, 'runs': runs})
+
+    print(json.dumps({'cpuCount': os.cpu_count(), 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
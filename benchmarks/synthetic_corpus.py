@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Synthetic insurance packet generator for scaling tests.
+
+Composes PDFs of 10 to 2000+ pages from the pages of sample_documents/ (or --sources), mixing
+four kinds of page in controllable ratios:
+
+  text     a text page copied from a source document
+  scanned  a source page's text rendered to a skewed, speckled grayscale JPEG with no text
+           layer, like a faxed or scanned attachment (exercises OCR and image payloads)
+  blank    an empty page (separator sheets, blank backs of scanned forms)
+  form     a source page carrying fillable AcroForm text fields with values, whose content
+           lives in the fields rather than the page text
+
+Pages come in runs, the way sub-documents follow each other in a real packet, and each kind
+gets exactly its share of the page count. The same --seed gives the same page plan, source
+page choices and scan noise. A manifest.json next to the packets lists each packet's page
+count, the count of each kind, size and sha256; feed the packets to the benchmarks with
+e.g. benchmarks/throughput.py --documents 'corpus/*.pdf'.
+
+Usage:
+    python benchmarks/synthetic_corpus.py --pages 10,200,2000 --count 2 \\
+        --mix text=0.6,scanned=0.25,blank=0.05,form=0.1 --seed 7 --output-dir corpus
+"""
+
+import os
+import io
+import sys
+import json
+import glob
+import math
+import random
+import hashlib
+import argparse
+import textwrap
+from typing import Dict, List, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, BooleanObject, DictionaryObject, FloatObject, NameObject, TextStringObject
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'sample_documents')
+
+PAGE_TYPES = ('text', 'scanned', 'blank', 'form')
+DEFAULT_MIX = 'text=0.7,scanned=0.2,blank=0.05,form=0.05'
+
+# Mean length of a run of same-kind pages
+MEAN_RUN_LENGTH = 4
+
+LETTER = (612, 792)
+
+FORM_FIELDS = (
+    ('applicant_name', ('Jane Doe', 'John Smith', 'Maria Garcia', 'Wei Chen')),
+    ('date_of_birth', ('1978-03-14', '1985-11-02', '1962-07-29', '1990-01-18')),
+    ('policy_number', ('POL-104233', 'POL-551870', 'POL-009311', 'POL-772045')),
+    ('coverage_amount', ('$250,000', '$500,000', '$1,000,000', '$750,000')),
+    ('tobacco_use', ('No', 'Yes', 'No', 'Former')),
+    ('annual_income', ('$84,000', '$132,500', '$61,200', '$210,000')),
+    ('occupation', ('Teacher', 'Pilot', 'Software Engineer', 'Electrician')),
+    ('property_address', ('12 Oak St, Springfield', '440 Bay Rd, Tampa', '9 Hill Ln, Denver', '77 Elm Ave, Austin')),
+    ('construction_type', ('Frame', 'Masonry', 'Fire Resistive', 'Joisted Masonry')),
+    ('prior_claims', ('0', '1', '2', '0')),
+)
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse text=0.7,scanned=0.2,... into normalized ratios for every page kind"""
+    ratios = {kind: 0.0 for kind in PAGE_TYPES}
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        kind, _, value = part.partition('=')
+        kind = kind.strip()
+        if kind not in ratios:
+            raise ValueError(f"Unknown page kind {kind!r}; expected one of {', '.join(PAGE_TYPES)}")
+        ratios[kind] = float(value)
+    total = sum(ratios.values())
+    if total <= 0:
+        raise ValueError("The page mix needs at least one positive ratio")
+    return {kind: ratio / total for kind, ratio in ratios.items()}
+
+
+def page_counts(pages: int, mix: Dict[str, float]) -> Dict[str, int]:
+    """Split pages between kinds by the largest remainder, so the counts add up exactly"""
+    exact = {kind: pages * ratio for kind, ratio in mix.items()}
+    counts = {kind: int(math.floor(value)) for kind, value in exact.items()}
+    by_remainder = sorted(PAGE_TYPES, key=lambda kind: exact[kind] - counts[kind], reverse=True)
+    for kind in by_remainder[:pages - sum(counts.values())]:
+        counts[kind] += 1
+    return counts
+
+
+def page_plan(pages: int, mix: Dict[str, float], rng: random.Random) -> List[str]:
+    """The kind of every page: each kind's share cut into runs, shuffled, text first when possible"""
+    runs: List[List[str]] = []
+    for kind, count in page_counts(pages, mix).items():
+        while count > 0:
+            length = min(count, 1 + int(rng.expovariate(1.0 / MEAN_RUN_LENGTH)))
+            runs.append([kind] * length)
+            count -= length
+    rng.shuffle(runs)
+    # Packets open with a cover or application page rather than a blank sheet
+    for index, run in enumerate(runs):
+        if run[0] == 'text':
+            runs.insert(0, runs.pop(index))
+            break
+    return [kind for run in runs for kind in run]
+
+
+class SourcePages:
+    """Pages of the source PDFs, with their text extracted on first use"""
+
+    def __init__(self, paths: List[str]):
+        self.pages: List[Tuple[str, int]] = []
+        self._readers: Dict[str, PdfReader] = {}
+        self._texts: Dict[Tuple[str, int], str] = {}
+        for path in paths:
+            reader = PdfReader(path)
+            self._readers[path] = reader
+            self.pages.extend((path, index) for index in range(len(reader.pages)))
+        if not self.pages:
+            raise ValueError("No source pages found")
+
+    def choose(self, rng: random.Random) -> Tuple[str, int]:
+        return self.pages[rng.randrange(len(self.pages))]
+
+    def page(self, source: Tuple[str, int]):
+        path, index = source
+        return self._readers[path].pages[index]
+
+    def text(self, source: Tuple[str, int]) -> str:
+        if source not in self._texts:
+            self._texts[source] = self.page(source).extract_text() or ''
+        return self._texts[source]
+
+
+def _font(size: int):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow without FreeType sizes
+        return ImageFont.load_default()
+
+
+def render_scan(text: str, rng: random.Random, dpi: int, quality: int) -> bytes:
+    """Render text as a single-page, image-only PDF that looks scanned"""
+    width, height = int(LETTER[0] / 72 * dpi), int(LETTER[1] / 72 * dpi)
+    image = Image.new('L', (width, height), color=rng.randint(235, 250))
+    draw = ImageDraw.Draw(image)
+    font_size = max(10, dpi // 7)
+    font = _font(font_size)
+
+    margin, y = dpi // 2, dpi // 2
+    for paragraph in (text or 'Illegible attachment').splitlines():
+        for line in textwrap.wrap(paragraph, width=90) or ['']:
+            if y > height - margin:
+                break
+            draw.text((margin, y), line, fill=rng.randint(20, 60), font=font)
+            y += int(font_size * 1.4)
+
+    # Speckle, then a slight skew as from a sheet fed at an angle
+    for _ in range(width * height // 2000):
+        draw.point((rng.randrange(width), rng.randrange(height)), fill=rng.randint(0, 120))
+    image = image.rotate(rng.uniform(-1.5, 1.5), resample=Image.BICUBIC, expand=False, fillcolor=245)
+
+    # Round-trip through JPEG so the page carries DCT data like a real scan
+    jpeg = io.BytesIO()
+    image.save(jpeg, format='JPEG', quality=quality)
+    pdf = io.BytesIO()
+    Image.open(io.BytesIO(jpeg.getvalue())).save(pdf, format='PDF', resolution=dpi)
+    return pdf.getvalue()
+
+
+def add_form_fields(writer: PdfWriter, page_number: int, rng: random.Random) -> List[DictionaryObject]:
+    """Add filled text widgets to the last page added to writer"""
+    page = writer.pages[-1]
+    page_width = float(page.mediabox.width)
+    page_height = float(page.mediabox.height)
+    fields = rng.sample(FORM_FIELDS, rng.randint(5, len(FORM_FIELDS)))
+
+    widgets = []
+    for index, (name, values) in enumerate(fields):
+        column, row = index % 2, index // 2
+        left = 54 + column * (page_width - 108) / 2
+        top = page_height * 0.45 - row * 28
+        widget = writer.add_annotation(page, DictionaryObject({
+            NameObject('/Type'): NameObject('/Annot'),
+            NameObject('/Subtype'): NameObject('/Widget'),
+            NameObject('/FT'): NameObject('/Tx'),
+            NameObject('/T'): TextStringObject(f"p{page_number}_{name}"),
+            NameObject('/TU'): TextStringObject(name.replace('_', ' ').title()),
+            NameObject('/V'): TextStringObject(rng.choice(values)),
+            NameObject('/Rect'): ArrayObject([
+                _number(left), _number(top - 20), _number(left + (page_width - 108) / 2 - 12), _number(top)
+            ]),
+            NameObject('/F'): _number(4),
+            NameObject('/DA'): TextStringObject('/Helv 10 Tf 0 g'),
+        }))
+        widgets.append(widget)
+    return widgets
+
+
+def _number(value: float) -> FloatObject:
+    return FloatObject(round(value, 2))
+
+
+def compose_packet(sources: SourcePages, plan: List[str], rng: random.Random, dpi: int, quality: int) -> bytes:
+    """Build one packet PDF following the page plan"""
+    writer = PdfWriter()
+    form_widgets = []
+    for page_number, kind in enumerate(plan, start=1):
+        if kind == 'blank':
+            writer.add_blank_page(*LETTER)
+            continue
+        source = sources.choose(rng)
+        if kind == 'scanned':
+            writer.add_page(PdfReader(io.BytesIO(render_scan(sources.text(source), rng, dpi, quality))).pages[0])
+        else:
+            writer.add_page(sources.page(source))
+            if kind == 'form':
+                form_widgets.extend(add_form_fields(writer, page_number, rng))
+
+    if form_widgets:
+        helvetica = DictionaryObject({
+            NameObject('/Type'): NameObject('/Font'),
+            NameObject('/Subtype'): NameObject('/Type1'),
+            NameObject('/BaseFont'): NameObject('/Helvetica'),
+        })
+        writer._root_object[NameObject('/AcroForm')] = DictionaryObject({
+            NameObject('/Fields'): ArrayObject([widget.indirect_reference for widget in form_widgets]),
+            NameObject('/NeedAppearances'): BooleanObject(True),
+            NameObject('/DA'): TextStringObject('/Helv 0 Tf 0 g'),
+            NameObject('/DR'): DictionaryObject({
+                NameObject('/Font'): DictionaryObject({NameObject('/Helv'): helvetica})
+            }),
+        })
+
+    writer.add_metadata({'/Producer': 'synthetic_corpus', '/Title': f'Synthetic packet ({len(plan)} pages)'})
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', default='10,100,500', help='comma-separated packet sizes in pages')
+    parser.add_argument('--count', type=int, default=1, help='packets per size')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='page kind ratios, e.g. text=0.6,scanned=0.3,blank=0.1')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--sources', action='append', help='source PDF glob (repeatable); default sample_documents/*.pdf')
+    parser.add_argument('--scan-dpi', type=int, default=150, help='resolution of scanned pages')
+    parser.add_argument('--scan-quality', type=int, default=60, help='JPEG quality of scanned pages')
+    parser.add_argument('--output-dir', default='corpus')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    sizes = [int(size) for size in args.pages.split(',') if size.strip()]
+    paths = sorted({path for pattern in args.sources or [os.path.join(SAMPLE_DIR, '*.pdf')]
+                    for path in glob.glob(pattern)})
+    sources = SourcePages(paths)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    packets = []
+    for size in sizes:
+        for index in range(args.count):
+            # Every packet has its own stream, so adding sizes or counts leaves the others unchanged
+            rng = random.Random(f"{args.seed}:{size}:{index}")
+            plan = page_plan(size, mix, rng)
+            content = compose_packet(sources, plan, rng, args.scan_dpi, args.scan_quality)
+            name = f"packet-{size:04d}p-s{args.seed}-{index + 1}.pdf"
+            with open(os.path.join(args.output_dir, name), 'wb') as f:
+                f.write(content)
+            packets.append({
+                'file': name,
+                'pages': size,
+                'pageKinds': {kind: plan.count(kind) for kind in PAGE_TYPES},
+                'plan': ''.join(kind[0] for kind in plan),
+                'bytes': len(content),
+                'sha256': hashlib.sha256(content).hexdigest()
+            })
+            print(f"Wrote {name}: {len(content) / 1024 / 1024:.1f} MB", file=sys.stderr)
+
+    manifest = {'seed': args.seed, 'mix': mix, 'sources': [os.path.basename(path) for path in paths],
+                'packets': packets}
+    with open(os.path.join(args.output_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == '__main__':
+    main()
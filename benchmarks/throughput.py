@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark for the Azure worker and the AWS Lambda pipeline.
+
+Replays the PDFs in sample_documents/ (or --documents), optionally tiled into synthetic
+packets of --synthetic-pages pages, through the real processing code against in-process
+stand-ins with configurable LLM latency. Mixed-content packets from
+benchmarks/synthetic_corpus.py are passed with --documents 'corpus/*.pdf'. Pipelines:
+
+  worker  messages are enqueued on the local Service Bus stand-in (local_fakes.py) and
+          --workers consumers run worker.process_job on them, as worker.main does
+  lambda  each document runs through the Step Functions path: classify, batch-generator,
+          bedrock-extract over every page range (--map-concurrency at a time), analyze,
+          with S3, DynamoDB and Bedrock replaced by benchmarks/aws_fakes.py
+
+Reports docs/min, pages/sec, p50/p95/p99 job latency (enqueue to completion), peak RSS,
+service counters and simulated cost as JSON. --baseline adds the ratio of each headline
+metric to an earlier result file, so regressions show up run to run.
+
+Usage:
+    python benchmarks/throughput.py --pipeline worker --synthetic-pages 50,200 \\
+        --llm-latency lognormal:0.8,0.5 --latency-scale 0.05 --workers 4 --output run.json
+"""
+
+import os
+import io
+import sys
+import json
+import glob
+import math
+import time
+import uuid
+import logging
+import argparse
+import contextlib
+import resource
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pypdf import PdfReader, PdfWriter
+
+SAMPLE_DIR = os.path.join(ROOT, 'sample_documents')
+LAMBDA_DIR = os.path.join(ROOT, 'cdk', 'lambda-functions')
+
+# Memory sizes of the Step Functions Lambdas in cdk/lib/cdk-stack.ts, for GB-second pricing
+LAMBDA_MEMORY_MB = {'classify': 1024, 'batch-generator': 1024, 'bedrock-extract': 2048, 'analyze': 512}
+
+HEADLINE_METRICS = ('docsPerMinute', 'pagesPerSecond', 'p95LatencySeconds', 'peakRssMb', 'costPerPage')
+
+
+def load_documents(patterns: List[str], synthetic_pages: List[int]) -> List[Dict[str, Any]]:
+    """Source PDFs, plus each one tiled up to every synthetic page count"""
+    documents = []
+    for path in sorted({path for pattern in patterns for path in glob.glob(pattern)}):
+        with open(path, 'rb') as f:
+            content = f.read()
+        reader = PdfReader(io.BytesIO(content))
+        documents.append({'name': os.path.basename(path), 'content': content, 'pages': len(reader.pages)})
+
+        for target in synthetic_pages:
+            writer = PdfWriter()
+            for index in range(target):
+                writer.add_page(reader.pages[index % len(reader.pages)])
+            buffer = io.BytesIO()
+            writer.write(buffer)
+            stem = os.path.splitext(os.path.basename(path))[0]
+            documents.append({'name': f"{stem}-x{target}.pdf", 'content': buffer.getvalue(), 'pages': target})
+    return documents
+
+
+class PeakRssSampler:
+    """Samples resident set size on a background thread and keeps the peak"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = self._rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+
+    @staticmethod
+    def _rss() -> int:
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError):
+            # ru_maxrss is the lifetime peak (KB on Linux, bytes on macOS)
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self._rss())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._rss())
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(pipeline: str, jobs: List[Dict[str, Any]], wall_seconds: float, peak_rss: int,
+              cost: Dict[str, float], services: Dict[str, Any]) -> Dict[str, Any]:
+    completed = [job for job in jobs if job['status'] == 'completed']
+    latencies = [job['latencySeconds'] for job in completed]
+    pages = sum(job['pages'] for job in completed)
+    cost['total'] = round(sum(cost.values()), 6)
+    return {
+        'pipeline': pipeline,
+        'documents': len(jobs),
+        'completed': len(completed),
+        'failed': len(jobs) - len(completed),
+        'pages': pages,
+        'wallSeconds': round(wall_seconds, 3),
+        'docsPerMinute': round(len(completed) / wall_seconds * 60, 3) if wall_seconds else 0.0,
+        'pagesPerSecond': round(pages / wall_seconds, 3) if wall_seconds else 0.0,
+        'p50LatencySeconds': round(percentile(latencies, 0.50), 3),
+        'p95LatencySeconds': round(percentile(latencies, 0.95), 3),
+        'p99LatencySeconds': round(percentile(latencies, 0.99), 3),
+        'maxLatencySeconds': round(max(latencies, default=0.0), 3),
+        'peakRssMb': round(peak_rss / (1024 * 1024), 1),
+        'cost': cost,
+        'costPerDocument': round(cost['total'] / len(completed), 6) if completed else None,
+        'costPerPage': round(cost['total'] / pages, 6) if pages else None,
+        'jobs': jobs,
+        'services': services
+    }
+
+
+def run_worker_pipeline(documents: List[Dict[str, Any]], args) -> Dict[str, Any]:
+    """Drive worker.process_job through the local Service Bus, Cosmos, Blob and OpenAI stand-ins"""
+    os.environ['AZURE_BACKEND'] = 'local'
+    import local_fakes
+    import worker
+    from priority_lanes import LaneScheduler, choose_lane, load_lanes
+
+    backend = local_fakes.reset()
+    container_name = os.environ.get('STORAGE_CONTAINER_NAME', 'documents')
+    lanes = load_lanes()
+    senders = {lane.name: local_fakes.servicebus_client().get_queue_sender(lane.queue_name) for lane in lanes}
+    jobs_container = worker.AzureClients().get_cosmos_container()
+    blob_service = local_fakes.blob_service_client()
+
+    jobs: Dict[str, Dict[str, Any]] = {}
+    started = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        for sender in senders.values():
+            stack.enter_context(sender)
+        for document in documents:
+            job_id = f"job-bench-{uuid.uuid4().hex}"
+            lane = choose_lane(lanes, document['pages'], len(document['content']))
+            blob_name = f"{job_id}/{document['name']}"
+            blob_service.get_blob_client(container_name, blob_name).upload_blob(document['content'], overwrite=True)
+            jobs_container.create_item({'id': job_id, 'jobId': job_id, 'filename': document['name'],
+                                        'status': 'pending', 'createdAt': datetime.utcnow().isoformat()})
+            senders[lane.name].send_messages(json.dumps({
+                'jobId': job_id,
+                'filename': document['name'],
+                'blobPath': f"{container_name}/{blob_name}",
+                'insuranceType': 'life',
+                'disableDedup': not args.allow_reuse,
+                'disablePageCache': not args.allow_reuse
+            }))
+            jobs[job_id] = {'document': document['name'], 'pages': document['pages'], 'lane': lane.name,
+                            'status': 'queued', 'enqueuedAt': time.perf_counter()}
+
+    def consume():
+        # One AzureClients per consumer, like one worker pod each
+        clients = worker.AzureClients()
+        scheduler = LaneScheduler(lanes)
+        with contextlib.ExitStack() as stack:
+            receivers = {
+                lane.name: stack.enter_context(
+                    clients.get_servicebus_client().get_queue_receiver(queue_name=lane.queue_name, max_wait_time=1)
+                )
+                for lane in lanes
+            }
+            while True:
+                lane, messages = scheduler.receive(receivers, max_message_count=1, max_wait_time=1)
+                if not messages:
+                    break
+                for message in messages:
+                    job = jobs[json.loads(str(message))['jobId']]
+                    job['startedAt'] = time.perf_counter()
+                    try:
+                        worker.process_job(clients, json.loads(str(message)))
+                        job['status'] = 'completed'
+                    except Exception as e:
+                        job['status'] = 'failed'
+                        job['error'] = str(e)
+                    receivers[lane.name].complete_message(message)
+                    job['finishedAt'] = time.perf_counter()
+        clients.get_progress_publisher().close()
+
+    with PeakRssSampler() as rss:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            for future in [executor.submit(consume) for _ in range(args.workers)]:
+                future.result()
+    wall_seconds = time.perf_counter() - started
+
+    services = backend.stats()
+    openai_stats, cosmos_stats = services['openai'], services['cosmos']
+    cost = {
+        'llm': round(openai_stats.get('promptTokens', 0) / 1000 * args.prompt_price
+                     + openai_stats.get('completionTokens', 0) / 1000 * args.completion_price, 6),
+        'cosmos': round(cosmos_stats.get('requestUnits', 0) / 1e6 * args.cosmos_price_per_million_ru, 6)
+    }
+    return summarize('worker', [_job_result(job) for job in jobs.values()], wall_seconds, rss.peak, cost, services)
+
+
+def load_lambda(name: str):
+    """Import cdk/lambda-functions/<name>/index.py under a unique module name"""
+    spec = importlib.util.spec_from_file_location(
+        f"lambda_{name.replace('-', '_')}", os.path.join(LAMBDA_DIR, name, 'index.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_lambda_pipeline(documents: List[Dict[str, Any]], args) -> Dict[str, Any]:
+    """Drive the Step Functions Lambdas in-process against the S3, DynamoDB and Bedrock stand-ins"""
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    os.environ.setdefault('JOBS_TABLE_NAME', 'jobs')
+    os.environ.setdefault('EXTRACTION_BUCKET', 'extraction')
+    os.environ.setdefault('BEDROCK_MODEL_ID', 'local')
+    import aws_fakes
+
+    aws = aws_fakes.AwsFakes()
+    handlers = {}
+    for name, entry in (('classify', 'lambda_handler'), ('batch-generator', 'handler'),
+                        ('bedrock-extract', 'lambda_handler'), ('analyze', 'lambda_handler')):
+        module = load_lambda(name)
+        aws.install(module)
+        handlers[name] = getattr(module, entry)
+
+    gb_seconds = [0.0]
+    gb_seconds_lock = threading.Lock()
+
+    def invoke(name: str, event: Dict[str, Any]) -> Any:
+        invoked = time.perf_counter()
+        try:
+            return handlers[name](event, None)
+        finally:
+            with gb_seconds_lock:
+                gb_seconds[0] += (time.perf_counter() - invoked) * LAMBDA_MEMORY_MB[name] / 1024
+
+    bucket = 'documents'
+    jobs = []
+    started = time.perf_counter()
+    for document in documents:
+        job_id = uuid.uuid4().hex
+        # The job id in the file name keeps concurrent copies of a document apart in /tmp
+        key = f"uploads/{job_id}/{job_id}-{document['name']}"
+        aws.s3.put_object(Bucket=bucket, Key=key, Body=document['content'])
+        aws.dynamodb.put_item(TableName=os.environ['JOBS_TABLE_NAME'], Item={
+            'jobId': {'S': job_id}, 'insuranceType': {'S': 'life'}, 'status': {'S': 'PENDING'}
+        })
+        jobs.append({'document': document['name'], 'pages': document['pages'], 'jobId': job_id, 'key': key,
+                     'status': 'queued', 'enqueuedAt': time.perf_counter()})
+
+    def execute(job: Dict[str, Any]):
+        """One state machine execution"""
+        job['startedAt'] = time.perf_counter()
+        detail = {'bucket': {'name': bucket}, 'object': {'key': job['key']}}
+        try:
+            classification = invoke('classify', {'detail': detail})
+            batches = invoke('batch-generator', {'detail': {'bucket': bucket, 'object': {'key': job['key']}},
+                                                 'classification': classification})
+            with ThreadPoolExecutor(max_workers=args.map_concurrency) as executor:
+                results = list(executor.map(
+                    lambda pages: invoke('bedrock-extract', {'detail': detail, 'classification': classification,
+                                                             'pages': pages}),
+                    batches['batchRanges']
+                ))
+            errors = [result for result in results if result.get('status') == 'ERROR']
+            if errors:
+                raise RuntimeError(errors[0].get('message'))
+            analysis = invoke('analyze', {'detail': detail, 'classification': classification,
+                                          'batches': batches, 'extractionResults': results})
+            if analysis.get('status') not in ('SUCCESS', 'WARNING'):
+                raise RuntimeError(analysis.get('message'))
+            job['status'] = 'completed'
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        job['finishedAt'] = time.perf_counter()
+
+    with PeakRssSampler() as rss:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            list(executor.map(execute, jobs))
+    wall_seconds = time.perf_counter() - started
+
+    services = aws.stats()
+    bedrock_stats, dynamodb_stats = services['bedrock'], services['dynamodb']
+    cost = {
+        'llm': round(bedrock_stats.get('inputTokens', 0) / 1000 * args.prompt_price
+                     + bedrock_stats.get('outputTokens', 0) / 1000 * args.completion_price, 6),
+        'lambda': round(gb_seconds[0] * args.lambda_price_per_gb_second, 6),
+        'dynamodb': round(dynamodb_stats.get('writeUnits', 0) / 1e6 * args.dynamodb_write_price_per_million
+                          + dynamodb_stats.get('readUnits', 0) / 1e6 * args.dynamodb_read_price_per_million, 6)
+    }
+    services['lambdaGbSeconds'] = round(gb_seconds[0], 3)
+    return summarize('lambda', [_job_result(job) for job in jobs], wall_seconds, rss.peak, cost, services)
+
+
+def _job_result(job: Dict[str, Any]) -> Dict[str, Any]:
+    result = {'document': job['document'], 'pages': job['pages'], 'status': job['status']}
+    if 'lane' in job:
+        result['lane'] = job['lane']
+    if 'finishedAt' in job:
+        result['latencySeconds'] = round(job['finishedAt'] - job['enqueuedAt'], 3)
+        result['processingSeconds'] = round(job['finishedAt'] - job['startedAt'], 3)
+    if 'error' in job:
+        result['error'] = job['error']
+    return result
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> Dict[str, Dict[str, Optional[float]]]:
+    """Ratio of each headline metric to the same pipeline's value in a baseline result file"""
+    with open(baseline_path) as f:
+        baseline = {result['pipeline']: result for result in json.load(f)['results']}
+    comparison = {}
+    for result in results:
+        previous = baseline.get(result['pipeline'])
+        if previous is None:
+            continue
+        comparison[result['pipeline']] = {
+            metric: round(result[metric] / previous[metric], 3) if result.get(metric) and previous.get(metric) else None
+            for metric in HEADLINE_METRICS
+        }
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pipeline', choices=('worker', 'lambda', 'all'), default='worker')
+    parser.add_argument('--documents', action='append', help='PDF glob (repeatable); default sample_documents/*.pdf')
+    parser.add_argument('--synthetic-pages', default='', help='comma-separated page counts to tile each PDF to')
+    parser.add_argument('--repeats', type=int, default=1, help='copies of the document set to enqueue')
+    parser.add_argument('--workers', type=int, default=2, help='concurrent worker consumers / state machine executions')
+    parser.add_argument('--map-concurrency', type=int, default=1, help='ParallelExtraction maxConcurrency')
+    parser.add_argument('--llm-latency', default='lognormal:0.8,0.5', help='LLM time-to-first-token distribution')
+    parser.add_argument('--llm-tokens-per-second', type=float, default=60.0, help='LLM generation speed')
+    parser.add_argument('--latency-scale', type=float, default=1.0, help='multiplier for every simulated latency')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--allow-reuse', action='store_true', help='let the worker dedup and page caches hit')
+    parser.add_argument('--prompt-price', type=float, default=0.0025, help='USD per 1K prompt tokens')
+    parser.add_argument('--completion-price', type=float, default=0.01, help='USD per 1K completion tokens')
+    parser.add_argument('--cosmos-price-per-million-ru', type=float, default=0.25)
+    parser.add_argument('--lambda-price-per-gb-second', type=float, default=0.0000166667)
+    parser.add_argument('--dynamodb-write-price-per-million', type=float, default=1.25)
+    parser.add_argument('--dynamodb-read-price-per-million', type=float, default=0.25)
+    parser.add_argument('--baseline', help='earlier result file to compare headline metrics against')
+    parser.add_argument('--output', help='write the JSON result here instead of stdout')
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(args.log_level)
+    os.environ['LOCAL_LATENCY_OPENAI'] = args.llm_latency
+    os.environ['LOCAL_OPENAI_TOKENS_PER_SECOND'] = str(args.llm_tokens_per_second)
+    os.environ['LOCAL_LATENCY_SCALE'] = str(args.latency_scale)
+    os.environ['LOCAL_FAKE_SEED'] = str(args.seed)
+
+    synthetic_pages = [int(pages) for pages in args.synthetic_pages.split(',') if pages.strip()]
+    documents = load_documents(args.documents or [os.path.join(SAMPLE_DIR, '*.pdf')], synthetic_pages) * args.repeats
+    if not documents:
+        parser.error("no documents matched")
+
+    runners: Dict[str, Callable] = {'worker': run_worker_pipeline, 'lambda': run_lambda_pipeline}
+    pipelines = ('worker', 'lambda') if args.pipeline == 'all' else (args.pipeline,)
+    results = [runners[pipeline](documents, args) for pipeline in pipelines]
+
+    report = {
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'results': results
+    }
+    if args.baseline:
+        report['comparison'] = compare(results, args.baseline)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
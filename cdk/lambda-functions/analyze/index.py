@@ -6,6 +6,7 @@ import traceback
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from datetime import datetime, timezone # ADDED
+from page_records import encode_page_records, iter_page_records, records_from_sections, sections_from_records
 
 # Configure retry settings for Bedrock client only
 bedrock_retry_config = Config(
@@ -73,6 +74,21 @@ def validate_analysis_data(data, schema):
     return is_valid
 
 
+def is_job_cancelled(job_id):
+    """True once the job has been cancelled through the API"""
+    try:
+        response = dynamodb_client.get_item(
+            TableName=DB_TABLE,
+            Key={'jobId': {'S': job_id}},
+            ProjectionExpression='cancelRequested',
+            ConsistentRead=True
+        )
+        return response.get('Item', {}).get('cancelRequested', {}).get('BOOL', False)
+    except Exception as e:
+        print(f"[is_job_cancelled] Failed to check cancellation of job {job_id}: {e}")
+        return False
+
+
 def lambda_handler(event, context):
     print("[lambda_handler] Received event:", json.dumps(event))
     
@@ -94,8 +110,12 @@ def lambda_handler(event, context):
         try:
             print(f"[lambda_handler] Fetching S3 object: Bucket={EXTRACTION_BUCKET}, Key={key}")
             obj = s3.get_object(Bucket=EXTRACTION_BUCKET, Key=key)
-            body = obj['Body'].read()
-            chunk_data = json.loads(body.decode('utf-8'))
+            if key.endswith(('.jsonl.gz', '.jsonl.zst')):
+                # Page records are decompressed and parsed as the body streams in
+                chunk_data = sections_from_records(iter_page_records(obj['Body']))
+            else:
+                # Chunks written before the page record format
+                chunk_data = json.loads(obj['Body'].read().decode('utf-8'))
             print(f"[lambda_handler] Retrieved chunk {idx}, keys={list(chunk_data.keys())}")
         except Exception as e:
             print(f"[lambda_handler] Error fetching/parsing S3 chunk {idx} (Bucket={EXTRACTION_BUCKET}, Key={key}): {e}")
@@ -107,7 +127,7 @@ def lambda_handler(event, context):
     print(f"[lambda_handler] Merged extracted data keys: {list(merged_data.keys())}")
     extracted_data = merged_data
 
-    # --- 2) Persist extractedDataJsonStr to DynamoDB ---
+    # --- 2) Persist extracted data to DynamoDB as compressed page records ---
     classification = event.get('classification', {})
     job_id = classification.get('jobId')
     document_type = classification.get('classification')
@@ -118,15 +138,24 @@ def lambda_handler(event, context):
                 TableName=DB_TABLE,
                 Key={'jobId': {'S': job_id}},
                 UpdateExpression="SET #dt = :dt, #ed = :ed, #et = :et",
-                ExpressionAttributeNames={'#dt': 'documentType', '#ed': 'extractedDataJsonStr', '#et': 'extractionTimestamp'},
-                ExpressionAttributeValues={':dt': {'S': document_type}, ':ed': {'S': json.dumps(extracted_data)}, ':et': {'S': ts}}
+                ExpressionAttributeNames={'#dt': 'documentType', '#ed': 'extractedDataRecords', '#et': 'extractionTimestamp'},
+                ExpressionAttributeValues={
+                    ':dt': {'S': document_type},
+                    ':ed': {'B': encode_page_records(records_from_sections(extracted_data), codec='gzip')},
+                    ':et': {'S': ts}
+                }
             )
-            print(f"[lambda_handler] Persisted extractedDataJsonStr for job {job_id}")
+            print(f"[lambda_handler] Persisted extractedDataRecords for job {job_id}")
         except Exception as e:
             print(f"Error processing input event: {e}")
             analysis_json["message"] = f"Error processing input event: {str(e)}"
             return analysis_json
 
+    # A cancelled job skips the analysis; the state machine ends before TakeAction
+    if job_id and DB_TABLE and is_job_cancelled(job_id):
+        print(f"[lambda_handler] Job {job_id} was cancelled; skipping analysis")
+        return {"status": "CANCELLED", "message": "Job was cancelled", "analysis_data": {}}
+
     # --- 3) Construct Analysis Prompt ---
     consolidated = json.dumps(extracted_data, indent=2)
     print(f"[lambda_handler] Building analysis prompt (length {len(consolidated)} chars)")
@@ -2,7 +2,9 @@ import json
 import boto3
 import os
 import uuid
+from botocore.exceptions import ClientError
 from datetime import datetime, timezone, timedelta
+from page_records import decode_page_records, sections_from_records
 
 # Initialize AWS clients
 s3 = boto3.client('s3')
@@ -83,6 +85,23 @@ def lambda_handler(event, context):
                 'body': json.dumps(response)
             }
             
+        elif http_method == 'POST' and resource == '/api/jobs/{jobId}/cancel':
+            # Flag the job as cancelled; extraction stops before its next Bedrock call
+            job_id = path_parameters.get('jobId')
+            if not job_id:
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': json.dumps({'error': 'Missing jobId parameter'})
+                }
+            
+            status_code, response = cancel_job(job_id)
+            return {
+                'statusCode': status_code,
+                'headers': headers,
+                'body': json.dumps(response)
+            }
+            
         elif http_method == 'POST' and resource == '/api/documents/upload':
             # Generate presigned URL for document upload
             response = generate_upload_url(event)
@@ -186,8 +205,13 @@ def get_job(job_id):
             'insuranceType': item.get('insuranceType', {}).get('S', '')
         }
         
-        # Add extracted data if available
-        if 'extractedDataJsonStr' in item:
+        # Add extracted data if available (page records; JSON string for older jobs)
+        if 'extractedDataRecords' in item:
+            try:
+                job['extractedData'] = sections_from_records(decode_page_records(item['extractedDataRecords']['B']))
+            except Exception:
+                job['extractedData'] = {}
+        elif 'extractedDataJsonStr' in item:
             try:
                 extracted_data = json.loads(item['extractedDataJsonStr']['S'])
                 job['extractedData'] = extracted_data
@@ -216,6 +240,36 @@ def get_job(job_id):
         print(f"Error getting job {job_id}: {str(e)}")
         raise
 
+def cancel_job(job_id):
+    """Set the cancellation flag on a job that has not finished; returns (status code, body)"""
+    now = datetime.now(timezone.utc).isoformat()
+    try:
+        dynamodb.update_item(
+            TableName=JOBS_TABLE_NAME,
+            Key={'jobId': {'S': job_id}},
+            UpdateExpression="SET cancelRequested = :c, cancelRequestedTimestamp = :t, #s = :s",
+            ConditionExpression="attribute_exists(jobId) AND NOT #s IN (:complete, :failed)",
+            ExpressionAttributeNames={'#s': 'status'},
+            ExpressionAttributeValues={
+                ':c': {'BOOL': True},
+                ':t': {'S': now},
+                ':s': {'S': 'CANCELLED'},
+                ':complete': {'S': 'COMPLETE'},
+                ':failed': {'S': 'FAILED'}
+            },
+            ReturnValuesOnConditionCheckFailure='ALL_OLD'
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+            print(f"Error cancelling job {job_id}: {str(e)}")
+            raise
+        if 'Item' not in e.response:
+            return 404, {'error': f'Job {job_id} not found'}
+        return 409, {'error': f'Job {job_id} has already finished'}
+    
+    print(f"Cancelled job {job_id}")
+    return 200, {'jobId': job_id, 'status': 'CANCELLED', 'cancelRequestedTimestamp': now}
+
 def get_document_presigned_url(job_id):
     """Generate a presigned URL for a document associated with a job"""
     try:
@@ -5,11 +5,13 @@ import io
 import urllib.parse
 import re
 import gc
+import traceback
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from datetime import datetime, timezone
 from pdf2image import pdfinfo_from_path, convert_from_path
 from PIL import Image, ImageOps
+from page_records import encode_page_records, records_from_sections
 
 # Configure retry settings for AWS clients
 # Configure retry settings for Bedrock client only
@@ -110,6 +112,22 @@ def update_job_status(job_id, status, error_message=None):
         print(f"Failed to update job status: {e}")
 
 
+def is_job_cancelled(job_id):
+    """True once the job has been cancelled through the API"""
+    try:
+        response = dynamodb_client.get_item(
+            TableName=JOBS_TABLE,
+            Key={'jobId': {'S': job_id}},
+            ProjectionExpression='cancelRequested',
+            ConsistentRead=True
+        )
+        return response.get('Item', {}).get('cancelRequested', {}).get('BOOL', False)
+    except Exception as e:
+        # An unreadable flag must not fail the extraction
+        print(f"Failed to check cancellation of job {job_id}: {e}")
+        return False
+
+
 def lambda_handler(event, context):
     print("Received event:", json.dumps(event))
     batch_data = {}        # make sure this exists no matter what
@@ -137,6 +155,7 @@ def lambda_handler(event, context):
                 TableName=JOBS_TABLE,
                 Key={'jobId': {'S': job_id}},
                 UpdateExpression="SET #s = :s, #t = :t",
+                ConditionExpression="attribute_not_exists(cancelRequested)",
                 ExpressionAttributeNames={'#s': 'status', '#t': 'extractionStartTimestamp'},
                 ExpressionAttributeValues={':s': {'S': 'EXTRACTING'}, ':t': {'S': now}},
             )
@@ -185,6 +204,20 @@ def lambda_handler(event, context):
 
         # --- 6) Process each batch in sequence (Step Functions will parallelize via Map) ---
         for (first, last) in page_batches:
+            # Stop before spending Bedrock tokens on a cancelled job
+            if job_id and JOBS_TABLE and is_job_cancelled(job_id):
+                print(f"Job {job_id} was cancelled; skipping pages {first}–{last}")
+                update_job_status(job_id, "CANCELLED")
+                try:
+                    os.remove(local_path)
+                except OSError:
+                    pass
+                return {
+                    "status": "CANCELLED",
+                    "pages": {"start": page_batches[0][0], "end": page_batches[-1][1]},
+                    "chunkS3Key": None
+                }
+
             # Convert only this batch to images
             try:
                 imgs = convert_from_path(
@@ -253,11 +286,13 @@ def lambda_handler(event, context):
         except OSError:
             pass
 
-        chunk_key = f"{job_id}/extracted/{first_page}-{last_page}.json"
+        # One compressed JSON line per page (page_records layer); analyze streams these back
+        chunk_key = f"{job_id}/extracted/{first_page}-{last_page}.jsonl.gz"
         s3.put_object(
             Bucket=os.environ['EXTRACTION_BUCKET'],
             Key=chunk_key,
-            Body=json.dumps(batch_data),
+            Body=encode_page_records(records_from_sections(batch_data), codec='gzip'),
+            ContentType='application/gzip',
         )
         return {
             "pages": {"start": first_page, "end": last_page},
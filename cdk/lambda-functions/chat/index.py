@@ -4,6 +4,7 @@ import os
 import math
 from datetime import datetime, timezone
 from botocore.config import Config
+from page_records import decode_page_records, sections_from_records
 
 # Configure retry settings for AWS clients
 # Configure retry settings for Bedrock client only
@@ -176,6 +177,13 @@ def process_chat(job_id, messages):
         except json.JSONDecodeError:
             extracted_data = {}
             analysis_output = {}
+
+        # Jobs analyzed since the page record format store extracted data as compressed records
+        if 'extractedDataRecords' in item:
+            try:
+                extracted_data = sections_from_records(decode_page_records(item['extractedDataRecords']['B']))
+            except Exception as e:
+                print(f"Error decoding extractedDataRecords for job {job_id}: {e}")
         
         # Define common tools for all insurance types, now with the correct toolSpec structure
         common_tools = [
@@ -0,0 +1 @@
+../../../../page_records.py
\ No newline at end of file
@@ -141,6 +141,15 @@ export class CdkStack extends cdk.Stack {
       description: 'Strands Agents SDK and dependencies',
     });
 
+    // page_records.py from the repository root, shared with the Azure worker and API
+    const pageRecordsLayer = new lambda.LayerVersion(this, 'PageRecordsLayer', {
+      code: lambda.Code.fromAsset('lambda-layers/page-records', {
+        followSymlinks: cdk.SymlinkFollowMode.ALWAYS,
+      }),
+      compatibleRuntimes: [lambda.Runtime.PYTHON_3_12],
+      description: 'Compressed JSON-lines page record reader and writer',
+    });
+
     // Create common IAM policy statements for Lambda functions
     const bedrockPolicyStatement = new iam.PolicyStatement({
       effect: iam.Effect.ALLOW,
@@ -206,7 +215,7 @@ export class CdkStack extends cdk.Stack {
         JOBS_TABLE_NAME: jobsTable.tableName,
         // STATE_MACHINE_ARN will be added later
       },
-      layers: [boto3Layer],
+      layers: [boto3Layer, pageRecordsLayer],
     });
 
     // 2. Classify Lambda
@@ -252,7 +261,7 @@ export class CdkStack extends cdk.Stack {
         MAX_PAGES_FOR_EXTRACTION: '5',
         EXTRACTION_BUCKET: extractionBucket.bucketName
       },
-      layers: [pillowLayer, pdfProcessingLayer, boto3Layer],
+      layers: [pillowLayer, pdfProcessingLayer, boto3Layer, pageRecordsLayer],
     });
 
     // 5. Analyze Lambda
@@ -269,7 +278,7 @@ export class CdkStack extends cdk.Stack {
         JOBS_TABLE_NAME: jobsTable.tableName,
         EXTRACTION_BUCKET: extractionBucket.bucketName
       },
-      layers: [boto3Layer],
+      layers: [boto3Layer, pageRecordsLayer],
     });
 
     // 6. Act Lambda
@@ -299,7 +308,7 @@ export class CdkStack extends cdk.Stack {
         BEDROCK_CHAT_MODEL_ID: 'us.anthropic.claude-3-7-sonnet-20250219-v1:0',
         JOBS_TABLE_NAME: jobsTable.tableName,
       },
-      layers: [boto3Layer],
+      layers: [boto3Layer, pageRecordsLayer],
     });
 
     // 8. Cleanup Lambda - Archives and deletes old completed jobs
@@ -410,11 +419,19 @@ export class CdkStack extends cdk.Stack {
       payloadResponseOnly: true,
     });
 
+    // Jobs cancelled through the API stop after extraction without taking action
+    const cancelledChoice = new stepfunctions.Choice(this, 'JobCancelled?')
+      .when(
+        stepfunctions.Condition.stringEquals('$.analysis.status', 'CANCELLED'),
+        new stepfunctions.Succeed(this, 'JobCancelled')
+      )
+      .otherwise(actStep);
+
     classifyStep
       .next(generateBatchesStep)
       .next(parallelExtract)
       .next(analyzeStep)
-      .next(actStep);
+      .next(cancelledChoice);
 
     // Create a log group for the state machine
     const logGroup = new logs.LogGroup(this, 'DocumentProcessingLogGroup', {
@@ -607,6 +624,7 @@ export class CdkStack extends cdk.Stack {
     const jobsResource = apiResource.addResource('jobs');
     const jobByIdResource = jobsResource.addResource('{jobId}');
     const documentUrlResource = jobByIdResource.addResource('document-url');
+    const cancelResource = jobByIdResource.addResource('cancel');
 
     // Chat resources
     const chatResource = apiResource.addResource('chat');
@@ -620,6 +638,7 @@ export class CdkStack extends cdk.Stack {
     jobsResource.addMethod('GET', apiHandlerIntegration);
     jobByIdResource.addMethod('GET', apiHandlerIntegration);
     documentUrlResource.addMethod('GET', apiHandlerIntegration);
+    cancelResource.addMethod('POST', apiHandlerIntegration);
     uploadResource.addMethod('POST', apiHandlerIntegration);
     batchUploadResource.addMethod('POST', apiHandlerIntegration);
     statusResource.addMethod('GET', apiHandlerIntegration);
@@ -300,14 +300,22 @@ spec:
             limits:
               cpu: "2000m"
               memory: "2Gi"
+          ports:
+            - name: health
+              containerPort: 8081
           livenessProbe:
-            exec:
-              command:
-                - /bin/sh
-                - -c
-                - "[ -f /tmp/worker_alive ] && find /tmp -name 'worker_alive' -mmin -2"
+            httpGet:
+              path: /healthz
+              port: health
             initialDelaySeconds: 30
             periodSeconds: 30
+            failureThreshold: 3
+          readinessProbe:
+            httpGet:
+              path: /readyz
+              port: health
+            initialDelaySeconds: 10
+            periodSeconds: 10
           volumeMounts:
             - name: tmp
               mountPath: /tmp
@@ -130,6 +130,7 @@ function UploadPage() {
           filename: file.name,
           contentType: file.type,
           insuranceType: insuranceType,
+          fileSize: file.size,
         }),
       }
     );
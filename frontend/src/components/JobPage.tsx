@@ -79,6 +79,7 @@ import {
   faRobot,
   faEnvelope,
   faTimes,
+  faBan,
 } from "@fortawesome/free-solid-svg-icons";
 
 pdfjs.GlobalWorkerOptions.workerSrc = new URL(
@@ -185,7 +186,10 @@ interface JobApiResponse {
     key_value_pairs?: Record<string, string>;
     tables?: Array<{ name: string; rows: Array<Record<string, string>> }>;
   };
-  extractedDataJsonStr?: string;
+  // Claim-check pointers: heavy fields stored outside the job, fetched with ?include=
+  extractedDataRef?: Record<string, any>;
+  analysisRef?: Record<string, any>;
+  analysis?: Record<string, any>;
   analysisOutputJsonStr?: string;
   agentActionOutputJsonStr?: string;
   analysis_summary?: string;
@@ -426,6 +430,12 @@ const STATUS_MAPPING = {
     details:
       "Analysis complete! Review the detailed results and AI recommendations below.",
   },
+  CANCELLED: {
+    step: 5,
+    phase: "Cancelled",
+    details:
+      "This job was cancelled. Processing stopped before the next page was sent to the AI.",
+  },
   Failed: {
     step: 5,
     phase: "Failed",
@@ -552,11 +562,25 @@ export function JobPage({ jobId }: JobPageProps) {
           throw new Error(errorMsg);
         }
 
-        const jobApiData: JobApiResponse = await response.json();
+        let jobApiData: JobApiResponse = await response.json();
+
+        // Stored results are only referenced while polling; fetch them once the job has completed
+        if (
+          jobApiData.status?.toLowerCase() === "completed" &&
+          ((jobApiData.extractedDataRef && !jobApiData.extractedData) ||
+            (jobApiData.analysisRef && !jobApiData.analysis))
+        ) {
+          const fullResponse = await authenticatedFetch(
+            `${import.meta.env.VITE_API_URL}/jobs/${jobId}?include=extractedData,analysis`
+          );
+          if (fullResponse.ok) {
+            jobApiData = await fullResponse.json();
+          }
+        }
 
         const pageAnalysisTransformed: Record<string, PageData> = {};
 
-        // First try to use directly provided extractedData
+        // The API decodes stored page records (or the JSON string of older jobs) into extractedData
         if (jobApiData.extractedData) {
           try {
             console.log(
@@ -588,57 +612,11 @@ export function JobPage({ jobId }: JobPageProps) {
           } catch (directError) {
             console.error("Error processing extractedData:", directError);
           }
-        }
-        // Then fall back to extractedDataJsonStr if needed
-        else if (jobApiData.extractedDataJsonStr) {
-          try {
-            const parsedExtraction = JSON.parse(
-              jobApiData.extractedDataJsonStr
-            );
-            if (
-              typeof parsedExtraction === "object" &&
-              parsedExtraction !== null
-            ) {
-              for (const key in parsedExtraction) {
-                if (
-                  Object.prototype.hasOwnProperty.call(parsedExtraction, key)
-                ) {
-                  const value = parsedExtraction[key];
-                  // Create a human-readable title from the key
-                  const title = key
-                    .replace(/_/g, " ")
-                    .replace(/\\b\\w/g, (char) => char.toUpperCase());
-                  pageAnalysisTransformed[key] = {
-                    page_type: title, // This will be the group title
-                    content: `\`\`\`json\\n${JSON.stringify(
-                      value,
-                      null,
-                      2
-                    )}\\n\`\`\``, // Markdown for JSON code block
-                    // numeric_page_num_for_nav can be omitted or set to a default like 1 if not applicable
-                  };
-                }
-              }
-              console.log("Populated page_analysis from extractedDataJsonStr");
-            } else {
-              console.warn(
-                "extractedDataJsonStr did not parse to a valid object."
-              );
-              // Optionally, could put the raw string into a single PageData entry here as a fallback
-            }
-          } catch (parseError) {
-            console.error("Error parsing extractedDataJsonStr:", parseError);
-            // Fallback: put the raw string into a single PageData entry
-            pageAnalysisTransformed["raw_extracted_data"] = {
-              page_type: "Raw Extracted Data (Parse Error)",
-              content: `\`\`\`text\\n${jobApiData.extractedDataJsonStr}\\n\`\`\``,
-            };
-          }
         } else if (
           jobApiData.extracted_data?.sections &&
           jobApiData.extracted_data.sections.length > 0
         ) {
-          // Fallback to existing sections logic if extractedDataJsonStr is not present
+          // Fallback to existing sections logic if extractedData is not present
           jobApiData.extracted_data.sections.forEach((section, index) => {
             const key = section.title || `section-${index}`;
             let content = section.content || "";
@@ -958,8 +936,8 @@ export function JobPage({ jobId }: JobPageProps) {
           setPhaseDetails(statusInfo.details);
 
           // Handle polling logic based on status
-          if (statusKey === "COMPLETE") {
-            // Stop polling when complete
+          if (statusKey === "COMPLETE" || statusKey === "CANCELLED") {
+            // Stop polling when complete or cancelled
             if (pollingIntervalRef.current) {
               console.log("Job completed - stopping polling");
               clearInterval(pollingIntervalRef.current);
@@ -1030,6 +1008,22 @@ export function JobPage({ jobId }: JobPageProps) {
     [jobId]
   );
 
+  const cancelJob = useCallback(async () => {
+    try {
+      const response = await authenticatedFetch(
+        `${import.meta.env.VITE_API_URL}/jobs/${jobId}/cancel`,
+        { method: "POST" }
+      );
+      // 409 means the job finished first; the refresh below shows its final state
+      if (!response.ok && response.status !== 409) {
+        throw new Error(`Failed to cancel job: ${response.status}`);
+      }
+    } catch (error) {
+      console.error("Error cancelling job:", error);
+    }
+    fetchJobDetailsAndUpdateState(true);
+  }, [jobId, fetchJobDetailsAndUpdateState]);
+
   useEffect(() => {
     fetchJobDetailsAndUpdateState();
 
@@ -1417,6 +1411,11 @@ export function JobPage({ jobId }: JobPageProps) {
                 onClick={() => setIsHowItWorksOpen(true)}>
                 <FontAwesomeIcon icon={faInfoCircle} /> How It Works
               </button>
+              {currentStep < 5 && (
+                <button type="button" onClick={cancelJob} className="nav-button">
+                  <FontAwesomeIcon icon={faBan} /> Cancel Job
+                </button>
+              )}
             </div>
           </div>
           <div className="job-header">
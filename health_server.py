@@ -0,0 +1,107 @@
+"""
+Liveness and readiness server for the GenAI Underwriting Workbench worker (Azure version)
+Liveness is built from heartbeats: each monitored loop (the receive loop, the event loop,
+a running job) beats periodically and the pod is live while every heartbeat is fresher
+than its timeout. Readiness is true once the Azure clients are initialized, while the
+worker is accepting messages (false when draining or saturated) and while the circuits
+for the worker's critical downstreams are closed.
+Serves GET /healthz and GET /readyz on HEALTH_PORT.
+"""
+
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from retry_policy import retry_stats
+
+logger = logging.getLogger(__name__)
+
+
+class HealthState:
+    """Heartbeats and readiness flags shared by the worker's threads"""
+
+    def __init__(self, critical_downstreams: Iterable[str] = ('cosmos', 'servicebus')):
+        self.critical_downstreams = tuple(critical_downstreams)
+        self._heartbeats: Dict[str, Tuple[float, float]] = {}
+        self._conditions: Dict[str, str] = {'clients': 'initializing'}
+        self._lock = threading.Lock()
+
+    def beat(self, name: str, timeout: Optional[float] = None):
+        """Record a heartbeat; timeout (seconds) defaults to the one this heartbeat last used"""
+        with self._lock:
+            previous_timeout = self._heartbeats.get(name, (0.0, 120.0))[1]
+            self._heartbeats[name] = (time.monotonic(), timeout if timeout is not None else previous_timeout)
+
+    def stop(self, name: str):
+        """Stop monitoring a heartbeat"""
+        with self._lock:
+            self._heartbeats.pop(name, None)
+
+    @contextmanager
+    def monitored(self, name: str, timeout: float):
+        """Monitor a heartbeat for the duration of the block (e.g. a job that beats per page)"""
+        self.beat(name, timeout)
+        try:
+            yield
+        finally:
+            self.stop(name)
+
+    def set_condition(self, name: str, reason: Optional[str]):
+        """Mark the worker not ready for reason, or clear the condition with None"""
+        with self._lock:
+            if reason is None:
+                self._conditions.pop(name, None)
+            else:
+                self._conditions[name] = reason
+
+    def liveness(self) -> Tuple[bool, Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            ages = {name: (now - beat, timeout) for name, (beat, timeout) in self._heartbeats.items()}
+        stale = sorted(name for name, (age, timeout) in ages.items() if age > timeout)
+        return not stale, {
+            'heartbeats': {name: round(age, 1) for name, (age, _) in ages.items()},
+            'stale': stale
+        }
+
+    def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        with self._lock:
+            conditions = dict(self._conditions)
+        for downstream, counters in retry_stats().items():
+            if downstream in self.critical_downstreams and counters.get('circuitState', 'closed') != 'closed':
+                conditions[downstream] = f"circuit {counters['circuitState']}"
+        return not conditions, {'notReady': conditions}
+
+
+def start_health_server(state: HealthState, port: int) -> Optional[ThreadingHTTPServer]:
+    """Serve /healthz and /readyz from a daemon thread (port 0 disables the server)"""
+    if not port:
+        return None
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/healthz':
+                ok, details = state.liveness()
+            elif self.path == '/readyz':
+                ok, details = state.readiness()
+            else:
+                self.send_error(404)
+                return
+            body = json.dumps({'status': 'ok' if ok else 'unavailable', **details}).encode('utf-8')
+            self.send_response(200 if ok else 503)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    server = ThreadingHTTPServer(('', port), Handler)
+    threading.Thread(target=server.serve_forever, name='health-server', daemon=True).start()
+    logger.info(f"Serving health checks on port {port}")
+    return server
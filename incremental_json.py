@@ -0,0 +1,134 @@
+"""
+Incremental JSON parsing for streamed completions in GenAI Underwriting Workbench (Azure version)
+Scans a JSON object as its text arrives and reports each top-level field once its value is
+complete, and each element of selected top-level arrays (e.g. risks) as soon as that element
+closes, so partial results can be published before the completion ends. Text before the
+opening brace (a ```json fence, a preamble) is skipped; the caller still parses and validates
+the full text at the end.
+"""
+
+import json
+import logging
+from typing import Any, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ('field', key, value) for a completed top-level field, ('item', key, value) for an array element
+Event = Tuple[str, str, Any]
+
+WHITESPACE = ' \t\r\n'
+
+
+class _Frame:
+    """An open object or array"""
+
+    __slots__ = ('kind', 'start', 'key', 'expect_key', 'scalar_start')
+
+    def __init__(self, kind: str, start: int, key: Optional[str]):
+        self.kind = kind
+        self.start = start
+        # Object frames: the key being read or last read; array frames: the key that holds the array
+        self.key = key
+        self.expect_key = kind == 'object'
+        self.scalar_start: Optional[int] = None
+
+
+class IncrementalJSONParser:
+    """Feed text chunks; returns the events completed by each chunk"""
+
+    def __init__(self, item_fields: Iterable[str] = ()):
+        self.item_fields = set(item_fields)
+        self.done = False
+        self._text = ''
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._string_is_key = False
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return self._text
+
+    def feed(self, chunk: str) -> List[Event]:
+        self._text += chunk
+        events: List[Event] = []
+        text = self._text
+
+        while self._pos < len(text) and not self.done:
+            i, c = self._pos, text[self._pos]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    frame = self._stack[-1]
+                    if self._string_is_key:
+                        frame.key = self._decode(self._string_start, i + 1)
+                    else:
+                        self._complete(frame, self._string_start, i + 1, events)
+                continue
+
+            if not self._stack:
+                if c == '{':
+                    self._stack.append(_Frame('object', i, None))
+                continue
+
+            frame = self._stack[-1]
+            if c in WHITESPACE:
+                self._end_scalar(frame, i, events)
+            elif c == '"':
+                self._in_string = True
+                self._string_start = i
+                self._string_is_key = frame.kind == 'object' and frame.expect_key
+            elif c in '{[':
+                # Arrays directly under the root remember their key so their elements can be reported
+                key = frame.key if len(self._stack) == 1 else None
+                self._stack.append(_Frame('object' if c == '{' else 'array', i, key))
+            elif c in '}]':
+                self._end_scalar(frame, i, events)
+                closed = self._stack.pop()
+                if self._stack:
+                    self._complete(self._stack[-1], closed.start, i + 1, events)
+                else:
+                    self.done = True
+            elif c == ':':
+                frame.expect_key = False
+            elif c == ',':
+                self._end_scalar(frame, i, events)
+                frame.expect_key = frame.kind == 'object'
+            elif frame.scalar_start is None:
+                frame.scalar_start = i
+
+        return events
+
+    def _end_scalar(self, frame: _Frame, end: int, events: List[Event]):
+        if frame.scalar_start is not None:
+            start, frame.scalar_start = frame.scalar_start, None
+            self._complete(frame, start, end, events)
+
+    def _complete(self, frame: _Frame, start: int, end: int, events: List[Event]):
+        """A value spanning text[start:end] closed inside frame"""
+        depth = len(self._stack)
+        if depth == 1 and frame.kind == 'object':
+            kind = 'field'
+        elif depth == 2 and frame.kind == 'array' and frame.key in self.item_fields:
+            kind = 'item'
+        else:
+            return
+        value = self._decode(start, end)
+        if value is not None or self._text[start:end] == 'null':
+            events.append((kind, frame.key, value))
+
+    def _decode(self, start: int, end: int) -> Any:
+        try:
+            return json.loads(self._text[start:end])
+        except ValueError:
+            logger.debug(f"Skipping undecodable streamed value: {self._text[start:end][:80]!r}")
+            return None
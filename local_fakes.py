@@ -0,0 +1,1290 @@
+"""
+In-process stand-ins for Cosmos DB, Blob Storage, Service Bus and Azure OpenAI (Azure version)
+Selected with AZURE_BACKEND=local: the client getters in worker.AzureClients and api-server.py
+then return these fakes instead of SDK clients, so an upload -> process -> complete flow runs
+in one process with no network. The fakes keep the SDK call shapes the repo uses, raise the
+SDK's own exception types, sleep for latencies drawn from configurable distributions, inject
+429s, and account Cosmos request units and OpenAI tokens so load tests can find ceilings.
+
+Configuration (environment, read when the backend is created or reset):
+    LOCAL_LATENCY_<SERVICE>        latency distribution per call, SERVICE in COSMOS, BLOB,
+                                   SERVICEBUS, OPENAI (OpenAI: time to first token), e.g.
+                                   fixed:0.01 | uniform:0.005,0.02 | lognormal:0.008,0.4 |
+                                   normal:0.01,0.002 | exp:0.01 | 0
+    LOCAL_LATENCY_SCALE            multiplier for every latency (0 disables sleeping)
+    LOCAL_THROTTLE_RATE_<SERVICE>  probability that a call fails with a 429
+    LOCAL_COSMOS_RU_PER_SECOND     provisioned throughput; requests beyond it get 429s (0: unlimited)
+    LOCAL_OPENAI_TPM               deployment tokens-per-minute quota (0: unlimited)
+    LOCAL_OPENAI_TOKENS_PER_SECOND completion generation speed
+    LOCAL_BLOB_MBPS                blob transfer speed added to the per-call latency
+    LOCAL_SERVICEBUS_LOCK_SECONDS  peek-lock duration
+    LOCAL_SERVICEBUS_MAX_DELIVERY_COUNT  deliveries before a message is dead-lettered
+    LOCAL_FAKE_SEED                seed for latency sampling, throttling and generated content
+"""
+
+import os
+import re
+import copy
+import json
+import math
+import time
+import uuid
+import random
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from azure.core import MatchConditions
+from azure.core.exceptions import HttpResponseError, ResourceExistsError, ResourceNotFoundError
+from azure.cosmos import exceptions as cosmos_exceptions
+from azure.servicebus.exceptions import MessageLockLostError, ServiceBusServerBusyError
+
+logger = logging.getLogger(__name__)
+
+SERVICES = ('cosmos', 'blob', 'servicebus', 'openai')
+
+DEFAULT_LATENCIES = {
+    'cosmos': 'lognormal:0.006,0.4',
+    'blob': 'lognormal:0.02,0.5',
+    'servicebus': 'lognormal:0.01,0.4',
+    'openai': 'lognormal:0.8,0.5',
+}
+
+# Approximate request charges: about 1 RU per KB read and 5.5 RU per KB written
+READ_RU_PER_KB = 1.0
+WRITE_RU_PER_KB = 5.5
+QUERY_BASE_RU = 2.8
+QUERY_RU_PER_SCANNED_DOCUMENT = 0.05
+
+
+def enabled() -> bool:
+    """True when AZURE_BACKEND selects the local stand-ins"""
+    return os.environ.get('AZURE_BACKEND', 'azure').lower() == 'local'
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, str(default)))
+
+
+class LatencyModel:
+    """A latency distribution parsed from a spec such as lognormal:0.008,0.4"""
+
+    def __init__(self, spec: str):
+        self.spec = spec.strip() or '0'
+        kind, _, args = self.spec.partition(':')
+        self.kind = kind.lower()
+        self.args = [float(arg) for arg in args.split(',') if arg.strip()]
+        if self.kind not in ('0', 'none', 'fixed', 'uniform', 'lognormal', 'normal', 'exp'):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind in ('0', 'none'):
+            return 0.0
+        if self.kind == 'fixed':
+            return self.args[0]
+        if self.kind == 'uniform':
+            return rng.uniform(self.args[0], self.args[1])
+        if self.kind == 'lognormal':
+            # Parameterized by the median and the sigma of the underlying normal
+            return self.args[0] * math.exp(rng.gauss(0.0, self.args[1]))
+        if self.kind == 'normal':
+            return max(0.0, rng.gauss(self.args[0], self.args[1]))
+        return rng.expovariate(1.0 / self.args[0])
+
+
+class TokenBucket:
+    """Capacity refilled continuously at rate per second"""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self._level = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, amount: float) -> Tuple[bool, float, float]:
+        """Take amount if available; returns (taken, seconds until it would be, level left)"""
+        with self._lock:
+            now = time.monotonic()
+            self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+            self._updated = now
+            if amount <= self._level:
+                self._level -= amount
+                return True, 0.0, self._level
+            return False, (min(amount, self.capacity) - self._level) / self.rate, self._level
+
+
+class ServiceProfile:
+    """Latency, throttling and call counters for one fake service"""
+
+    def __init__(self, name: str, rng: random.Random):
+        self.name = name
+        self.rng = rng
+        self.latency = LatencyModel(os.environ.get(f'LOCAL_LATENCY_{name.upper()}', DEFAULT_LATENCIES[name]))
+        self.throttle_rate = _env_float(f'LOCAL_THROTTLE_RATE_{name.upper()}', 0.0)
+        self.scale = _env_float('LOCAL_LATENCY_SCALE', 1.0)
+        self.counters: Dict[str, float] = {'calls': 0, 'throttled': 0, 'latencySeconds': 0.0}
+        self.operations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def count(self, name: str, amount: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def call(self, operation: str, extra_seconds: float = 0.0) -> bool:
+        """Sleep for one call's latency; returns True when the call should be throttled"""
+        with self._lock:
+            delay = (self.latency.sample(self.rng) + extra_seconds) * self.scale
+            throttled = self.throttle_rate > 0 and self.rng.random() < self.throttle_rate
+            self.counters['calls'] += 1
+            self.counters['latencySeconds'] += delay
+            self.operations[operation] = self.operations.get(operation, 0) + 1
+            if throttled:
+                self.counters['throttled'] += 1
+        if delay > 0:
+            time.sleep(delay)
+        return throttled
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            counters['latencySeconds'] = round(counters['latencySeconds'], 3)
+            return {**counters, 'operations': dict(self.operations)}
+
+
+# ---------------------------------------------------------------------------
+# Cosmos DB
+# ---------------------------------------------------------------------------
+
+def _cosmos_error(cls, status_code: int, message: str, headers: Optional[Dict[str, str]] = None):
+    error = cls(status_code=status_code, message=message)
+    error.headers = headers or {}
+    return error
+
+
+def _size_kb(document: Any) -> float:
+    return len(json.dumps(document, default=str)) / 1024.0
+
+
+_TOKEN_PATTERN = re.compile(
+    r"\s*(?:(?P<string>'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")|(?P<number>-?\d+(?:\.\d+)?)"
+    r"|(?P<op>!=|<>|<=|>=|=|<|>|\(|\)|,)|(?P<param>@\w+)|(?P<name>[A-Za-z_][\w.\[\]\"']*))"
+)
+
+
+class CosmosQuery:
+    """
+    The subset of Cosmos SQL the repo issues: SELECT [TOP n] [VALUE] (* | alias | paths |
+    COUNT(1)) FROM alias [WHERE conditions] [ORDER BY path [ASC|DESC]], with AND/OR/NOT,
+    comparisons, IS_DEFINED, IS_NULL, STARTSWITH, ARRAY_CONTAINS and @parameters.
+    """
+
+    _STATEMENT = re.compile(
+        r"^\s*SELECT\s+(?:TOP\s+(?P<top>\d+)\s+)?(?P<value>VALUE\s+)?(?P<select>.+?)\s+FROM\s+(?P<alias>\w+)"
+        r"(?:\s+WHERE\s+(?P<where>.+?))?(?:\s+ORDER\s+BY\s+(?P<order>\S+)(?:\s+(?P<direction>ASC|DESC))?)?\s*$",
+        re.IGNORECASE | re.DOTALL
+    )
+
+    def __init__(self, query: str, parameters: Optional[List[Dict[str, Any]]] = None):
+        match = self._STATEMENT.match(query)
+        if not match:
+            raise _cosmos_error(cosmos_exceptions.CosmosHttpResponseError, 400, f"Unsupported query: {query}")
+        self.alias = match.group('alias')
+        self.top = int(match.group('top')) if match.group('top') else None
+        self.value = bool(match.group('value'))
+        self.select = match.group('select').strip()
+        self.order = match.group('order')
+        self.descending = (match.group('direction') or '').upper() == 'DESC'
+        self.parameters = {p['name']: p['value'] for p in parameters or []}
+        self.where = self._parse_condition(match.group('where')) if match.group('where') else None
+
+    @classmethod
+    def predicate(cls, filter_predicate: str) -> 'CosmosQuery':
+        """Parse a patch filter predicate such as FROM c WHERE c.status != 'completed'"""
+        return cls(f"SELECT * {filter_predicate}")
+
+    def run(self, documents: Iterable[Dict[str, Any]]) -> List[Any]:
+        matched = [doc for doc in documents if self.where is None or self._truthy(self.where, doc)]
+        if self.order:
+            present = [doc for doc in matched if self._path(doc, self.order) is not None]
+            missing = [doc for doc in matched if self._path(doc, self.order) is None]
+            present.sort(key=lambda doc: self._path(doc, self.order), reverse=self.descending)
+            matched = present + missing
+        if self.select.upper().replace(' ', '') == 'COUNT(1)':
+            return [len(matched)] if self.value else [{'$1': len(matched)}]
+        if self.top is not None:
+            matched = matched[:self.top]
+        return [self._project(doc) for doc in matched]
+
+    def _project(self, doc: Dict[str, Any]) -> Any:
+        if self.select in ('*', self.alias):
+            return copy.deepcopy(doc)
+        paths = [path.strip() for path in self.select.split(',')]
+        if self.value:
+            return copy.deepcopy(self._path(doc, paths[0]))
+        projected = {}
+        for path in paths:
+            value = self._path(doc, path)
+            if value is not None:
+                projected[path.split('.')[-1]] = copy.deepcopy(value)
+        return projected
+
+    def _path(self, doc: Dict[str, Any], path: str) -> Any:
+        parts = path.split('.')
+        if parts[0] != self.alias:
+            raise _cosmos_error(cosmos_exceptions.CosmosHttpResponseError, 400, f"Unknown alias in {path}")
+        value: Any = doc
+        for part in parts[1:]:
+            if not isinstance(value, dict) or part not in value:
+                return None
+            value = value[part]
+        return value
+
+    # Conditions are parsed into nested tuples and evaluated per document
+    def _parse_condition(self, text: str):
+        tokens = []
+        position = 0
+        while position < len(text):
+            match = _TOKEN_PATTERN.match(text, position)
+            if not match or match.end() == position:
+                if text[position:].strip():
+                    raise _cosmos_error(cosmos_exceptions.CosmosHttpResponseError, 400, f"Cannot parse: {text}")
+                break
+            kind = match.lastgroup
+            tokens.append((kind, match.group(kind)))
+            position = match.end()
+        self._tokens, self._index = tokens, 0
+        condition = self._or()
+        if self._index != len(self._tokens):
+            raise _cosmos_error(cosmos_exceptions.CosmosHttpResponseError, 400, f"Cannot parse: {text}")
+        return condition
+
+    def _peek(self, upper: bool = True):
+        if self._index >= len(self._tokens):
+            return None
+        kind, value = self._tokens[self._index]
+        return value.upper() if upper and kind == 'name' else value
+
+    def _next(self):
+        token = self._tokens[self._index]
+        self._index += 1
+        return token
+
+    def _or(self):
+        node = self._and()
+        while self._peek() == 'OR':
+            self._next()
+            node = ('or', node, self._and())
+        return node
+
+    def _and(self):
+        node = self._not()
+        while self._peek() == 'AND':
+            self._next()
+            node = ('and', node, self._not())
+        return node
+
+    def _not(self):
+        if self._peek() == 'NOT':
+            self._next()
+            return ('not', self._not())
+        return self._comparison()
+
+    def _comparison(self):
+        if self._peek() == '(':
+            self._next()
+            node = self._or()
+            self._next()
+            return node
+        left = self._operand()
+        if self._peek() in ('=', '!=', '<>', '<', '>', '<=', '>='):
+            operator = self._next()[1]
+            return ('compare', operator, left, self._operand())
+        return ('truthy', left)
+
+    def _operand(self):
+        kind, value = self._next()
+        if kind == 'string':
+            return ('literal', json.loads('"' + value[1:-1].replace('"', '\\"').replace("\\'", "'") + '"'))
+        if kind == 'number':
+            return ('literal', float(value) if '.' in value else int(value))
+        if kind == 'param':
+            return ('literal', self.parameters.get(value))
+        upper = value.upper()
+        if upper in ('TRUE', 'FALSE', 'NULL'):
+            return ('literal', {'TRUE': True, 'FALSE': False, 'NULL': None}[upper])
+        if self._peek() == '(':
+            self._next()
+            args = []
+            while self._peek() != ')':
+                if self._peek() == ',':
+                    self._next()
+                    continue
+                args.append(self._operand())
+            self._next()
+            return ('call', upper, args)
+        return ('path', value)
+
+    def _evaluate(self, node, doc):
+        kind = node[0]
+        if kind == 'literal':
+            return node[1]
+        if kind == 'path':
+            return self._path(doc, node[1])
+        if kind == 'call':
+            name, args = node[1], node[2]
+            values = [self._evaluate(arg, doc) for arg in args]
+            if name == 'IS_DEFINED':
+                return args[0][0] == 'path' and self._defined(doc, args[0][1])
+            if name == 'IS_NULL':
+                return values[0] is None
+            if name == 'STARTSWITH':
+                return isinstance(values[0], str) and values[0].startswith(values[1])
+            if name == 'ARRAY_CONTAINS':
+                return isinstance(values[0], list) and values[1] in values[0]
+            raise _cosmos_error(cosmos_exceptions.CosmosHttpResponseError, 400, f"Unsupported function {name}")
+        return self._truthy(node, doc)
+
+    def _defined(self, doc, path: str) -> bool:
+        value: Any = doc
+        for part in path.split('.')[1:]:
+            if not isinstance(value, dict) or part not in value:
+                return False
+            value = value[part]
+        return True
+
+    def _truthy(self, node, doc) -> bool:
+        kind = node[0]
+        if kind == 'and':
+            return self._truthy(node[1], doc) and self._truthy(node[2], doc)
+        if kind == 'or':
+            return self._truthy(node[1], doc) or self._truthy(node[2], doc)
+        if kind == 'not':
+            return not self._truthy(node[1], doc)
+        if kind == 'truthy':
+            return self._evaluate(node[1], doc) is True
+        if kind == 'compare':
+            operator, left, right = node[1], self._evaluate(node[2], doc), self._evaluate(node[3], doc)
+            if operator == '=':
+                return left == right
+            if operator in ('!=', '<>'):
+                # Cosmos comparisons with an undefined property are undefined, so they never match
+                return left is not None and left != right
+            if left is None or right is None or type(left) is not type(right) and not (
+                    isinstance(left, (int, float)) and isinstance(right, (int, float))):
+                return False
+            return {'<': left < right, '>': left > right, '<=': left <= right, '>=': left >= right}[operator]
+        return bool(self._evaluate(node, doc))
+
+
+class FakeCosmosContainer:
+    """Container client over an in-memory dict, charging approximate request units"""
+
+    def __init__(self, account: 'FakeCosmosClient', name: str, partition_key_path: str = '/id'):
+        self.account = account
+        self.id = name
+        self.partition_key_path = partition_key_path
+        self.client_connection = SimpleNamespace(last_response_headers={})
+        self.request_units: Dict[str, float] = {}
+        self._items: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+
+    def _partition_key(self, body: Dict[str, Any]) -> str:
+        value: Any = body
+        for part in self.partition_key_path.strip('/').split('/'):
+            value = value.get(part) if isinstance(value, dict) else None
+        return json.dumps(value)
+
+    def _begin(self, operation: str, estimated_charge: float):
+        """Latency, injected throttling and the provisioned-throughput check for one request"""
+        profile = self.account.profile
+        if profile.call(operation):
+            raise _cosmos_error(cosmos_exceptions.CosmosHttpResponseError, 429, "Request rate is large (injected)",
+                                {'x-ms-retry-after-ms': '100'})
+        bucket = self.account.ru_bucket
+        if bucket is not None:
+            taken, wait, _ = bucket.take(estimated_charge)
+            if not taken:
+                profile.count('throttled')
+                profile.count('ruThrottled')
+                raise _cosmos_error(cosmos_exceptions.CosmosHttpResponseError, 429, "Request rate is large",
+                                    {'x-ms-retry-after-ms': str(max(1, int(wait * 1000)))})
+
+    def _charge(self, operation: str, charge: float):
+        charge = round(charge, 2)
+        self.client_connection.last_response_headers = {'x-ms-request-charge': str(charge)}
+        with self._lock:
+            self.request_units[operation] = self.request_units.get(operation, 0.0) + charge
+        self.account.profile.count('requestUnits', charge)
+
+    def _live(self, key) -> Optional[Dict[str, Any]]:
+        document = self._items.get(key)
+        if document is None:
+            return None
+        ttl = document.get('ttl')
+        if isinstance(ttl, (int, float)) and ttl > 0 and document['_ts'] + ttl < time.time():
+            del self._items[key]
+            return None
+        return document
+
+    def _store(self, key, body: Dict[str, Any]) -> Dict[str, Any]:
+        document = copy.deepcopy(body)
+        document['_etag'] = f'"{uuid.uuid4()}"'
+        document['_ts'] = int(time.time())
+        self._items[key] = document
+        return copy.deepcopy(document)
+
+    def _not_found(self, item: str):
+        self._charge('read', READ_RU_PER_KB)
+        return _cosmos_error(cosmos_exceptions.CosmosResourceNotFoundError, 404, f"Entity {item} does not exist")
+
+    def _check_etag(self, document: Dict[str, Any], etag: Optional[str], match_condition):
+        if etag and match_condition == MatchConditions.IfNotModified and document.get('_etag') != etag:
+            raise _cosmos_error(cosmos_exceptions.CosmosAccessConditionFailedError, 412, "Precondition failed (etag)")
+
+    def read_item(self, item: str, partition_key: Any, **kwargs) -> Dict[str, Any]:
+        self._begin('read_item', READ_RU_PER_KB)
+        with self._lock:
+            document = self._live((json.dumps(partition_key), item))
+            if document is None:
+                raise self._not_found(item)
+            self._charge('read', max(1.0, _size_kb(document)) * READ_RU_PER_KB)
+            return copy.deepcopy(document)
+
+    def create_item(self, body: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        kb = _size_kb(body)
+        self._begin('create_item', max(1.0, kb) * WRITE_RU_PER_KB)
+        with self._lock:
+            key = (self._partition_key(body), body['id'])
+            if self._live(key) is not None:
+                raise _cosmos_error(cosmos_exceptions.CosmosResourceExistsError, 409, f"Entity {body['id']} exists")
+            self._charge('write', max(1.0, kb) * WRITE_RU_PER_KB)
+            return self._store(key, body)
+
+    def upsert_item(self, body: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        kb = _size_kb(body)
+        self._begin('upsert_item', max(1.0, kb) * WRITE_RU_PER_KB)
+        with self._lock:
+            key = (self._partition_key(body), body['id'])
+            existing = self._live(key)
+            if existing is not None:
+                self._check_etag(existing, kwargs.get('etag'), kwargs.get('match_condition'))
+            self._charge('write', max(1.0, kb) * WRITE_RU_PER_KB)
+            return self._store(key, body)
+
+    def replace_item(self, item: Any, body: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        item_id = item['id'] if isinstance(item, dict) else item
+        kb = _size_kb(body)
+        self._begin('replace_item', max(1.0, kb) * WRITE_RU_PER_KB)
+        with self._lock:
+            key = (self._partition_key(body), item_id)
+            existing = self._live(key)
+            if existing is None:
+                raise self._not_found(item_id)
+            self._check_etag(existing, kwargs.get('etag'), kwargs.get('match_condition'))
+            self._charge('write', max(1.0, kb) * WRITE_RU_PER_KB)
+            return self._store(key, body)
+
+    def delete_item(self, item: Any, partition_key: Any, **kwargs):
+        item_id = item['id'] if isinstance(item, dict) else item
+        self._begin('delete_item', WRITE_RU_PER_KB)
+        with self._lock:
+            key = (json.dumps(partition_key), item_id)
+            existing = self._live(key)
+            if existing is None:
+                raise self._not_found(item_id)
+            self._check_etag(existing, kwargs.get('etag'), kwargs.get('match_condition'))
+            del self._items[key]
+            self._charge('write', max(1.0, _size_kb(existing)) * WRITE_RU_PER_KB)
+
+    def patch_item(self, item: str, partition_key: Any, patch_operations: List[Dict[str, Any]],
+                   filter_predicate: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        self._begin('patch_item', WRITE_RU_PER_KB)
+        with self._lock:
+            key = (json.dumps(partition_key), item)
+            existing = self._live(key)
+            if existing is None:
+                raise self._not_found(item)
+            self._check_etag(existing, kwargs.get('etag'), kwargs.get('match_condition'))
+            if filter_predicate and not CosmosQuery.predicate(filter_predicate).run([existing]):
+                self._charge('write', READ_RU_PER_KB)
+                raise _cosmos_error(cosmos_exceptions.CosmosAccessConditionFailedError, 412,
+                                    "Precondition failed (filter predicate)")
+            document = copy.deepcopy(existing)
+            for operation in patch_operations:
+                _apply_patch(document, operation)
+            # Cosmos charges a patch like a write of the resulting document
+            self._charge('write', max(1.0, _size_kb(document)) * WRITE_RU_PER_KB)
+            return self._store(key, document)
+
+    def query_items(self, query: str, parameters: Optional[List[Dict[str, Any]]] = None,
+                    partition_key: Any = None, **kwargs):
+        parsed = CosmosQuery(query, parameters)
+        self._begin('query_items', QUERY_BASE_RU)
+        with self._lock:
+            documents = [doc for key, doc in list(self._items.items()) if self._live(key) is not None]
+            if partition_key is not None:
+                documents = [doc for doc in documents if self._partition_key(doc) == json.dumps(partition_key)]
+            results = parsed.run(documents)
+            self._charge('query', QUERY_BASE_RU + QUERY_RU_PER_SCANNED_DOCUMENT * len(documents)
+                         + READ_RU_PER_KB * _size_kb(results))
+        return iter(results)
+
+    def read(self, **kwargs) -> Dict[str, Any]:
+        return {'id': self.id, 'partitionKey': {'paths': [self.partition_key_path]}}
+
+
+def _apply_patch(document: Dict[str, Any], operation: Dict[str, Any]):
+    """Apply one Cosmos patch operation (set, add, replace, remove, incr) to a document"""
+    op, path = operation['op'], operation['path']
+    parts = [part for part in path.strip('/').split('/')]
+    parent: Any = document
+    for part in parts[:-1]:
+        parent = parent[int(part)] if isinstance(parent, list) else parent.setdefault(part, {})
+    last = parts[-1]
+
+    def bad_request(reason: str):
+        return _cosmos_error(cosmos_exceptions.CosmosHttpResponseError, 400, f"Patch {op} {path}: {reason}")
+
+    if isinstance(parent, list):
+        index = len(parent) if last == '-' else int(last)
+        if op == 'add':
+            parent.insert(index, operation['value'])
+        elif op in ('set', 'replace'):
+            parent[index] = operation['value']
+        elif op == 'remove':
+            parent.pop(index)
+        elif op == 'incr':
+            parent[index] += operation['value']
+        return
+
+    if op in ('set', 'add'):
+        parent[last] = operation['value']
+    elif op == 'replace':
+        if last not in parent:
+            raise bad_request("property does not exist")
+        parent[last] = operation['value']
+    elif op == 'remove':
+        if last not in parent:
+            raise bad_request("property does not exist")
+        del parent[last]
+    elif op == 'incr':
+        current = parent.get(last, 0)
+        if not isinstance(current, (int, float)):
+            raise bad_request("property is not a number")
+        parent[last] = current + operation['value']
+    else:
+        raise bad_request("unsupported operation")
+
+
+class FakeCosmosDatabase:
+    def __init__(self, account: 'FakeCosmosClient', name: str):
+        self.account = account
+        self.id = name
+        self._containers: Dict[str, FakeCosmosContainer] = {}
+        self._lock = threading.Lock()
+
+    def get_container_client(self, container: str) -> FakeCosmosContainer:
+        with self._lock:
+            if container not in self._containers:
+                self._containers[container] = FakeCosmosContainer(self.account, container)
+            return self._containers[container]
+
+
+class FakeCosmosClient:
+    """CosmosClient stand-in; databases and containers spring into existence on first use"""
+
+    def __init__(self, profile: ServiceProfile):
+        self.profile = profile
+        ru_per_second = _env_float('LOCAL_COSMOS_RU_PER_SECOND', 0)
+        self.ru_bucket = TokenBucket(ru_per_second, ru_per_second) if ru_per_second > 0 else None
+        self._databases: Dict[str, FakeCosmosDatabase] = {}
+        self._lock = threading.Lock()
+
+    def get_database_client(self, database: str) -> FakeCosmosDatabase:
+        with self._lock:
+            if database not in self._databases:
+                self._databases[database] = FakeCosmosDatabase(self, database)
+            return self._databases[database]
+
+    def request_units(self) -> Dict[str, Dict[str, float]]:
+        """Request units charged so far, per database/container and operation kind"""
+        return {
+            f"{database.id}/{container.id}": {op: round(ru, 2) for op, ru in container.request_units.items()}
+            for database in self._databases.values()
+            for container in database._containers.values()
+        }
+
+
+# ---------------------------------------------------------------------------
+# Blob Storage
+# ---------------------------------------------------------------------------
+
+def _blob_error(cls, status_code: int, message: str):
+    error = cls(message=message)
+    error.status_code = status_code
+    return error
+
+
+def _as_bytes(data: Any) -> bytes:
+    if hasattr(data, 'read'):
+        data = data.read()
+    if isinstance(data, str):
+        return data.encode('utf-8')
+    return bytes(data)
+
+
+class FakeBlobDownloader:
+    """StorageStreamDownloader stand-in"""
+
+    def __init__(self, data: bytes, properties):
+        self._data = data
+        self.properties = properties
+        self.size = len(data)
+
+    def readall(self) -> bytes:
+        return self._data
+
+    def content_as_bytes(self) -> bytes:
+        return self._data
+
+    def content_as_text(self, encoding: str = 'UTF-8') -> str:
+        return self._data.decode(encoding)
+
+    def chunks(self, chunk_size: int = 4 * 1024 * 1024):
+        for start in range(0, len(self._data), chunk_size):
+            yield self._data[start:start + chunk_size]
+
+    def readinto(self, stream) -> int:
+        stream.write(self._data)
+        return len(self._data)
+
+
+class FakeBlobClient:
+    def __init__(self, service: 'FakeBlobServiceClient', container: str, blob: str):
+        self.service = service
+        self.container_name = container
+        self.blob_name = blob
+        self.url = f"memory://{container}/{blob}"
+
+    def _begin(self, operation: str, size: int = 0):
+        if self.service.profile.call(operation, extra_seconds=size / self.service.bytes_per_second):
+            raise _blob_error(HttpResponseError, 503, "The server is busy (injected)")
+
+    def upload_blob(self, data: Any, overwrite: bool = False, metadata: Optional[Dict[str, str]] = None, **kwargs):
+        data = _as_bytes(data)
+        self._begin('upload_blob', len(data))
+        with self.service.lock:
+            blobs = self.service.containers.setdefault(self.container_name, {})
+            if self.blob_name in blobs and not overwrite:
+                raise _blob_error(ResourceExistsError, 409, f"Blob {self.blob_name} already exists")
+            blobs[self.blob_name] = {
+                'data': data,
+                'metadata': dict(metadata or {}),
+                'last_modified': datetime.now(timezone.utc),
+                'etag': f'"{uuid.uuid4()}"'
+            }
+        self.service.profile.count('bytesWritten', len(data))
+        return {'etag': blobs[self.blob_name]['etag']}
+
+    def _entry(self) -> Dict[str, Any]:
+        with self.service.lock:
+            entry = self.service.containers.get(self.container_name, {}).get(self.blob_name)
+        if entry is None:
+            raise _blob_error(ResourceNotFoundError, 404, f"Blob {self.blob_name} does not exist")
+        return entry
+
+    def get_blob_properties(self, **kwargs):
+        self._begin('get_blob_properties')
+        entry = self._entry()
+        return SimpleNamespace(name=self.blob_name, size=len(entry['data']), metadata=dict(entry['metadata']),
+                               last_modified=entry['last_modified'], etag=entry['etag'])
+
+    def download_blob(self, offset: Optional[int] = None, length: Optional[int] = None, **kwargs) -> FakeBlobDownloader:
+        entry = self._entry()
+        self._begin('download_blob', len(entry['data']))
+        data = entry['data']
+        if offset is not None:
+            data = data[offset:offset + length if length is not None else None]
+        self.service.profile.count('bytesRead', len(data))
+        properties = SimpleNamespace(name=self.blob_name, size=len(entry['data']), metadata=dict(entry['metadata']))
+        return FakeBlobDownloader(data, properties)
+
+    def delete_blob(self, **kwargs):
+        self._begin('delete_blob')
+        with self.service.lock:
+            blobs = self.service.containers.get(self.container_name, {})
+            if self.blob_name not in blobs:
+                raise _blob_error(ResourceNotFoundError, 404, f"Blob {self.blob_name} does not exist")
+            del blobs[self.blob_name]
+
+    def exists_now(self) -> bool:
+        with self.service.lock:
+            return self.blob_name in self.service.containers.get(self.container_name, {})
+
+    def exists(self, **kwargs) -> bool:
+        self._begin('exists')
+        return self.exists_now()
+
+
+class FakeContainerClient:
+    def __init__(self, service: 'FakeBlobServiceClient', container: str):
+        self.service = service
+        self.container_name = container
+
+    def get_blob_client(self, blob: str) -> FakeBlobClient:
+        return FakeBlobClient(self.service, self.container_name, blob)
+
+    def upload_blob(self, name: str, data: Any, overwrite: bool = False, **kwargs):
+        return self.get_blob_client(name).upload_blob(data, overwrite=overwrite, **kwargs)
+
+    def download_blob(self, blob: str, **kwargs) -> FakeBlobDownloader:
+        return self.get_blob_client(blob).download_blob(**kwargs)
+
+    def delete_blob(self, blob: str, **kwargs):
+        return self.get_blob_client(blob).delete_blob(**kwargs)
+
+    def list_blobs(self, name_starts_with: Optional[str] = None, **kwargs):
+        self.service.profile.call('list_blobs')
+        with self.service.lock:
+            blobs = sorted(self.service.containers.get(self.container_name, {}).items())
+        for name, entry in blobs:
+            if name_starts_with is None or name.startswith(name_starts_with):
+                yield SimpleNamespace(name=name, size=len(entry['data']), metadata=dict(entry['metadata']),
+                                      last_modified=entry['last_modified'], etag=entry['etag'])
+
+    def create_container(self, **kwargs):
+        with self.service.lock:
+            self.service.containers.setdefault(self.container_name, {})
+        return self
+
+    def exists(self, **kwargs) -> bool:
+        with self.service.lock:
+            return self.container_name in self.service.containers
+
+
+class FakeBlobServiceClient:
+    """BlobServiceClient stand-in; containers are created on first write"""
+
+    def __init__(self, profile: ServiceProfile):
+        self.profile = profile
+        self.bytes_per_second = _env_float('LOCAL_BLOB_MBPS', 100.0) * 1024 * 1024
+        self.containers: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+        self.url = "memory://"
+
+    def get_blob_client(self, container: str, blob: str) -> FakeBlobClient:
+        return FakeBlobClient(self, container, blob)
+
+    def get_container_client(self, container: str) -> FakeContainerClient:
+        return FakeContainerClient(self, container)
+
+    def create_container(self, name: str, **kwargs) -> FakeContainerClient:
+        return self.get_container_client(name).create_container()
+
+    def close(self):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Service Bus
+# ---------------------------------------------------------------------------
+
+class FakeServiceBusReceivedMessage:
+    """ServiceBusReceivedMessage stand-in; str() returns the body like the SDK's"""
+
+    def __init__(self, body: bytes, application_properties: Optional[Dict[str, Any]] = None,
+                 message_id: Optional[str] = None, content_type: Optional[str] = None,
+                 subject: Optional[str] = None, scheduled_enqueue_time_utc: Optional[datetime] = None):
+        self.body = body
+        self.application_properties = application_properties or {}
+        self.message_id = message_id or uuid.uuid4().hex
+        self.content_type = content_type
+        self.subject = subject
+        self.enqueued_time_utc = datetime.now(timezone.utc)
+        self.scheduled_enqueue_time_utc = scheduled_enqueue_time_utc
+        self.delivery_count = 0
+        self.lock_token: Optional[str] = None
+        self.locked_until_utc: Optional[datetime] = None
+        self.dead_letter_reason: Optional[str] = None
+        self.dead_letter_error_description: Optional[str] = None
+
+    def __str__(self) -> str:
+        return self.body.decode('utf-8')
+
+
+def _to_received_message(message: Any) -> FakeServiceBusReceivedMessage:
+    """Copy a ServiceBusMessage (or a str/bytes/dict body) into a queued message"""
+    if isinstance(message, (str, bytes, dict)):
+        body = json.dumps(message) if isinstance(message, dict) else message
+        return FakeServiceBusReceivedMessage(body.encode('utf-8') if isinstance(body, str) else body)
+    scheduled = getattr(message, 'scheduled_enqueue_time_utc', None)
+    return FakeServiceBusReceivedMessage(
+        str(message).encode('utf-8'),
+        application_properties=dict(getattr(message, 'application_properties', None) or {}),
+        message_id=getattr(message, 'message_id', None),
+        content_type=getattr(message, 'content_type', None),
+        subject=getattr(message, 'subject', None),
+        scheduled_enqueue_time_utc=scheduled
+    )
+
+
+class _FakeQueue:
+    """Peek-lock queue: received messages are invisible until completed, abandoned or their lock expires"""
+
+    def __init__(self, name: str, lock_seconds: float, max_delivery_count: int):
+        self.name = name
+        self.lock_seconds = lock_seconds
+        self.max_delivery_count = max_delivery_count
+        self.available: deque = deque()
+        self.locked: Dict[str, Tuple[FakeServiceBusReceivedMessage, float]] = {}
+        self.dead_letters: List[FakeServiceBusReceivedMessage] = []
+        self.completed = 0
+        self.condition = threading.Condition()
+
+    def send(self, message: FakeServiceBusReceivedMessage):
+        with self.condition:
+            self.available.append(message)
+            self.condition.notify_all()
+
+    def _expire_locks(self, now: float):
+        for token, (message, expires) in list(self.locked.items()):
+            if expires <= now:
+                del self.locked[token]
+                self.available.appendleft(message)
+
+    def _ready(self, now: float) -> List[FakeServiceBusReceivedMessage]:
+        wall_now = datetime.now(timezone.utc)
+        return [
+            message for message in self.available
+            if message.scheduled_enqueue_time_utc is None or message.scheduled_enqueue_time_utc <= wall_now
+        ]
+
+    def receive(self, max_message_count: int, max_wait_time: Optional[float]) -> List[FakeServiceBusReceivedMessage]:
+        deadline = time.monotonic() + (max_wait_time if max_wait_time is not None else 60.0)
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                self._expire_locks(now)
+                ready = self._ready(now)
+                if ready or now >= deadline:
+                    break
+                # Wake up for new messages, expiring locks or scheduled messages coming due
+                self.condition.wait(min(deadline - now, 0.5))
+
+            received = []
+            for message in ready[:max_message_count]:
+                self.available.remove(message)
+                message.delivery_count += 1
+                if message.delivery_count > self.max_delivery_count:
+                    message.dead_letter_reason = 'MaxDeliveryCountExceeded'
+                    self.dead_letters.append(message)
+                    continue
+                message.lock_token = uuid.uuid4().hex
+                self.locked[message.lock_token] = (message, now + self.lock_seconds)
+                message.locked_until_utc = datetime.now(timezone.utc) + timedelta(seconds=self.lock_seconds)
+                received.append(message)
+            return received
+
+    def settle(self, message: FakeServiceBusReceivedMessage, outcome: str, reason: Optional[str] = None,
+               description: Optional[str] = None):
+        with self.condition:
+            # An expired lock stays in place until the next receive returns the message to the queue
+            entry = self.locked.get(message.lock_token)
+            if entry is None or entry[1] <= time.monotonic():
+                raise MessageLockLostError(message=f"Lock for message {message.message_id} was lost")
+            del self.locked[message.lock_token]
+            if outcome == 'abandon':
+                self.available.appendleft(message)
+                self.condition.notify_all()
+            elif outcome == 'dead_letter':
+                message.dead_letter_reason = reason
+                message.dead_letter_error_description = description
+                self.dead_letters.append(message)
+            else:
+                self.completed += 1
+
+    def renew(self, message: FakeServiceBusReceivedMessage) -> datetime:
+        with self.condition:
+            entry = self.locked.get(message.lock_token)
+            if entry is None or entry[1] <= time.monotonic():
+                raise MessageLockLostError(message=f"Lock for message {message.message_id} was lost")
+            self.locked[message.lock_token] = (message, time.monotonic() + self.lock_seconds)
+            message.locked_until_utc = datetime.now(timezone.utc) + timedelta(seconds=self.lock_seconds)
+            return message.locked_until_utc
+
+    def stats(self) -> Dict[str, int]:
+        with self.condition:
+            return {
+                'active': len(self.available),
+                'locked': len(self.locked),
+                'completed': self.completed,
+                'deadLettered': len(self.dead_letters)
+            }
+
+
+class FakeServiceBusReceiver:
+    def __init__(self, client: 'FakeServiceBusClient', queue: _FakeQueue, max_wait_time: Optional[float]):
+        self.client = client
+        self.queue = queue
+        self.max_wait_time = max_wait_time
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _begin(self, operation: str):
+        if self.client.profile.call(operation):
+            raise ServiceBusServerBusyError(message="The server is busy (injected)")
+
+    def receive_messages(self, max_message_count: int = 1, max_wait_time: Optional[float] = None):
+        self._begin('receive_messages')
+        wait = max_wait_time if max_wait_time is not None else self.max_wait_time
+        return self.queue.receive(max_message_count or 1, wait)
+
+    def complete_message(self, message):
+        self._begin('complete_message')
+        self.queue.settle(message, 'complete')
+
+    def abandon_message(self, message):
+        self._begin('abandon_message')
+        self.queue.settle(message, 'abandon')
+
+    def dead_letter_message(self, message, reason: Optional[str] = None, error_description: Optional[str] = None):
+        self._begin('dead_letter_message')
+        self.queue.settle(message, 'dead_letter', reason, error_description)
+
+    def renew_message_lock(self, message, **kwargs) -> datetime:
+        self._begin('renew_message_lock')
+        return self.queue.renew(message)
+
+    def close(self):
+        pass
+
+
+class FakeServiceBusSender:
+    def __init__(self, client: 'FakeServiceBusClient', queue: _FakeQueue):
+        self.client = client
+        self.queue = queue
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def create_message_batch(self, **kwargs):
+        batch = []
+        batch.add_message = batch.append  # type: ignore[attr-defined]
+        return batch
+
+    def send_messages(self, message, **kwargs):
+        if self.client.profile.call('send_messages'):
+            raise ServiceBusServerBusyError(message="The server is busy (injected)")
+        messages = message if isinstance(message, list) else [message]
+        for item in messages:
+            self.queue.send(_to_received_message(item))
+
+    def schedule_messages(self, messages, schedule_time_utc: datetime, **kwargs) -> List[int]:
+        messages = messages if isinstance(messages, list) else [messages]
+        for item in messages:
+            queued = _to_received_message(item)
+            queued.scheduled_enqueue_time_utc = schedule_time_utc
+            self.queue.send(queued)
+        return list(range(len(messages)))
+
+    def close(self):
+        pass
+
+
+class FakeServiceBusClient:
+    """ServiceBusClient stand-in; queues spring into existence on first use"""
+
+    def __init__(self, profile: ServiceProfile):
+        self.profile = profile
+        self.lock_seconds = _env_float('LOCAL_SERVICEBUS_LOCK_SECONDS', 60.0)
+        self.max_delivery_count = int(os.environ.get('LOCAL_SERVICEBUS_MAX_DELIVERY_COUNT', '10'))
+        self.queues: Dict[str, _FakeQueue] = {}
+        self._lock = threading.Lock()
+
+    def queue(self, name: str) -> _FakeQueue:
+        with self._lock:
+            if name not in self.queues:
+                self.queues[name] = _FakeQueue(name, self.lock_seconds, self.max_delivery_count)
+            return self.queues[name]
+
+    def get_queue_receiver(self, queue_name: str, max_wait_time: Optional[float] = None, **kwargs):
+        return FakeServiceBusReceiver(self, self.queue(queue_name), max_wait_time)
+
+    def get_queue_sender(self, queue_name: str, **kwargs):
+        return FakeServiceBusSender(self, self.queue(queue_name))
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Azure OpenAI
+# ---------------------------------------------------------------------------
+
+DOCUMENT_TYPE_KEYWORDS = (
+    ('medical_report', ('diagnosis', 'physician', 'medical', 'blood pressure', 'prescription', 'patient')),
+    ('financial_statement', ('income', 'financial', 'tax', 'bank', 'net worth', 'assets')),
+    ('property_inspection', ('roof', 'dwelling', 'property', 'construction', 'square feet')),
+    ('application', ('applicant', 'application', 'policy', 'beneficiary', 'coverage')),
+)
+
+RISK_KEYWORDS = {
+    'smok': ('lifestyle', 'high', 'Tobacco use disclosed'),
+    'diabet': ('medical', 'high', 'Diabetes history'),
+    'hypertension': ('medical', 'medium', 'Hypertension noted'),
+    'cholesterol': ('medical', 'medium', 'Elevated cholesterol'),
+    'flood': ('property', 'high', 'Flood exposure'),
+    'claim': ('history', 'medium', 'Prior claims on record'),
+    'bankrupt': ('financial', 'high', 'Bankruptcy history'),
+    'aviation': ('lifestyle', 'medium', 'Aviation activity'),
+}
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _document_type(text: str) -> str:
+    lowered = text.lower()
+    for document_type, keywords in DOCUMENT_TYPE_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return document_type
+    return 'other'
+
+
+def _risk_factors(text: str) -> List[Tuple[str, str, str]]:
+    lowered = text.lower()
+    return [risk for keyword, risk in RISK_KEYWORDS.items() if keyword in lowered]
+
+
+def _page_analysis(text: str) -> Dict[str, Any]:
+    numbers = re.findall(r'\$?\d[\d,]*(?:\.\d+)?', text)[:3]
+    return {
+        'documentType': _document_type(text),
+        'keyValues': {f'value{index + 1}': number for index, number in enumerate(numbers)},
+        'riskFactors': [description for _, _, description in _risk_factors(text)],
+        'concerns': []
+    }
+
+
+def generate_completion(messages: List[Dict[str, str]]) -> str:
+    """Deterministic completion text shaped like the answer each of the worker's prompts asks for"""
+    prompt = messages[-1].get('content') or ''
+    if prompt.startswith('Perform comprehensive underwriting analysis'):
+        pages = sorted({int(page) for page in re.findall(r'Page (\d+)', prompt)}) or [1]
+        risks = [
+            {'category': category, 'severity': severity, 'description': description, 'page': pages[0]}
+            for category, severity, description in _risk_factors(prompt)
+        ]
+        return json.dumps({
+            'summary': f"Application of {len(pages)} page(s) reviewed; {len(risks)} risk factor(s) identified.",
+            'risks': risks,
+            'recommendations': ['Verify disclosed information against source records'] + (
+                ['Request additional underwriting evidence'] if risks else []),
+            'completedAt': datetime.utcnow().isoformat()
+        }, indent=2)
+    if prompt.startswith('Condense this portion'):
+        pages = re.findall(r'Page (\d+)', prompt)
+        return json.dumps({
+            'pages': f"{pages[0]}-{pages[-1]}" if pages else '',
+            'facts': [],
+            'risks': [
+                {'category': category, 'severity': severity, 'description': description,
+                 'page': int(pages[0]) if pages else None}
+                for category, severity, description in _risk_factors(prompt)
+            ],
+            'discrepancies': []
+        })
+    if prompt.startswith('Analyze each of these insurance document pages'):
+        sections = re.split(r'--- Page (\d+) ---\n', prompt)[1:]
+        return json.dumps({
+            number: _page_analysis(text) for number, text in zip(sections[0::2], sections[1::2])
+        })
+    if prompt.startswith('Analyze this insurance document page'):
+        return json.dumps(_page_analysis(prompt.split('Content:', 1)[-1]), indent=2)
+    return "This is a local stand-in response."
+
+
+class _RawResponse:
+    def __init__(self, headers: Dict[str, str], parse: Callable[[], Any]):
+        self.headers = headers
+        self._parse = parse
+
+    def parse(self):
+        return self._parse()
+
+
+class FakeChatCompletions:
+    """chat.completions stand-in with generation latency, throttling and a tokens-per-minute quota"""
+
+    def __init__(self, profile: ServiceProfile):
+        self.profile = profile
+        self.tokens_per_second = _env_float('LOCAL_OPENAI_TOKENS_PER_SECOND', 60.0)
+        tokens_per_minute = _env_float('LOCAL_OPENAI_TPM', 0)
+        self.quota = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0) if tokens_per_minute > 0 else None
+        self.with_raw_response = SimpleNamespace(create=self._create_raw)
+        self._remaining_tokens: Optional[float] = None
+
+    def _rate_limit_error(self, retry_after: float):
+        import httpx
+        import openai
+
+        request = httpx.Request('POST', 'http://local-openai/chat/completions')
+        response = httpx.Response(429, headers={'retry-after-ms': str(max(1, int(retry_after * 1000)))},
+                                  request=request)
+        return openai.RateLimitError("Rate limit is exceeded (local stand-in)", response=response, body=None)
+
+    def _admit(self, messages, max_tokens: Optional[int]) -> Tuple[str, int, int]:
+        text = generate_completion(messages)
+        prompt_tokens = sum(_estimate_tokens(message.get('content') or '') + 4 for message in messages)
+        completion_tokens = _estimate_tokens(text)
+        if max_tokens and completion_tokens > max_tokens:
+            text, completion_tokens = text[:max_tokens * 4], max_tokens
+
+        if self.quota is not None:
+            taken, wait, remaining = self.quota.take(prompt_tokens + (max_tokens or completion_tokens))
+            self._remaining_tokens = remaining
+            if not taken:
+                self.profile.count('throttled')
+                self.profile.count('quotaThrottled')
+                raise self._rate_limit_error(wait)
+        return text, prompt_tokens, completion_tokens
+
+    def _usage(self, prompt_tokens: int, completion_tokens: int):
+        self.profile.count('promptTokens', prompt_tokens)
+        self.profile.count('completionTokens', completion_tokens)
+        return SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                               total_tokens=prompt_tokens + completion_tokens)
+
+    def create(self, messages: List[Dict[str, str]], model: str = 'local', max_tokens: Optional[int] = None,
+               stream: bool = False, extra_body: Optional[Dict[str, Any]] = None, **kwargs):
+        if self.profile.call('stream' if stream else 'create'):
+            raise self._rate_limit_error(1.0)
+        text, prompt_tokens, completion_tokens = self._admit(messages, max_tokens)
+        completion_id = f"chatcmpl-local-{uuid.uuid4().hex[:12]}"
+
+        if stream:
+            include_usage = bool(((extra_body or {}).get('stream_options') or {}).get('include_usage'))
+            return self._stream(completion_id, model, text, prompt_tokens, completion_tokens, include_usage)
+
+        generation = completion_tokens / self.tokens_per_second * self.profile.scale
+        if generation > 0:
+            time.sleep(generation)
+        return SimpleNamespace(
+            id=completion_id,
+            model=model,
+            choices=[SimpleNamespace(index=0, finish_reason='stop',
+                                     message=SimpleNamespace(role='assistant', content=text))],
+            usage=self._usage(prompt_tokens, completion_tokens)
+        )
+
+    def _stream(self, completion_id: str, model: str, text: str, prompt_tokens: int, completion_tokens: int,
+                include_usage: bool):
+        piece_chars = 64
+        seconds_per_piece = piece_chars / 4 / self.tokens_per_second * self.profile.scale
+        for start in range(0, len(text), piece_chars):
+            if seconds_per_piece > 0:
+                time.sleep(seconds_per_piece)
+            yield SimpleNamespace(
+                id=completion_id, model=model, usage=None,
+                choices=[SimpleNamespace(index=0, finish_reason=None,
+                                         delta=SimpleNamespace(role='assistant', content=text[start:start + piece_chars]))]
+            )
+        usage = self._usage(prompt_tokens, completion_tokens)
+        if include_usage:
+            yield SimpleNamespace(id=completion_id, model=model, choices=[], usage=usage)
+
+    def _create_raw(self, **kwargs):
+        response = self.create(**kwargs)
+        headers = {}
+        if self._remaining_tokens is not None:
+            headers['x-ratelimit-remaining-tokens'] = str(int(self._remaining_tokens))
+        return _RawResponse(headers, lambda: response)
+
+
+class FakeAzureOpenAI:
+    """AzureOpenAI stand-in exposing chat.completions"""
+
+    def __init__(self, profile: ServiceProfile):
+        self.chat = SimpleNamespace(completions=FakeChatCompletions(profile))
+
+    def close(self):
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Backend
+# ---------------------------------------------------------------------------
+
+class LocalBackend:
+    """One process-wide set of fakes, so the API and the worker see the same data"""
+
+    def __init__(self):
+        seed = os.environ.get('LOCAL_FAKE_SEED')
+        self.rng = random.Random(int(seed) if seed else None)
+        self.profiles = {name: ServiceProfile(name, self.rng) for name in SERVICES}
+        self.cosmos = FakeCosmosClient(self.profiles['cosmos'])
+        self.blob = FakeBlobServiceClient(self.profiles['blob'])
+        self.servicebus = FakeServiceBusClient(self.profiles['servicebus'])
+        self.openai = FakeAzureOpenAI(self.profiles['openai'])
+
+    def stats(self) -> Dict[str, Any]:
+        """Calls, throttles, latency, request units, tokens and queue depths so far"""
+        stats = {name: profile.stats() for name, profile in self.profiles.items()}
+        stats['cosmos']['requestUnitsByContainer'] = self.cosmos.request_units()
+        stats['servicebus']['queues'] = {name: queue.stats() for name, queue in self.servicebus.queues.items()}
+        return stats
+
+
+_backend: Optional[LocalBackend] = None
+_backend_lock = threading.Lock()
+
+
+def backend() -> LocalBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = LocalBackend()
+            logger.info("Using in-process local stand-ins for Azure services")
+        return _backend
+
+
+def reset() -> LocalBackend:
+    """Drop all state and re-read the LOCAL_* configuration"""
+    global _backend
+    with _backend_lock:
+        _backend = None
+    return backend()
+
+
+def cosmos_client() -> FakeCosmosClient:
+    return backend().cosmos
+
+
+def blob_service_client() -> FakeBlobServiceClient:
+    return backend().blob
+
+
+def servicebus_client() -> FakeServiceBusClient:
+    return backend().servicebus
+
+
+def openai_client() -> FakeAzureOpenAI:
+    return backend().openai
@@ -0,0 +1,143 @@
+"""
+Content-addressed page analysis cache for GenAI Underwriting Workbench (Azure version)
+Page analyses are keyed by a hash of the normalized page text plus the prompt version and
+model deployment, so boilerplate pages and re-submitted packets are not re-sent to OpenAI.
+Lookups go through an in-process LRU tier first, then an optional shared Blob Storage tier
+whose entries expire after a TTL.
+"""
+
+import re
+import copy
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_page_text(text: str) -> str:
+    """Collapse whitespace so extraction jitter does not change the cache key"""
+    return _WHITESPACE.sub(' ', text or '').strip()
+
+
+def page_cache_key(text: str, prompt_version: str, deployment: str) -> str:
+    """Cache key for a page: sha256 of normalized text, prompt version and deployment"""
+    material = '\x00'.join([prompt_version, deployment, normalize_page_text(text)])
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class PageAnalysisCache:
+    """Two-tier (local LRU + shared Blob) cache of page analysis results"""
+
+    def __init__(
+        self,
+        prompt_version: str,
+        deployment: str,
+        max_entries: int = 2048,
+        container_client=None,
+        ttl_seconds: float = 7 * 24 * 3600
+    ):
+        self.prompt_version = prompt_version
+        self.deployment = deployment
+        self.max_entries = max_entries
+        self.container_client = container_client
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'writes': 0}
+
+    def key_for(self, text: str) -> str:
+        return page_cache_key(text, self.prompt_version, self.deployment)
+
+    def get(self, text: str) -> Optional[Dict[str, Any]]:
+        """Return a cached analysis for the page text, or None on a miss"""
+        key = self.key_for(text)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry['cachedAt']):
+                self._entries.move_to_end(key)
+                self._stats['local_hits'] += 1
+                return copy.deepcopy(entry['analysis'])
+
+        entry = self._read_shared(key)
+        if entry is not None:
+            self._store_local(key, entry)
+            self._count('shared_hits')
+            return copy.deepcopy(entry['analysis'])
+
+        self._count('misses')
+        return None
+
+    def put(self, text: str, analysis: Dict[str, Any]):
+        """Cache a successful analysis; errors and unparseable responses are never cached"""
+        if not isinstance(analysis, dict) or 'error' in analysis or 'raw_analysis' in analysis:
+            return
+
+        key = self.key_for(text)
+        entry = {'analysis': analysis, 'cachedAt': time.time()}
+        self._store_local(key, entry)
+        self._write_shared(key, entry)
+        self._count('writes')
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the hit/miss counters"""
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _expired(self, cached_at: float) -> bool:
+        return time.time() - cached_at > self.ttl_seconds
+
+    def _store_local(self, key: str, entry: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _blob_name(self, key: str) -> str:
+        return f"{self.prompt_version}/{key[:2]}/{key}.json"
+
+    def _read_shared(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.container_client is None:
+            return None
+
+        blob_client = self.container_client.get_blob_client(self._blob_name(key))
+        try:
+            entry = json.loads(blob_client.download_blob().readall())
+        except Exception as e:
+            if getattr(e, 'status_code', None) != 404:
+                logger.warning(f"Page cache read failed for {key}: {e}")
+            return None
+
+        if self._expired(entry.get('cachedAt', 0)):
+            try:
+                blob_client.delete_blob()
+            except Exception as e:
+                logger.debug(f"Could not evict expired page cache entry {key}: {e}")
+            return None
+
+        return entry
+
+    def _write_shared(self, key: str, entry: Dict[str, Any]):
+        if self.container_client is None:
+            return
+
+        try:
+            self.container_client.upload_blob(
+                name=self._blob_name(key),
+                data=json.dumps(entry),
+                overwrite=True
+            )
+        except Exception as e:
+            logger.warning(f"Page cache write failed for {key}: {e}")
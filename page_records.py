@@ -0,0 +1,166 @@
+"""
+Compressed JSON-lines page records for GenAI Underwriting Workbench
+One compact JSON object per page, compressed with gzip (standard library) or zstd (when the
+zstandard package is installed). Writers and readers stream record by record, so a packet
+never has to be held as one pretty-printed JSON string; readers detect the codec from the
+magic bytes, and uncompressed JSON lines are read as well.
+Shared by the Azure worker and API and, through the page-records layer, the AWS Lambdas.
+"""
+
+import io
+import os
+import gzip
+import json
+import hashlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+CODEC_EXTENSIONS = {'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}
+DEFAULT_CODEC = os.environ.get('PAGE_RECORD_CODEC', 'gzip')
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def _zstandard():
+    import zstandard
+
+    return zstandard
+
+
+class PageRecordWriter:
+    """Writes records as compressed JSON lines to a binary file object"""
+
+    def __init__(self, fileobj, codec: str = DEFAULT_CODEC, level: Optional[int] = None):
+        if codec == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=level or 6, mtime=0)
+        elif codec == 'zstd':
+            self._stream = _zstandard().ZstdCompressor(level=level or 3).stream_writer(fileobj, closefd=False)
+        else:
+            raise ValueError(f"Unsupported page record codec: {codec}")
+        self.codec = codec
+        self.count = 0
+        self.raw_bytes = 0
+        self._digest = hashlib.sha256()
+
+    @property
+    def sha256(self) -> str:
+        """Hash of the uncompressed JSON lines written so far"""
+        return self._digest.hexdigest()
+
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, separators=(',', ':'), ensure_ascii=False, default=str).encode('utf-8') + b'\n'
+        self._stream.write(line)
+        self._digest.update(line)
+        self.raw_bytes += len(line)
+        self.count += 1
+
+    def close(self):
+        """Flush the compressor; the underlying file object is left open"""
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _PrefixedReader(io.RawIOBase):
+    """Re-attaches bytes already read for codec detection to the front of a stream"""
+
+    def __init__(self, prefix: bytes, fileobj):
+        self._prefix = prefix
+        self._fileobj = fileobj
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+        data = self._fileobj.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class PageRecordReader:
+    """Streams records from compressed (or plain) JSON lines, hashing the lines as it goes"""
+
+    def __init__(self, fileobj):
+        magic = fileobj.read(4)
+        source = io.BufferedReader(_PrefixedReader(magic, fileobj))
+        if magic.startswith(GZIP_MAGIC):
+            self.codec, self._stream = 'gzip', gzip.GzipFile(fileobj=source, mode='rb')
+        elif magic.startswith(ZSTD_MAGIC):
+            self.codec, self._stream = 'zstd', _zstandard().ZstdDecompressor().stream_reader(source)
+        else:
+            self.codec, self._stream = 'none', source
+        self.count = 0
+        self.raw_bytes = 0
+        self._digest = hashlib.sha256()
+
+    @property
+    def sha256(self) -> str:
+        """Hash of the uncompressed JSON lines read so far"""
+        return self._digest.hexdigest()
+
+    def _lines(self) -> Iterator[bytes]:
+        pending = b''
+        while True:
+            chunk = self._stream.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line + b'\n'
+        if pending:
+            yield pending
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for line in self._lines():
+            self._digest.update(line)
+            self.raw_bytes += len(line)
+            if line.strip():
+                self.count += 1
+                yield json.loads(line)
+
+
+def iter_page_records(fileobj) -> Iterator[Dict[str, Any]]:
+    """Stream records from a binary file object"""
+    return iter(PageRecordReader(fileobj))
+
+
+def encode_page_records(records: Iterable[Dict[str, Any]], codec: str = DEFAULT_CODEC) -> bytes:
+    """Encode records to compressed JSON lines in memory"""
+    buffer = io.BytesIO()
+    with PageRecordWriter(buffer, codec) as writer:
+        for record in records:
+            writer.write(record)
+    return buffer.getvalue()
+
+
+def decode_page_records(data: bytes) -> List[Dict[str, Any]]:
+    """Decode compressed (or plain) JSON lines held in memory"""
+    return list(iter_page_records(io.BytesIO(data)))
+
+
+def records_from_sections(sections: Dict[str, List[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+    """Flatten {sub-document type: [page, ...]} (the Bedrock extraction shape) into page records"""
+    for section, pages in sections.items():
+        for page in pages or []:
+            yield {'section': section, **page}
+
+
+def sections_from_records(records: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group page records back into {sub-document type: [page, ...]}"""
+    sections: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        page = dict(record)
+        sections.setdefault(page.pop('section', 'Unclassified'), []).append(page)
+    return sections
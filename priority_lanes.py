@@ -0,0 +1,180 @@
+"""
+Priority lanes for GenAI Underwriting Workbench (Azure version)
+Jobs are routed onto one of several Service Bus queues ("lanes") by document size or an
+explicit priority, so a 3-page medical report does not wait behind a 500-page packet.
+Workers poll their lanes in smooth weighted round-robin order; a lane that has been neither
+served nor seen empty for its maxWaitSeconds is polled first, so low-weight lanes cannot
+starve. Shared by api-server.py, worker.py and async_worker.py.
+
+PRIORITY_LANES holds a JSON list, ordered from the smallest documents up, e.g.
+    [{"name": "fast", "queue": "document-extraction-fast", "maxPages": 10, "maxBytes": 5242880, "weight": 4},
+     {"name": "standard", "queue": "document-extraction", "maxPages": 200, "weight": 2, "default": true},
+     {"name": "bulk", "queue": "document-extraction-bulk", "weight": 1, "maxWaitSeconds": 300}]
+Without it there is a single lane on SERVICE_BUS_QUEUE_NAME.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WAIT_SECONDS = 120.0
+
+
+class Lane:
+    """One queue, the documents it takes and its share of worker polls"""
+
+    def __init__(self, name: str, queue_name: str, weight: float = 1.0, max_pages: Optional[int] = None,
+                 max_bytes: Optional[int] = None, max_wait_seconds: float = DEFAULT_MAX_WAIT_SECONDS,
+                 default: bool = False):
+        if weight <= 0:
+            raise ValueError(f"Lane {name} needs a positive weight")
+        self.name = name
+        self.queue_name = queue_name
+        self.weight = weight
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.max_wait_seconds = max_wait_seconds
+        self.default = default
+
+    def accepts(self, page_count: Optional[int], file_size: Optional[int]) -> bool:
+        """Whether a document fits the lane; an unknown dimension does not constrain it"""
+        if self.max_pages is not None and page_count is not None and page_count > self.max_pages:
+            return False
+        if self.max_bytes is not None and file_size is not None and file_size > self.max_bytes:
+            return False
+        return True
+
+    def __repr__(self):
+        return f"Lane({self.name!r}, {self.queue_name!r}, weight={self.weight})"
+
+
+def load_lanes() -> List[Lane]:
+    """Lanes from PRIORITY_LANES, or a single lane on SERVICE_BUS_QUEUE_NAME"""
+    spec = os.environ.get('PRIORITY_LANES', '').strip()
+    if not spec:
+        return [Lane('standard', os.environ.get('SERVICE_BUS_QUEUE_NAME', 'document-extraction'), default=True)]
+
+    lanes = [
+        Lane(
+            name=entry['name'],
+            queue_name=entry['queue'],
+            weight=float(entry.get('weight', 1)),
+            max_pages=entry.get('maxPages'),
+            max_bytes=entry.get('maxBytes'),
+            max_wait_seconds=float(entry.get('maxWaitSeconds', DEFAULT_MAX_WAIT_SECONDS)),
+            default=bool(entry.get('default', False))
+        )
+        for entry in json.loads(spec)
+    ]
+    if not lanes:
+        raise ValueError("PRIORITY_LANES must list at least one lane")
+    if len({lane.name for lane in lanes}) != len(lanes):
+        raise ValueError("PRIORITY_LANES lane names must be unique")
+    return lanes
+
+
+def default_lane(lanes: List[Lane]) -> Lane:
+    return next((lane for lane in lanes if lane.default), lanes[-1])
+
+
+def choose_lane(lanes: List[Lane], page_count: Optional[int] = None, file_size: Optional[int] = None,
+                priority: Optional[str] = None) -> Lane:
+    """
+    The lane for a document: the lane named by priority, else the first lane it fits, else the
+    last lane. Documents of unknown size go to the default lane.
+    """
+    if priority:
+        for lane in lanes:
+            if lane.name == priority:
+                return lane
+        logger.warning(f"Unknown priority lane {priority!r}; routing by size")
+    if page_count is None and file_size is None:
+        return default_lane(lanes)
+    for lane in lanes:
+        if lane.accepts(page_count, file_size):
+            return lane
+    return lanes[-1]
+
+
+class LaneScheduler:
+    """Orders lane polls by smooth weighted round-robin, overdue lanes first"""
+
+    def __init__(self, lanes: List[Lane], clock: Callable[[], float] = time.monotonic):
+        self.lanes = lanes
+        self.clock = clock
+        self._total_weight = sum(lane.weight for lane in lanes)
+        self._current = {lane.name: 0.0 for lane in lanes}
+        # When each lane was last served or found empty; older than its max wait means overdue
+        self._last_seen = {lane.name: clock() for lane in lanes}
+        self._stats = {lane.name: {'served': 0, 'empty': 0, 'promoted': 0} for lane in lanes}
+        self._lock = threading.Lock()
+
+    def order(self) -> List[Lane]:
+        """Lanes in the order to poll them for the next message"""
+        with self._lock:
+            now = self.clock()
+            overdue = sorted(
+                (lane for lane in self.lanes if now - self._last_seen[lane.name] > lane.max_wait_seconds),
+                key=lambda lane: now - self._last_seen[lane.name] - lane.max_wait_seconds,
+                reverse=True
+            )
+            for lane in overdue:
+                self._stats[lane.name]['promoted'] += 1
+
+            for lane in self.lanes:
+                self._current[lane.name] += lane.weight
+            by_credit = sorted(self.lanes, key=lambda lane: self._current[lane.name], reverse=True)
+            self._current[by_credit[0].name] -= self._total_weight
+
+            return overdue + [lane for lane in by_credit if lane not in overdue]
+
+    def served(self, lane: Lane):
+        with self._lock:
+            self._last_seen[lane.name] = self.clock()
+            self._stats[lane.name]['served'] += 1
+
+    def empty(self, lane: Lane):
+        with self._lock:
+            self._last_seen[lane.name] = self.clock()
+            self._stats[lane.name]['empty'] += 1
+
+    def poll_wait(self, max_wait_time: float) -> float:
+        """Per-lane receive wait: the whole wait for a single lane, a short poll otherwise"""
+        if len(self.lanes) == 1:
+            return max_wait_time
+        return float(os.environ.get('LANE_POLL_WAIT_SECONDS', '1'))
+
+    def receive(self, receivers: Dict[str, Any], max_message_count: int,
+                max_wait_time: float) -> Tuple[Optional[Lane], List[Any]]:
+        """Receive from the first lane in poll order that has messages"""
+        wait = self.poll_wait(max_wait_time)
+        for lane in self.order():
+            messages = receivers[lane.name].receive_messages(max_message_count=max_message_count, max_wait_time=wait)
+            if messages:
+                self.served(lane)
+                return lane, messages
+            self.empty(lane)
+        return None, []
+
+    async def receive_async(self, receivers: Dict[str, Any], max_message_count: int,
+                            max_wait_time: float) -> Tuple[Optional[Lane], List[Any]]:
+        """receive() for aio receivers"""
+        wait = self.poll_wait(max_wait_time)
+        for lane in self.order():
+            messages = await receivers[lane.name].receive_messages(
+                max_message_count=max_message_count, max_wait_time=wait
+            )
+            if messages:
+                self.served(lane)
+                return lane, messages
+            self.empty(lane)
+        return None, []
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {name: dict(counters) for name, counters in self._stats.items()}
@@ -0,0 +1,92 @@
+"""
+Coalescing job progress publisher for GenAI Underwriting Workbench (Azure version)
+Moves job status writes off the page-processing critical path: non-terminal updates are
+merged per job and flushed from a background thread at most once per interval, while
+terminal updates are written immediately, after anything still pending for that job.
+Shared by worker.py and azure-version/functions/document_extract.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressPublisher:
+    """Coalesces job status updates and writes them through write_fn(job_id, status, **fields)"""
+
+    def __init__(
+        self,
+        write_fn: Callable[..., Any],
+        interval: float = 2.0,
+        terminal_statuses: Iterable[str] = ('completed', 'failed')
+    ):
+        self.write_fn = write_fn
+        self.interval = interval
+        self.terminal_statuses = set(terminal_statuses)
+        self._pending: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._pending_lock = threading.Lock()
+        # Serializes writes so an older coalesced update can never land after a terminal one
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='progress-publisher', daemon=True)
+        self._thread.start()
+
+    def publish(self, job_id: str, status: str, **fields):
+        """Queue a status update; terminal statuses are written before returning"""
+        if status in self.terminal_statuses:
+            self._write_now(job_id, status, fields)
+            return
+
+        with self._pending_lock:
+            if job_id in self._pending:
+                # Later values win field by field, so a progress tick never drops a pending payload
+                _, merged = self._pending[job_id]
+                merged.update(fields)
+                self._pending[job_id] = (status, merged)
+            else:
+                self._pending[job_id] = (status, dict(fields))
+
+    def flush(self, job_id: Optional[str] = None):
+        """Write pending updates now, for one job or for all of them"""
+        with self._write_lock:
+            for pending_job_id, (status, fields) in self._take_pending(job_id):
+                self._write(pending_job_id, status, fields, raise_errors=False)
+
+    def close(self):
+        """Stop the background thread and write whatever is still pending"""
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+    def _take_pending(self, job_id: Optional[str] = None):
+        with self._pending_lock:
+            if job_id is None:
+                taken = list(self._pending.items())
+                self._pending.clear()
+            elif job_id in self._pending:
+                taken = [(job_id, self._pending.pop(job_id))]
+            else:
+                taken = []
+        return taken
+
+    def _write_now(self, job_id: str, status: str, fields: Dict[str, Any]):
+        with self._write_lock:
+            merged: Dict[str, Any] = {}
+            for _, (_, pending_fields) in self._take_pending(job_id):
+                merged.update(pending_fields)
+            merged.update(fields)
+            self._write(job_id, status, merged, raise_errors=True)
+
+    def _write(self, job_id: str, status: str, fields: Dict[str, Any], raise_errors: bool):
+        try:
+            self.write_fn(job_id, status, **fields)
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.warning(f"Failed to publish progress for job {job_id}: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
@@ -0,0 +1,234 @@
+"""
+Client-side Azure OpenAI quota limiter for GenAI Underwriting Workbench (Azure version)
+Token buckets for requests-per-minute and tokens-per-minute are charged before each chat
+completion with an estimate (prompt tokens plus max_tokens, as Azure OpenAI counts them),
+reconciled with the usage returned, and clamped to the x-ratelimit-remaining-* headers.
+Bucket state lives in a backend: in-process (shared by threads), a local file (shared by
+pods on one node via a hostPath volume) or Redis (shared by every pod).
+"""
+
+import os
+import json
+import time
+import fcntl
+import logging
+import threading
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Longest single sleep while waiting for quota, so shutdown and header updates are noticed
+MAX_WAIT_SLICE = 5.0
+
+
+class LocalBackend:
+    """Bucket state shared by the threads of one process"""
+
+    def __init__(self):
+        self._state: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def transact(self, fn: Callable[[Dict[str, Any]], Tuple[Dict[str, Any], Any]]):
+        with self._lock:
+            self._state, result = fn(dict(self._state))
+            return result
+
+
+class FileBackend:
+    """Bucket state in a locked JSON file, shared by processes on one node"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    def transact(self, fn: Callable[[Dict[str, Any]], Tuple[Dict[str, Any], Any]]):
+        with open(self.path, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                content = f.read()
+                state = json.loads(content) if content else {}
+                state, result = fn(state)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+                return result
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class RedisBackend:
+    """Bucket state in a Redis key, shared by every pod (requires the redis package)"""
+
+    def __init__(self, url: str, key: str = 'uw:openai-quota'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.key = key
+
+    def transact(self, fn: Callable[[Dict[str, Any]], Tuple[Dict[str, Any], Any]]):
+        outcome = {}
+
+        def apply(pipe):
+            content = pipe.get(self.key)
+            state, outcome['result'] = fn(json.loads(content) if content else {})
+            pipe.multi()
+            pipe.set(self.key, json.dumps(state), ex=300)
+
+        self.client.transaction(apply, self.key)
+        return outcome['result']
+
+
+def backend_from_url(url: Optional[str]):
+    """Build a backend from RATE_LIMIT_BACKEND: 'local', 'file:/path' or 'redis://...'"""
+    if not url or url == 'local':
+        return LocalBackend()
+    if url.startswith('file:'):
+        return FileBackend(url[len('file:'):])
+    if url.startswith(('redis://', 'rediss://')):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported rate limit backend: {url}")
+
+
+class OpenAIRateLimiter:
+    """Requests-per-minute and tokens-per-minute token buckets over a shared backend"""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, backend=None):
+        self.capacity = {'requests': float(requests_per_minute), 'tokens': float(tokens_per_minute)}
+        self.backend = backend or LocalBackend()
+
+    def _refill(self, state: Dict[str, Any], now: float) -> Dict[str, Any]:
+        elapsed = max(0.0, now - state.get('updatedAt', now))
+        for name, capacity in self.capacity.items():
+            level = state.get(name, capacity)
+            state[name] = min(capacity, level + capacity / 60.0 * elapsed)
+        state['updatedAt'] = now
+        return state
+
+    def acquire(self, estimated_tokens: int):
+        """Block until one request and estimated_tokens tokens are available, then take them"""
+        needed = {'requests': 1.0, 'tokens': float(min(estimated_tokens, self.capacity['tokens']))}
+
+        def take(state):
+            state = self._refill(state, time.time())
+            waits = [
+                (needed[name] - state[name]) / (self.capacity[name] / 60.0)
+                for name in needed
+                if state[name] < needed[name]
+            ]
+            if waits:
+                return state, max(waits)
+            for name in needed:
+                state[name] -= needed[name]
+            return state, 0.0
+
+        while True:
+            wait = self.backend.transact(take)
+            if wait <= 0:
+                return
+            logger.debug(f"OpenAI quota exhausted locally, waiting {wait:.2f}s")
+            time.sleep(min(wait, MAX_WAIT_SLICE))
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int):
+        """Return over-estimated tokens to the bucket, or charge the shortfall"""
+        delta = min(estimated_tokens, self.capacity['tokens']) - actual_tokens
+
+        def adjust(state):
+            state = self._refill(state, time.time())
+            state['tokens'] = min(self.capacity['tokens'], state['tokens'] + delta)
+            return state, None
+
+        self.backend.transact(adjust)
+
+    def observe_headers(self, headers):
+        """Clamp the buckets to the server's x-ratelimit-remaining-* view of the quota"""
+        remaining = {}
+        for name in ('requests', 'tokens'):
+            value = headers.get(f'x-ratelimit-remaining-{name}')
+            if value is not None:
+                try:
+                    remaining[name] = float(value)
+                except ValueError:
+                    pass
+        if not remaining:
+            return
+
+        def clamp(state):
+            state = self._refill(state, time.time())
+            for name, value in remaining.items():
+                state[name] = min(state[name], value)
+            return state, None
+
+        self.backend.transact(clamp)
+
+
+def estimate_prompt_tokens(messages) -> int:
+    """Rough prompt token estimate (about four characters per token plus message overhead)"""
+    return sum(len(message.get('content') or '') // 4 + 4 for message in messages)
+
+
+class _RateLimitedCompletions:
+    def __init__(self, completions, limiter: OpenAIRateLimiter):
+        self._completions = completions
+        self._limiter = limiter
+
+    def create(self, **kwargs):
+        if kwargs.get('stream'):
+            return self._reconciled_stream(kwargs)
+
+        estimated = estimate_prompt_tokens(kwargs.get('messages', [])) + int(kwargs.get('max_tokens') or 0)
+        self._limiter.acquire(estimated)
+
+        raw = self._completions.with_raw_response.create(**kwargs)
+        self._limiter.observe_headers(raw.headers)
+        response = raw.parse()
+
+        usage = getattr(response, 'usage', None)
+        if usage is not None and usage.total_tokens is not None:
+            self._limiter.reconcile(estimated, usage.total_tokens)
+        return response
+
+    def _reconciled_stream(self, kwargs):
+        # Nothing is requested until the stream is first read, so an unread stream holds nothing;
+        # once sent, the raw response is closed however reading ends (e.g. releasing a wrapped
+        # client's concurrency slot)
+        prompt_tokens = estimate_prompt_tokens(kwargs.get('messages', []))
+        estimated = prompt_tokens + int(kwargs.get('max_tokens') or 0)
+        self._limiter.acquire(estimated)
+
+        raw = self._completions.with_raw_response.create(**kwargs)
+        try:
+            self._limiter.observe_headers(raw.headers)
+
+            # Usage is only reported in the final chunk, and only when the request asked for it;
+            # otherwise reconcile from the prompt estimate plus the characters streamed back
+            reconciled = False
+            completion_chars = 0
+            for chunk in raw.parse():
+                usage = getattr(chunk, 'usage', None)
+                if usage is not None and usage.total_tokens is not None:
+                    self._limiter.reconcile(estimated, usage.total_tokens)
+                    reconciled = True
+                for choice in getattr(chunk, 'choices', None) or ():
+                    completion_chars += len(getattr(choice.delta, 'content', None) or '')
+                yield chunk
+            if not reconciled:
+                self._limiter.reconcile(estimated, prompt_tokens + completion_chars // 4)
+        finally:
+            close = getattr(raw, 'close', None)
+            if callable(close):
+                close()
+
+
+class RateLimitedOpenAI:
+    """Wraps an AzureOpenAI client so chat.completions.create goes through the limiter"""
+
+    def __init__(self, client, limiter: OpenAIRateLimiter):
+        self._client = client
+        self.limiter = limiter
+        self.chat = SimpleNamespace(completions=_RateLimitedCompletions(client.chat.completions, limiter))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
@@ -0,0 +1,112 @@
+"""
+Claim-check storage for large job results in GenAI Underwriting Workbench (Azure version)
+Heavy job fields (extractedData, analysis) are written to Blob Storage as immutable,
+compressed artifacts named after their content hash: page lists as page records (compressed
+JSON lines, see page_records.py), other values as gzip-compressed JSON. The Cosmos job
+document keeps only a pointer (<field>Ref) with the blob name, format version, sizes and sha256.
+Readers resolve pointers on demand. Shared by worker.py and api-server.py.
+"""
+
+import io
+import gzip
+import json
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from page_records import CODEC_EXTENSIONS, DEFAULT_CODEC, PageRecordReader, PageRecordWriter
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FORMAT = 'json+gzip'
+ARTIFACT_FORMAT_VERSION = 1
+
+# Job fields that are stored out of the job document when a result store is configured
+HEAVY_FIELDS = ('extractedData', 'analysis')
+
+
+class ArtifactIntegrityError(Exception):
+    """Raised when an artifact does not match the hash recorded in its pointer"""
+
+
+def ref_field(field: str) -> str:
+    """Name of the job document field that holds the pointer for field"""
+    return f'{field}Ref'
+
+
+class ResultStore:
+    """Writes and resolves compressed, content-addressed result artifacts"""
+
+    def __init__(self, blob_service_client, container_name: str, compresslevel: int = 6,
+                 record_codec: str = DEFAULT_CODEC):
+        self.blob_service_client = blob_service_client
+        self.container_name = container_name
+        self.compresslevel = compresslevel
+        self.record_codec = record_codec
+
+    def _encode(self, value: Any):
+        """Return (format, extension, compressed bytes, raw size, sha256 of the raw bytes)"""
+        if isinstance(value, list):
+            buffer = io.BytesIO()
+            with PageRecordWriter(buffer, self.record_codec) as writer:
+                for record in value:
+                    writer.write(record)
+            return (f'jsonl+{self.record_codec}', CODEC_EXTENSIONS[self.record_codec],
+                    buffer.getvalue(), writer.raw_bytes, writer.sha256)
+
+        raw = json.dumps(value, separators=(',', ':'), default=str).encode('utf-8')
+        return (ARTIFACT_FORMAT, '.json.gz', gzip.compress(raw, compresslevel=self.compresslevel),
+                len(raw), hashlib.sha256(raw).hexdigest())
+
+    def put(self, job_id: str, field: str, value: Any) -> Dict[str, Any]:
+        """Store value as a new artifact version and return its pointer"""
+        artifact_format, extension, compressed, raw_size, digest = self._encode(value)
+        blob_name = f"{job_id}/{field}/{digest[:16]}{extension}"
+
+        blob_client = self.blob_service_client.get_blob_client(self.container_name, blob_name)
+        blob_client.upload_blob(
+            compressed,
+            overwrite=True,
+            metadata={'sha256': digest, 'format': artifact_format, 'formatVersion': str(ARTIFACT_FORMAT_VERSION)}
+        )
+        logger.info(f"Stored {field} of job {job_id}: {raw_size} bytes as {len(compressed)} compressed")
+
+        return {
+            'container': self.container_name,
+            'blob': blob_name,
+            'format': artifact_format,
+            'formatVersion': ARTIFACT_FORMAT_VERSION,
+            'sha256': digest,
+            'sizeBytes': raw_size,
+            'storedBytes': len(compressed),
+            'storedAt': datetime.utcnow().isoformat()
+        }
+
+    def get(self, pointer: Dict[str, Any]) -> Any:
+        """Download, decompress and verify the artifact a pointer refers to"""
+        artifact_format = pointer.get('format', '')
+        if artifact_format != ARTIFACT_FORMAT and not artifact_format.startswith('jsonl+'):
+            raise ValueError(f"Unsupported artifact format: {artifact_format}")
+
+        blob_client = self.blob_service_client.get_blob_client(pointer['container'], pointer['blob'])
+        data = blob_client.download_blob().readall()
+
+        if artifact_format == ARTIFACT_FORMAT:
+            raw = gzip.decompress(data)
+            digest, value = hashlib.sha256(raw).hexdigest(), json.loads(raw)
+        else:
+            reader = PageRecordReader(io.BytesIO(data))
+            value = list(reader)
+            digest = reader.sha256
+
+        if digest != pointer['sha256']:
+            raise ArtifactIntegrityError(f"Artifact {pointer['blob']} does not match its sha256")
+        return value
+
+    def resolve(self, job: Dict[str, Any], field: str) -> Optional[Any]:
+        """Return a heavy field of a job document, following its pointer if it has one"""
+        pointer = job.get(ref_field(field))
+        if pointer:
+            return self.get(pointer)
+        return job.get(field)
@@ -0,0 +1,280 @@
+"""
+Shared retry policy for GenAI Underwriting Workbench (Azure version)
+Retries only errors that can succeed on a second attempt (throttling, timeouts, 5xx and
+connection failures), sleeps with decorrelated jitter or for the server's Retry-After, and
+gives up once an operation's attempt or time budget is spent. A circuit breaker per
+downstream (cosmos, blob, servicebus, openai) fails calls fast while the service is down,
+so an outage does not pile up sleeping threads. Throttling is retried but never trips the
+breaker: a service answering 429 is up, and short-circuiting it would turn a brief quota
+wait into failed work.
+Shared by worker.py (which async_worker.py runs on its job threads), api-server.py and the
+Azure Functions.
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 429, 449, 500, 502, 503, 504}
+
+# Throttling: the downstream is healthy but asks the caller to slow down
+THROTTLED_STATUS_CODES = {429}
+THROTTLED_ERROR_NAMES = {'RateLimitError', 'ServiceBusServerBusyError'}
+
+# Transient errors raised without an HTTP status (connection resets, SDK timeouts)
+RETRYABLE_ERROR_NAMES = {
+    'ServiceRequestError', 'ServiceResponseError', 'ServiceRequestTimeoutError',
+    'ServiceResponseTimeoutError', 'IncompleteReadError', 'OperationTimeoutError',
+    'ServiceBusConnectionError', 'ServiceBusCommunicationError', 'ServiceBusServerBusyError',
+    'APIConnectionError', 'APITimeoutError', 'RateLimitError', 'InternalServerError'
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the downstream while its circuit breaker is open"""
+
+    def __init__(self, downstream: str, retry_in: float):
+        super().__init__(f"Circuit open for {downstream}, retry in {retry_in:.1f}s")
+        self.downstream = downstream
+        self.retry_in = retry_in
+
+
+class RetryPolicy:
+    """Attempt and time budget for one operation, with decorrelated jitter between attempts"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 10.0,
+                 budget_seconds: float = 30.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_seconds = budget_seconds
+
+    def next_delay(self, previous_delay: float) -> float:
+        """Decorrelated jitter: uniform between the base delay and three times the last delay"""
+        return min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous_delay * 3)))
+
+
+# The OpenAI client is built with max_retries=0, so this policy is its only retry layer: it
+# covers the SDK's former three retries plus one, with room for Retry-After waits on 429s
+DEFAULT_POLICIES = {
+    'cosmos': RetryPolicy(max_attempts=4, base_delay=0.2, max_delay=5.0, budget_seconds=20.0),
+    'blob': RetryPolicy(max_attempts=4, base_delay=0.5, max_delay=10.0, budget_seconds=60.0),
+    'servicebus': RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=10.0, budget_seconds=30.0),
+    'openai': RetryPolicy(max_attempts=5, base_delay=2.0, max_delay=30.0, budget_seconds=300.0),
+}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Classify an error as transient (retry) or fatal (raise at once)"""
+    if isinstance(error, CircuitOpenError):
+        return False
+
+    # Service Bus errors say for themselves whether a retry can help
+    retryable = getattr(error, 'retryable', None)
+    if isinstance(retryable, bool):
+        return retryable
+
+    status_code = getattr(error, 'status_code', None)
+    if isinstance(status_code, int):
+        return status_code in RETRYABLE_STATUS_CODES
+
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+def is_throttled(error: BaseException) -> bool:
+    if getattr(error, 'status_code', None) in THROTTLED_STATUS_CODES:
+        return True
+    return type(error).__name__ in THROTTLED_ERROR_NAMES
+
+
+def _error_headers(error: BaseException):
+    headers = getattr(error, 'headers', None)
+    if headers is None:
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+    return headers or {}
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Server-requested delay from Retry-After, retry-after-ms or x-ms-retry-after-ms headers"""
+    headers = _error_headers(error)
+    try:
+        for name in ('x-ms-retry-after-ms', 'retry-after-ms'):
+            value = headers.get(name)
+            if value is not None:
+                return float(value) / 1000.0
+
+        value = headers.get('Retry-After') or headers.get('retry-after')
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class CircuitBreaker:
+    """Opens after consecutive transient failures, then lets one probe through per reset window"""
+
+    def __init__(self, downstream: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.downstream = downstream
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not reach the downstream"""
+        with self._lock:
+            if self.state == 'closed':
+                return
+            retry_in = self._opened_at + self.reset_seconds - time.monotonic()
+            if self.state == 'open' and retry_in <= 0:
+                self.state = 'half-open'
+            if self.state == 'half-open' and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+        _count(self.downstream, 'shortCircuits')
+        raise CircuitOpenError(self.downstream, max(0.0, retry_in))
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                logger.info(f"Circuit for {self.downstream} closed")
+            self.state = 'closed'
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self.state == 'half-open' or self._failures >= self.failure_threshold:
+                if self.state != 'open':
+                    logger.warning(f"Circuit for {self.downstream} opened after {self._failures} failures")
+                    _count_locked(self.downstream, 'circuitOpens')
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+
+    def release_probe(self):
+        """A fatal error proves the downstream answered, but does not count as health either way"""
+        with self._lock:
+            if self.state == 'half-open':
+                self.state = 'closed'
+                self._failures = 0
+            self._probe_in_flight = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+_registry_lock = threading.Lock()
+_STAT_NAMES = ('calls', 'attempts', 'retries', 'failures', 'throttled', 'fatalErrors', 'budgetExhausted',
+               'shortCircuits', 'circuitOpens')
+
+
+def get_breaker(downstream: str) -> CircuitBreaker:
+    with _registry_lock:
+        if downstream not in _breakers:
+            _breakers[downstream] = CircuitBreaker(
+                downstream,
+                failure_threshold=int(os.environ.get('CIRCUIT_BREAKER_FAILURE_THRESHOLD', '5')),
+                reset_seconds=float(os.environ.get('CIRCUIT_BREAKER_RESET_SECONDS', '30'))
+            )
+        return _breakers[downstream]
+
+
+def _count_locked(downstream: str, name: str):
+    counters = _stats.setdefault(downstream, dict.fromkeys(_STAT_NAMES, 0))
+    counters[name] += 1
+
+
+def _count(downstream: str, name: str):
+    with _registry_lock:
+        _count_locked(downstream, name)
+
+
+def retry_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of retry counters and circuit state per downstream"""
+    with _registry_lock:
+        snapshot = {downstream: dict(counters) for downstream, counters in _stats.items()}
+        for downstream, breaker in _breakers.items():
+            snapshot.setdefault(downstream, dict.fromkeys(_STAT_NAMES, 0))['circuitState'] = breaker.state
+    return snapshot
+
+
+class _Attempts:
+    """Attempt, breaker and budget bookkeeping of one retried call"""
+
+    def __init__(self, downstream: str, operation: Optional[str], policy: Optional[RetryPolicy]):
+        self.downstream = downstream
+        self.operation = operation or downstream
+        self.policy = policy or DEFAULT_POLICIES.get(downstream, RetryPolicy())
+        self.breaker = get_breaker(downstream)
+        self.deadline = time.monotonic() + self.policy.budget_seconds
+        self.delay = self.policy.base_delay
+        self.attempt = 0
+        _count(downstream, 'calls')
+
+    def start(self):
+        self.breaker.before_call()
+        self.attempt += 1
+        _count(self.downstream, 'attempts')
+
+    def succeeded(self):
+        self.breaker.record_success()
+
+    def failed(self, error: BaseException) -> float:
+        """Return how long to sleep before the next attempt, or re-raise the error"""
+        if not is_retryable(error):
+            self.breaker.release_probe()
+            _count(self.downstream, 'fatalErrors')
+            raise error
+
+        if is_throttled(error):
+            # An answer, just not yet: retry after Retry-After without counting against the breaker
+            self.breaker.release_probe()
+            _count(self.downstream, 'throttled')
+        else:
+            self.breaker.record_failure()
+            _count(self.downstream, 'failures')
+        if self.attempt >= self.policy.max_attempts or self.breaker.state == 'open':
+            raise error
+
+        server_delay = retry_after_seconds(error)
+        self.delay = self.policy.next_delay(self.delay)
+        sleep_for = server_delay if server_delay is not None else self.delay
+        if time.monotonic() + sleep_for > self.deadline:
+            _count(self.downstream, 'budgetExhausted')
+            logger.warning(f"{self.operation} out of retry budget after {self.attempt} attempts: {error}")
+            raise error
+
+        _count(self.downstream, 'retries')
+        logger.warning(f"{self.operation} attempt {self.attempt} failed, retrying in {sleep_for:.2f}s: {error}")
+        return sleep_for
+
+
+def retry_call(func: Callable[[], Any], downstream: str, operation: Optional[str] = None,
+               policy: Optional[RetryPolicy] = None):
+    """Call func under the downstream's circuit breaker, retrying transient failures"""
+    attempts = _Attempts(downstream, operation, policy)
+    while True:
+        attempts.start()
+        try:
+            result = func()
+        except Exception as e:
+            time.sleep(attempts.failed(e))
+            continue
+        attempts.succeeded()
+        return result
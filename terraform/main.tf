@@ -175,6 +175,47 @@ resource "azurerm_storage_container" "documents" {
   container_access_type = "private"
 }
 
+# Claim-check artifacts (extracted data and analysis) referenced from job documents
+resource "azurerm_storage_container" "job_results" {
+  name                  = "job-results"
+  storage_account_name  = azurerm_storage_account.storage.name
+  container_access_type = "private"
+}
+
+# Per-page analysis checkpoints so redelivered worker jobs resume
+resource "azurerm_storage_container" "job_checkpoints" {
+  name                  = "job-checkpoints"
+  storage_account_name  = azurerm_storage_account.storage.name
+  container_access_type = "private"
+}
+
+# Checkpoints of completed and cancelled jobs are cleared by the worker; this removes the ones
+# left behind by jobs that were dead-lettered or never finished
+resource "azurerm_storage_management_policy" "checkpoint_retention" {
+  storage_account_id = azurerm_storage_account.storage.id
+
+  rule {
+    name    = "expire-job-checkpoints"
+    enabled = true
+    filters {
+      prefix_match = ["${azurerm_storage_container.job_checkpoints.name}/"]
+      blob_types   = ["blockBlob"]
+    }
+    actions {
+      base_blob {
+        delete_after_days_since_modification_greater_than = var.checkpoint_retention_days
+      }
+    }
+  }
+}
+
+# Shared tier of the worker's page analysis cache
+resource "azurerm_storage_container" "page_analysis_cache" {
+  name                  = "page-analysis-cache"
+  storage_account_name  = azurerm_storage_account.storage.name
+  container_access_type = "private"
+}
+
 # Role assignment: Workload Identity access to Storage
 resource "azurerm_role_assignment" "workload_storage" {
   scope              = azurerm_storage_account.storage.id
@@ -239,6 +280,19 @@ resource "azurerm_cosmosdb_sql_container" "jobs" {
   depends_on = [azurerm_cosmosdb_sql_database.underwriting]
 }
 
+# Cosmos DB Container indexing completed documents by PDF content hash (worker dedup)
+resource "azurerm_cosmosdb_sql_container" "document_fingerprints" {
+  name                = "document-fingerprints"
+  resource_group_name = azurerm_resource_group.rg.name
+  account_name        = azurerm_cosmosdb_account.cosmos.name
+  database_name       = azurerm_cosmosdb_sql_database.underwriting.name
+  partition_key_paths = ["/id"]
+
+  default_ttl = 604800 # 7 days in seconds; entries may carry their own ttl
+
+  depends_on = [azurerm_cosmosdb_sql_database.underwriting]
+}
+
 # Role assignment: Workload Identity access to Cosmos
 resource "azurerm_role_assignment" "workload_cosmos" {
   scope              = azurerm_cosmosdb_account.cosmos.id
@@ -267,6 +321,27 @@ resource "azurerm_servicebus_queue" "extraction_queue" {
   depends_on = [azurerm_servicebus_namespace.sb]
 }
 
+# Priority lanes: small documents skip the queue behind large packets (see PRIORITY_LANES)
+resource "azurerm_servicebus_queue" "extraction_queue_fast" {
+  name                = "document-extraction-fast"
+  namespace_id        = azurerm_servicebus_namespace.sb.id
+  max_delivery_count  = 10
+  lock_duration       = "PT5M"
+  default_message_ttl = "P1D"
+
+  depends_on = [azurerm_servicebus_namespace.sb]
+}
+
+resource "azurerm_servicebus_queue" "extraction_queue_bulk" {
+  name                = "document-extraction-bulk"
+  namespace_id        = azurerm_servicebus_namespace.sb.id
+  max_delivery_count  = 10
+  lock_duration       = "PT5M"
+  default_message_ttl = "P1D"
+
+  depends_on = [azurerm_servicebus_namespace.sb]
+}
+
 # Role assignment: Workload Identity access to Service Bus
 resource "azurerm_role_assignment" "workload_servicebus" {
   scope              = azurerm_servicebus_namespace.sb.id
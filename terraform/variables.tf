@@ -71,6 +71,12 @@ variable "storage_account_replication_type" {
   default     = "LRS"
 }
 
+variable "checkpoint_retention_days" {
+  type        = number
+  description = "Days before page analysis checkpoints left by abandoned jobs are deleted"
+  default     = 7
+}
+
 # Cosmos DB Configuration
 variable "cosmos_db_tier" {
   type        = string
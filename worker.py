@@ -11,12 +11,20 @@ import logging
 import time
 import signal
 import io
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+import threading
+import hashlib
+import tempfile
+import multiprocessing
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Any, Optional, Tuple
 
-from azure.cosmos import CosmosClient
+from azure.cosmos import CosmosClient, exceptions as cosmos_exceptions
 from azure.storage.blob import BlobServiceClient
-from azure.servicebus import ServiceBusClient, ServiceBusReceiveMode
+from azure.servicebus import ServiceBusClient, ServiceBusMessage, ServiceBusReceiveMode
 from azure.identity import DefaultAzureCredential
 from openai import AzureOpenAI
 
@@ -27,6 +35,21 @@ except ImportError:
 
 from PIL import Image
 
+from progress_publisher import ProgressPublisher
+from page_cache import PageAnalysisCache
+from result_store import ResultStore, ref_field
+from rate_limiter import OpenAIRateLimiter, RateLimitedOpenAI, backend_from_url
+from adaptive_concurrency import AdaptiveConcurrencyLimiter, ConcurrencyLimitedOpenAI
+from retry_policy import retry_call, retry_stats
+from health_server import HealthState, start_health_server
+from incremental_json import Event, IncrementalJSONParser
+from priority_lanes import LaneScheduler, choose_lane, load_lanes
+import local_fakes
+from worker_metrics import (
+    JOBS, JOBS_IN_FLIGHT, WorkerStatsCollector, instrumented_stage, record_queue_receive_latency,
+    record_stage_error, record_token_usage, start_metrics_server
+)
+
 # Configure logging
 logging.basicConfig(
     level=os.environ.get('LOG_LEVEL', 'INFO'),
@@ -37,12 +60,46 @@ logger = logging.getLogger(__name__)
 # Global flag for graceful shutdown
 shutdown_flag = False
 
+# Heartbeats and readiness conditions served by the health server
+health_state = HealthState()
+
+# Heartbeat name of the job running on each thread; jobs in flight together each get their own
+_current_job = threading.local()
+
+
+def job_heartbeat_name(message_body: Dict[str, Any]) -> str:
+    name = f"job:{message_body.get('jobId')}"
+    page_range = message_body.get('pageRange')
+    if page_range is not None:
+        name += f":{range_key(page_range['index'])}"
+    return name
+
+
+@contextlib.contextmanager
+def monitored_job(message_body: Dict[str, Any], timeout: float):
+    """Monitor the heartbeat of the job run on this thread for the duration of the block"""
+    name = job_heartbeat_name(message_body)
+    _current_job.heartbeat = name
+    try:
+        with health_state.monitored(name, timeout):
+            yield
+    finally:
+        _current_job.heartbeat = None
+
+
+def beat_job():
+    """Beat the heartbeat of the job running on the calling thread"""
+    name = getattr(_current_job, 'heartbeat', None)
+    if name is not None:
+        health_state.beat(name)
+
 
 def signal_handler(signum, frame):
     """Handle shutdown signals"""
     global shutdown_flag
     logger.info(f"Received signal {signum}, initiating graceful shutdown...")
     shutdown_flag = True
+    health_state.set_condition('accepting', 'draining')
 
 
 # Register signal handlers
@@ -50,6 +107,21 @@ signal.signal(signal.SIGTERM, signal_handler)
 signal.signal(signal.SIGINT, signal_handler)
 
 
+def adaptive_concurrency_enabled() -> bool:
+    return os.environ.get('OPENAI_ADAPTIVE_CONCURRENCY', 'true').lower() == 'true'
+
+
+def page_analysis_workers() -> int:
+    """
+    Threads per job for page analysis. With adaptive concurrency on, the limiter bounds the calls
+    in flight, so the pool is sized to its ceiling rather than silently capping it.
+    """
+    workers = int(os.environ.get('PAGE_ANALYSIS_CONCURRENCY', '4'))
+    if adaptive_concurrency_enabled():
+        workers = max(workers, int(os.environ.get('OPENAI_CONCURRENCY_MAX', '16')))
+    return workers
+
+
 class AzureClients:
     """Manages Azure service clients with lazy initialization"""
     
@@ -59,12 +131,22 @@ class AzureClients:
         self._servicebus_client = None
         self._openai_client = None
         self._jobs_container = None
+        self._fingerprints_container = None
+        self._progress_publisher = None
+        self._page_cache = None
+        self._result_store = None
     
     def get_cosmos_container(self):
         """Get Cosmos DB jobs container"""
         if self._jobs_container is not None:
             return self._jobs_container
         
+        if local_fakes.enabled():
+            self._cosmos_client = local_fakes.cosmos_client()
+            database = self._cosmos_client.get_database_client(os.environ.get('COSMOS_DB_NAME', 'underwriting'))
+            self._jobs_container = database.get_container_client(os.environ.get('COSMOS_JOBS_CONTAINER', 'jobs'))
+            return self._jobs_container
+        
         cosmos_endpoint = os.environ.get('COSMOS_DB_ENDPOINT')
         cosmos_key = os.environ.get('COSMOS_DB_KEY')
         
@@ -93,11 +175,28 @@ class AzureClients:
             logger.error(f"Failed to initialize Cosmos DB: {e}")
             raise
     
+    def get_fingerprints_container(self):
+        """Get the Cosmos DB container indexing completed documents by content hash"""
+        if self._fingerprints_container is not None:
+            return self._fingerprints_container
+        
+        self.get_cosmos_container()
+        database_name = os.environ.get('COSMOS_DB_NAME', 'underwriting')
+        container_name = os.environ.get('COSMOS_FINGERPRINTS_CONTAINER', 'document-fingerprints')
+        
+        database = self._cosmos_client.get_database_client(database_name)
+        self._fingerprints_container = database.get_container_client(container_name)
+        return self._fingerprints_container
+    
     def get_blob_service_client(self):
         """Get Blob Storage client"""
         if self._blob_service_client is not None:
             return self._blob_service_client
         
+        if local_fakes.enabled():
+            self._blob_service_client = local_fakes.blob_service_client()
+            return self._blob_service_client
+        
         storage_account_name = os.environ.get('STORAGE_ACCOUNT_NAME')
         storage_conn_string = os.environ.get('STORAGE_CONNECTION_STRING')
         
@@ -126,6 +225,10 @@ class AzureClients:
         if self._servicebus_client is not None:
             return self._servicebus_client
         
+        if local_fakes.enabled():
+            self._servicebus_client = local_fakes.servicebus_client()
+            return self._servicebus_client
+        
         servicebus_namespace = os.environ.get('SERVICE_BUS_NAMESPACE')
         servicebus_conn_string = os.environ.get('SERVICE_BUS_CONNECTION_STRING')
         
@@ -161,44 +264,190 @@ class AzureClients:
         openai_key = os.environ.get('AZURE_OPENAI_KEY') or os.environ.get('OPENAI_API_KEY')
         api_version = os.environ.get('OPENAI_API_VERSION', '2024-02-15-preview')
         
-        if not openai_endpoint or not openai_key:
+        if not local_fakes.enabled() and (not openai_endpoint or not openai_key):
             raise ValueError("AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_KEY are required")
         
         try:
-            self._openai_client = AzureOpenAI(
-                api_key=openai_key,
-                api_version=api_version,
-                azure_endpoint=openai_endpoint,
-                timeout=60.0,
-                max_retries=3
-            )
-            logger.info("Connected to Azure OpenAI")
+            if local_fakes.enabled():
+                # The stand-in still goes through the rate and concurrency limiters below
+                self._openai_client = local_fakes.openai_client()
+                logger.info("Using local Azure OpenAI stand-in")
+            else:
+                self._openai_client = AzureOpenAI(
+                    api_key=openai_key,
+                    api_version=api_version,
+                    azure_endpoint=openai_endpoint,
+                    timeout=60.0,
+                    # retry_call owns retries, so 429s and timeouts reach the concurrency limiter
+                    max_retries=0
+                )
+                logger.info("Connected to Azure OpenAI")
+            
+            # Back off concurrency on 429s, timeouts and slow responses, and probe upwards when healthy.
+            # The limiter wraps the raw client so its slot (and latency sample) covers only the HTTP call
+            if adaptive_concurrency_enabled():
+                max_limit = int(os.environ.get('OPENAI_CONCURRENCY_MAX', '16'))
+                concurrency_limiter = AdaptiveConcurrencyLimiter(
+                    initial_limit=int(os.environ.get('OPENAI_CONCURRENCY_INITIAL', os.environ.get('PAGE_ANALYSIS_CONCURRENCY', '4'))),
+                    min_limit=int(os.environ.get('OPENAI_CONCURRENCY_MIN', '1')),
+                    max_limit=max_limit,
+                    latency_target=float(os.environ.get('OPENAI_LATENCY_TARGET_SECONDS', '20'))
+                )
+                self._openai_client = ConcurrencyLimitedOpenAI(self._openai_client, concurrency_limiter)
+                logger.info(f"Adaptive OpenAI concurrency enabled (max {max_limit} calls in flight)")
+            
+            # Share the deployment's quota between threads (and pods, with a shared backend); quota waits
+            # happen outside the concurrency slot
+            tokens_per_minute = os.environ.get('OPENAI_TPM_LIMIT')
+            if tokens_per_minute:
+                requests_per_minute = os.environ.get('OPENAI_RPM_LIMIT') or int(tokens_per_minute) * 6 // 1000
+                limiter = OpenAIRateLimiter(
+                    requests_per_minute=float(requests_per_minute),
+                    tokens_per_minute=float(tokens_per_minute),
+                    backend=backend_from_url(os.environ.get('RATE_LIMIT_BACKEND', 'local'))
+                )
+                self._openai_client = RateLimitedOpenAI(self._openai_client, limiter)
+                logger.info(f"Rate limiting Azure OpenAI to {tokens_per_minute} TPM / {requests_per_minute} RPM")
+            
             return self._openai_client
         
         except Exception as e:
             logger.error(f"Failed to initialize Azure OpenAI: {e}")
             raise
+    
+    def get_progress_publisher(self) -> ProgressPublisher:
+        """Get the job progress publisher that writes status updates off the critical path"""
+        if self._progress_publisher is not None:
+            return self._progress_publisher
+        
+        jobs_container = self.get_cosmos_container()
+        result_store = self.get_result_store()
+        self._progress_publisher = ProgressPublisher(
+            lambda job_id, status, **fields: update_job_status(
+                jobs_container, job_id, status, result_store=result_store, **fields
+            ),
+            interval=float(os.environ.get('PROGRESS_FLUSH_INTERVAL', '2'))
+        )
+        return self._progress_publisher
+    
+    def get_page_cache(self) -> Optional[PageAnalysisCache]:
+        """Get the page analysis cache, or None when caching is disabled"""
+        if os.environ.get('PAGE_CACHE_ENABLED', 'true').lower() != 'true':
+            return None
+        if self._page_cache is not None:
+            return self._page_cache
+        
+        container_client = None
+        cache_container = os.environ.get('PAGE_CACHE_BLOB_CONTAINER')
+        if cache_container:
+            container_client = self.get_blob_service_client().get_container_client(cache_container)
+            logger.info(f"Using shared page cache in blob container: {cache_container}")
+        
+        self._page_cache = PageAnalysisCache(
+            prompt_version=PAGE_ANALYSIS_PROMPT_VERSION,
+            deployment=os.environ.get('AZURE_OPENAI_DEPLOYMENT', 'gpt-4'),
+            max_entries=int(os.environ.get('PAGE_CACHE_MAX_ENTRIES', '2048')),
+            container_client=container_client,
+            ttl_seconds=float(os.environ.get('PAGE_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+        )
+        return self._page_cache
+    
+    def get_result_store(self) -> Optional[ResultStore]:
+        """Get the claim-check store for heavy job fields, or None to keep them in the job document"""
+        container_name = os.environ.get('RESULTS_BLOB_CONTAINER', 'job-results')
+        if not container_name:
+            return None
+        if self._result_store is None:
+            self._result_store = ResultStore(self.get_blob_service_client(), container_name)
+        return self._result_store
+    
+    def get_page_checkpoint_store(self, job_id: str) -> Optional['PageCheckpointStore']:
+        """Get the per-page checkpoint store for a job, or None when checkpointing is disabled"""
+        container_name = os.environ.get('CHECKPOINT_BLOB_CONTAINER', 'job-checkpoints')
+        if not container_name:
+            return None
+        container_client = self.get_blob_service_client().get_container_client(container_name)
+        return PageCheckpointStore(container_client, job_id)
+    
+    def close(self):
+        """Flush pending progress updates before shutdown"""
+        if self._progress_publisher is not None:
+            self._progress_publisher.close()
+
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+# Non-terminal updates must never move a completed or cancelled job back to processing
+NOT_COMPLETED_PREDICATE = "FROM c WHERE c.status != 'completed' AND c.status != 'cancelled'"
+
+# Nor may a worker finish a job that was cancelled through the API
+NOT_CANCELLED_PREDICATE = "FROM c WHERE c.status != 'cancelled'"
 
+# Hashes of the large fields last written per job, so unchanged payloads are not rewritten
+_large_field_hashes: Dict[str, Dict[str, str]] = {}
 
-def with_retries(func, max_retries: int = 3, base_delay: float = 0.5, factor: float = 2.0):
-    """Execute function with exponential backoff retries"""
-    last_exception = None
+
+def _large_field_changed(job_id: str, field: str, value: Any) -> bool:
+    """Return True (and remember the new hash) if a large field differs from the last write"""
+    digest = hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    job_hashes = _large_field_hashes.setdefault(job_id, {})
+    if job_hashes.get(field) == digest:
+        return False
+    job_hashes[field] = digest
+    return True
+
+
+def forget_large_fields(job_id: str):
+    """Drop a job's large-field hashes after a failed write, so the next update rewrites the fields"""
+    _large_field_hashes.pop(job_id, None)
+
+
+def _offload_large_fields(result_store: ResultStore, job_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Store changed heavy fields as blob artifacts and return the pointer fields for the job document"""
+    pointers = {}
+    for field, value in fields.items():
+        if value is None or not _large_field_changed(job_id, field, value):
+            continue
+        pointers[ref_field(field)] = retry_call(
+            lambda: result_store.put(job_id, field, value), 'blob', f'Store of {field} for job {job_id}'
+        )
+    return pointers
+
+
+def build_job_patch(
+    job_id: str,
+    status: str,
+    progress: Optional[Dict[str, Any]] = None,
+    extracted_data: Optional[List[Dict[str, Any]]] = None,
+    analysis: Optional[Dict[str, Any]] = None,
+    error: Optional[Dict[str, str]] = None,
+    extra_fields: Optional[Dict[str, Any]] = None
+):
+    """Build Cosmos patch operations and filter predicate for a job status update"""
+    operations = [
+        {'op': 'set', 'path': '/status', 'value': status},
+        {'op': 'set', 'path': '/updatedAt', 'value': datetime.utcnow().isoformat()}
+    ]
     
-    for attempt in range(1, max_retries + 1):
-        try:
-            return func()
-        except Exception as e:
-            last_exception = e
-            if attempt == max_retries:
-                break
-            
-            delay = base_delay * (factor ** (attempt - 1))
-            logger.warning(f"Attempt {attempt} failed, retrying in {delay}s: {e}")
-            time.sleep(delay)
+    if progress is not None:
+        operations.append({'op': 'set', 'path': '/progress', 'value': progress})
+    if extracted_data is not None and _large_field_changed(job_id, 'extractedData', extracted_data):
+        operations.append({'op': 'set', 'path': '/extractedData', 'value': extracted_data})
+    if analysis is not None and _large_field_changed(job_id, 'analysis', analysis):
+        operations.append({'op': 'set', 'path': '/analysis', 'value': analysis})
+    if error is not None:
+        operations.append({'op': 'set', 'path': '/error', 'value': error})
+    for field, value in (extra_fields or {}).items():
+        operations.append({'op': 'set', 'path': f'/{field}', 'value': value})
     
-    raise last_exception
+    if status in TERMINAL_STATUSES:
+        _large_field_hashes.pop(job_id, None)
+        return operations, NOT_CANCELLED_PREDICATE
+    
+    return operations, NOT_COMPLETED_PREDICATE
 
 
+@instrumented_stage('cosmos_write')
 def update_job_status(
     jobs_container,
     job_id: str,
@@ -206,34 +455,83 @@ def update_job_status(
     progress: Optional[Dict[str, Any]] = None,
     extracted_data: Optional[List[Dict[str, Any]]] = None,
     analysis: Optional[Dict[str, Any]] = None,
-    error: Optional[Dict[str, str]] = None
+    error: Optional[Dict[str, str]] = None,
+    extra_fields: Optional[Dict[str, Any]] = None,
+    result_store: Optional[ResultStore] = None
 ):
-    """Update job status in Cosmos DB"""
+    """Update job status in Cosmos DB with a partial-document patch"""
     try:
-        def read_and_update():
-            job = jobs_container.read_item(item=job_id, partition_key=job_id)
-            job['status'] = status
-            job['updatedAt'] = datetime.utcnow().isoformat()
-            
-            if progress is not None:
-                job['progress'] = progress
-            if extracted_data is not None:
-                job['extractedData'] = extracted_data
-            if analysis is not None:
-                job['analysis'] = analysis
-            if error is not None:
-                job['error'] = error
-            
-            return jobs_container.upsert_item(job)
+        if result_store is not None:
+            # Claim check: the job document keeps pointers, the payloads go to Blob Storage
+            pointers = _offload_large_fields(
+                result_store, job_id, {'extractedData': extracted_data, 'analysis': analysis}
+            )
+            extracted_data, analysis = None, None
+            extra_fields = {**(extra_fields or {}), **pointers}
+        
+        operations, filter_predicate = build_job_patch(
+            job_id, status, progress, extracted_data, analysis, error, extra_fields
+        )
+        
+        def patch():
+            try:
+                return jobs_container.patch_item(
+                    item=job_id,
+                    partition_key=job_id,
+                    patch_operations=operations,
+                    filter_predicate=filter_predicate
+                )
+            except cosmos_exceptions.CosmosHttpResponseError as e:
+                if e.status_code == 412:
+                    logger.info(f"Skipped update of job {job_id} to {status}: job already completed or cancelled")
+                    return None
+                raise
         
-        with_retries(read_and_update)
+        retry_call(patch, 'cosmos', f'Update of job {job_id}')
         logger.info(f"Updated job {job_id} status to {status}")
     
     except Exception as e:
+        # Hashes are recorded before the blob put and the patch; if either failed, the fields
+        # (or the pointers to them) never landed, so the next update must write them again
+        forget_large_fields(job_id)
         logger.error(f"Failed to update job {job_id} status: {e}")
         raise
 
 
+class JobCancelledError(Exception):
+    """Raised between pages once a job has been cancelled through the API"""
+
+
+class CancellationCheck:
+    """
+    Callable that raises JobCancelledError once the job's cancelRequested flag is set.
+    The job document is read at most once per interval, however many threads call it.
+    """
+    
+    def __init__(self, jobs_container, job_id: str, interval: Optional[float] = None):
+        self.jobs_container = jobs_container
+        self.job_id = job_id
+        self.interval = interval if interval is not None else float(os.environ.get('CANCELLATION_CHECK_INTERVAL', '1'))
+        self.cancelled = False
+        self._checked_at = float('-inf')
+        self._lock = threading.Lock()
+    
+    def __call__(self):
+        with self._lock:
+            now = time.monotonic()
+            if not self.cancelled and now - self._checked_at >= self.interval:
+                self._checked_at = now
+                try:
+                    job = self.jobs_container.read_item(item=self.job_id, partition_key=self.job_id)
+                    self.cancelled = bool(job.get('cancelRequested'))
+                except Exception as e:
+                    # An unreadable flag must not fail the job; the next check tries again
+                    logger.warning(f"Cancellation check for job {self.job_id} failed: {e}")
+        if self.cancelled:
+            raise JobCancelledError(f"Job {self.job_id} was cancelled")
+
+
+@instrumented_stage('download')
 def download_pdf(blob_service_client, blob_path: str) -> bytes:
     """Download PDF from Blob Storage"""
     try:
@@ -250,7 +548,7 @@ def download_pdf(blob_service_client, blob_path: str) -> bytes:
             blob_client = blob_service_client.get_blob_client(container_name, blob_name)
             return blob_client.download_blob().readall()
         
-        pdf_content = with_retries(download)
+        pdf_content = retry_call(download, 'blob', f'Download of {blob_path}')
         logger.info(f"Downloaded {len(pdf_content)} bytes")
         return pdf_content
     
@@ -259,42 +557,209 @@ def download_pdf(blob_service_client, blob_path: str) -> bytes:
         raise
 
 
-def extract_text_from_pdf(pdf_content: bytes) -> List[Dict[str, Any]]:
-    """Extract text from PDF pages"""
+class PageCheckpointStore:
+    """Durable per-page analysis checkpoints in Blob Storage, so redelivered jobs resume"""
+    
+    def __init__(self, container_client, job_id: str):
+        self.container_client = container_client
+        self.prefix = f"{job_id}/pages/"
+    
+    @instrumented_stage('checkpoint_load')
+    def load(self, pages: Optional[range] = None) -> Dict[int, Dict[str, Any]]:
+        """Return checkpointed page analyses keyed by page number, optionally only for some pages"""
+        analyses = {}
+        try:
+            for blob in self.container_client.list_blobs(name_starts_with=self.prefix):
+                if pages is not None and int(blob.name[len(self.prefix):].split('.', 1)[0]) not in pages:
+                    continue
+                data = retry_call(lambda: self.container_client.download_blob(blob.name).readall(),
+                                  'blob', f'Download of checkpoint {blob.name}')
+                checkpoint = json.loads(data)
+                analyses[checkpoint['page']] = checkpoint['analysis']
+        except Exception as e:
+            if getattr(e, 'status_code', None) != 404:
+                logger.warning(f"Failed to load page checkpoints under {self.prefix}: {e}")
+        return analyses
+    
+    @instrumented_stage('checkpoint_save')
+    def save(self, page_num: int, analysis: Dict[str, Any]):
+        """Checkpoint a successful page analysis; failures are not checkpointed so they are retried"""
+        if 'error' in analysis:
+            return
+        try:
+            self.container_client.upload_blob(
+                name=f"{self.prefix}{page_num:05d}.json",
+                data=json.dumps({'page': page_num, 'analysis': analysis}),
+                overwrite=True
+            )
+        except Exception as e:
+            logger.warning(f"Failed to checkpoint page {page_num}: {e}")
+    
+    def clear(self):
+        """Remove the job's checkpoints once its results are stored"""
+        try:
+            for blob in self.container_client.list_blobs(name_starts_with=self.prefix):
+                self.container_client.delete_blob(blob.name)
+        except Exception as e:
+            logger.warning(f"Failed to clear page checkpoints under {self.prefix}: {e}")
+
+
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+_extraction_pool_size = 0
+_extraction_pool_lock = threading.Lock()
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (its affinity mask, not the host's core count)"""
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def get_extraction_pool(processes: int) -> ProcessPoolExecutor:
+    """Process pool for text extraction, started once and reused by every document"""
+    global _extraction_pool, _extraction_pool_size
+    with _extraction_pool_lock:
+        if _extraction_pool is None or _extraction_pool_size != processes:
+            if _extraction_pool is not None:
+                _extraction_pool.shutdown(wait=False)
+            _extraction_pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+            _extraction_pool_size = processes
+        return _extraction_pool
+
+
+def shutdown_extraction_pool():
+    """Stop the extraction pool's processes"""
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is not None:
+            _extraction_pool.shutdown()
+            _extraction_pool = None
+
+
+def _discard_broken_extraction_pool(pool: ProcessPoolExecutor):
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is pool:
+            _extraction_pool = None
+    pool.shutdown(wait=False)
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[str]:
+    """Extract text for pages [start, end) of a PDF file (runs in a pool process)"""
+    pdf_reader = PdfReader(pdf_path)
+    return [pdf_reader.pages[index].extract_text() for index in range(start, end)]
+
+
+def _extract_text_parallel(pdf_content: bytes, num_pages: int, processes: int) -> List[str]:
+    """Extract page text by splitting page ranges across a process pool"""
+    # Small ranges keep the pool balanced when some pages are far heavier than others
+    range_size = max(1, -(-num_pages // (processes * 4)))
+    ranges = [(start, min(start + range_size, num_pages)) for start in range(0, num_pages, range_size)]
+    
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as pdf_file:
+        pdf_file.write(pdf_content)
+        pdf_path = pdf_file.name
+    
+    executor = get_extraction_pool(processes)
+    try:
+        texts: List[str] = []
+        for (start, end), range_texts in zip(
+            ranges, executor.map(_extract_page_range, [pdf_path] * len(ranges), *zip(*ranges))
+        ):
+            texts.extend(range_texts)
+            logger.info(f"Extracted text from pages {start + 1}-{end}/{num_pages}")
+        return texts
+    except BrokenProcessPool:
+        # A crashed child (e.g. OOM-killed) breaks the pool for good; start a fresh one next time
+        _discard_broken_extraction_pool(executor)
+        raise
+    finally:
+        os.unlink(pdf_path)
+
+
+@instrumented_stage('extract_text')
+def extract_text_from_pdf(
+    pdf_content: bytes,
+    parallel_min_pages: Optional[int] = None,
+    processes: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Extract text from PDF pages, using a process pool for large documents"""
     try:
         pdf_reader = PdfReader(io.BytesIO(pdf_content))
         num_pages = len(pdf_reader.pages)
         
+        if parallel_min_pages is None:
+            parallel_min_pages = int(os.environ.get('PARALLEL_EXTRACTION_MIN_PAGES', '100'))
+        if processes is None:
+            processes = int(os.environ.get('EXTRACTION_PROCESSES', str(available_cpus())))
+        
         logger.info(f"Processing PDF with {num_pages} pages")
         
-        pages_data = []
-        for page_num, page in enumerate(pdf_reader.pages, start=1):
-            text = page.extract_text()
-            
-            pages_data.append({
+        if processes > 1 and num_pages >= parallel_min_pages:
+            logger.info(f"Extracting text with {processes} processes")
+            texts = _extract_text_parallel(pdf_content, num_pages, processes)
+        else:
+            texts = []
+            for page_num, page in enumerate(pdf_reader.pages, start=1):
+                texts.append(page.extract_text())
+                logger.info(f"Extracted text from page {page_num}/{num_pages}")
+        
+        return [
+            {
                 'page': page_num,
                 'text': text,
                 'pageType': 'unknown'  # Will be classified by AI
-            })
-            
-            logger.info(f"Extracted text from page {page_num}/{num_pages}")
-        
-        return pages_data
+            }
+            for page_num, text in enumerate(texts, start=1)
+        ]
     
     except Exception as e:
         logger.error(f"Failed to extract text from PDF: {e}")
         raise
 
 
-def analyze_page_with_openai(openai_client, text: str, page_num: int) -> Dict[str, Any]:
-    """Analyze page content using Azure OpenAI"""
-    try:
-        deployment_name = os.environ.get('AZURE_OPENAI_DEPLOYMENT', 'gpt-4')
-        
-        prompt = f"""Analyze this insurance document page and extract key information:
+def count_pdf_pages(pdf_content: bytes) -> int:
+    return len(PdfReader(io.BytesIO(pdf_content)).pages)
+
+
+@instrumented_stage('extract_text')
+def extract_text_from_page_range(pdf_content: bytes, first_page: int, last_page: int) -> List[Dict[str, Any]]:
+    """Extract text from pages first_page..last_page (1-based, inclusive) of a PDF"""
+    pdf_reader = PdfReader(io.BytesIO(pdf_content))
+    return [
+        {
+            'page': page_num,
+            'text': pdf_reader.pages[page_num - 1].extract_text(),
+            'pageType': 'unknown'
+        }
+        for page_num in range(first_page, last_page + 1)
+    ]
+
+
+# Bump whenever the page prompt or its parsing changes, so cached analyses are not reused
+PAGE_ANALYSIS_PROMPT_VERSION = 'page-analysis-v1'
+
+# Characters of page text included in a page analysis prompt
+PAGE_TEXT_CHAR_LIMIT = 4000
+
+
+COMPREHENSIVE_ANALYSIS_PROMPT_VERSION = 'comprehensive-analysis-v2'
+
+
+def pipeline_version() -> str:
+    """Identifies the prompts and model that produced a job's results"""
+    deployment_name = os.environ.get('AZURE_OPENAI_DEPLOYMENT', 'gpt-4')
+    return f"{PAGE_ANALYSIS_PROMPT_VERSION}+{COMPREHENSIVE_ANALYSIS_PROMPT_VERSION}+{deployment_name}"
+
+
+def build_page_analysis_messages(text: str, page_num: int) -> List[Dict[str, str]]:
+    """Build the chat messages for a single page analysis"""
+    prompt = f"""Analyze this insurance document page and extract key information:
 
 Page {page_num} Content:
-{text[:4000]}
+{text[:PAGE_TEXT_CHAR_LIMIT]}
 
 Extract and return as JSON:
 1. documentType: (application, medical_report, financial_statement, etc.)
@@ -304,44 +769,409 @@ Extract and return as JSON:
 
 Return only valid JSON."""
 
-        response = openai_client.chat.completions.create(
+    return [
+        {"role": "system", "content": "You are an insurance underwriting assistant. Extract structured data from documents."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def parse_page_analysis(result: str, page_num: int) -> Dict[str, Any]:
+    """Parse a page analysis completion, keeping the raw text if it is not JSON"""
+    try:
+        return json.loads(result)
+    except json.JSONDecodeError:
+        logger.warning(f"Could not parse OpenAI response as JSON for page {page_num}")
+        return {"raw_analysis": result}
+
+
+def apply_page_analysis(page_data: Dict[str, Any], analysis: Dict[str, Any]):
+    """Attach a page analysis result to its page entry"""
+    page_data['analysis'] = analysis
+    page_data['pageType'] = analysis.get('documentType', 'unknown')
+    page_data['keyValues'] = analysis.get('keyValues', {})
+
+
+def streaming_enabled() -> bool:
+    return os.environ.get('OPENAI_STREAMING', 'true').lower() == 'true'
+
+
+def stream_chat_completion(
+    openai_client,
+    stage: str,
+    on_event: Optional[Callable[[Event], None]] = None,
+    item_fields: tuple = (),
+    **kwargs
+) -> str:
+    """
+    Run a streamed chat completion and return its full text. The text is fed to an incremental
+    JSON parser as it arrives and on_event receives each completed field or array item.
+    """
+    if os.environ.get('OPENAI_STREAM_INCLUDE_USAGE', 'false').lower() == 'true':
+        # Token usage arrives in a final chunk; needs an API version that accepts stream_options
+        kwargs['extra_body'] = {'stream_options': {'include_usage': True}}
+    
+    parser = IncrementalJSONParser(item_fields)
+    usage_reported = False
+    for chunk in openai_client.chat.completions.create(stream=True, **kwargs):
+        if getattr(chunk, 'usage', None) is not None:
+            usage_reported = True
+            record_token_usage(stage, chunk)
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        for event in parser.feed(delta):
+            if on_event is not None:
+                on_event(event)
+    
+    if not usage_reported:
+        # Without stream_options the stream carries no usage; count an estimate instead of nothing
+        record_token_usage(stage, SimpleNamespace(usage=SimpleNamespace(
+            prompt_tokens=sum(estimate_tokens(message.get('content')) for message in kwargs.get('messages', [])),
+            completion_tokens=estimate_tokens(parser.text)
+        )))
+    return parser.text
+
+
+def chat_completion_text(openai_client, stage: str, **kwargs) -> str:
+    """
+    Run a chat completion (streamed when OPENAI_STREAMING is on) and return its text. Only the
+    comprehensive analysis streams: per-page calls have no partial result worth publishing.
+    """
+    if streaming_enabled():
+        return stream_chat_completion(openai_client, stage, **kwargs)
+    response = openai_client.chat.completions.create(**kwargs)
+    record_token_usage(stage, response)
+    return response.choices[0].message.content
+
+
+@instrumented_stage('page_analysis')
+def analyze_page_with_openai(openai_client, text: str, page_num: int) -> Dict[str, Any]:
+    """Analyze page content using Azure OpenAI"""
+    try:
+        deployment_name = os.environ.get('AZURE_OPENAI_DEPLOYMENT', 'gpt-4')
+        
+        response = retry_call(lambda: openai_client.chat.completions.create(
             model=deployment_name,
-            messages=[
-                {"role": "system", "content": "You are an insurance underwriting assistant. Extract structured data from documents."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=build_page_analysis_messages(text, page_num),
             temperature=0.3,
             max_tokens=1500
-        )
+        ), 'openai', f'Analysis of page {page_num}')
+        record_token_usage('page_analysis', response)
         
-        result = response.choices[0].message.content
-        
-        # Try to parse as JSON
-        try:
-            return json.loads(result)
-        except json.JSONDecodeError:
-            logger.warning(f"Could not parse OpenAI response as JSON for page {page_num}")
-            return {"raw_analysis": result}
+        return parse_page_analysis(response.choices[0].message.content, page_num)
     
     except Exception as e:
         logger.error(f"OpenAI analysis error for page {page_num}: {e}")
+        record_stage_error('page_analysis')
         return {"error": str(e)}
 
 
-def perform_comprehensive_analysis(openai_client, extracted_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Perform comprehensive underwriting analysis"""
+def estimate_tokens(text: str) -> int:
+    """Rough prompt token estimate (about four characters per token)"""
+    return len(text or '') // 4 + 1
+
+
+def group_by_token_budget(items: List[Any], token_budget: int, max_items: int = 0, text_of=str) -> List[List[Any]]:
+    """Group consecutive items so each group's estimated tokens fit the budget"""
+    groups = []
+    current: List[Any] = []
+    current_tokens = 0
+    
+    for item in items:
+        tokens = estimate_tokens(text_of(item))
+        if current and (current_tokens + tokens > token_budget or (max_items and len(current) >= max_items)):
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += tokens
+    
+    if current:
+        groups.append(current)
+    return groups
+
+
+def pack_pages(
+    pages_data: List[Dict[str, Any]],
+    token_budget: int,
+    max_pages: int
+) -> List[List[Dict[str, Any]]]:
+    """Group consecutive pages into packs whose estimated prompt tokens fit the budget"""
+    return group_by_token_budget(
+        pages_data, token_budget, max_pages, text_of=lambda page: page['text'][:PAGE_TEXT_CHAR_LIMIT]
+    )
+
+
+def build_packed_page_analysis_messages(pages: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Build the chat messages for analyzing several pages in one request"""
+    page_sections = "\n\n".join(
+        f"--- Page {page['page']} ---\n{page['text'][:PAGE_TEXT_CHAR_LIMIT]}"
+        for page in pages
+    )
+    page_numbers = ", ".join(str(page['page']) for page in pages)
+    
+    prompt = f"""Analyze each of these insurance document pages separately and extract key information:
+
+{page_sections}
+
+Return a JSON object with one entry per page, keyed by page number as a string ({page_numbers}).
+Each entry must contain:
+1. documentType: (application, medical_report, financial_statement, etc.)
+2. keyValues: {{key: value}} pairs of important data
+3. riskFactors: list of identified risk factors
+4. concerns: list of any discrepancies or concerns
+
+Return only valid JSON."""
+
+    return [
+        {"role": "system", "content": "You are an insurance underwriting assistant. Extract structured data from documents."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+@instrumented_stage('packed_page_analysis')
+def analyze_packed_pages_with_openai(openai_client, pages: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    """Analyze several pages in one request; pages missing from the response are left out"""
+    page_numbers = [page['page'] for page in pages]
     try:
-        deployment_name = os.environ.get('AZURE_OPENAI_DEPLOYMENT', 'gpt-4')
-        
-        # Combine all extracted text
-        full_text = "\n\n".join([
-            f"Page {page['page']}:\n{page.get('text', '')[:2000]}"
-            for page in extracted_data
-        ])
+        response = retry_call(lambda: openai_client.chat.completions.create(
+            model=os.environ.get('AZURE_OPENAI_DEPLOYMENT', 'gpt-4'),
+            messages=build_packed_page_analysis_messages(pages),
+            temperature=0.3,
+            max_tokens=min(4096, 800 * len(pages))
+        ), 'openai', f'Packed analysis of pages {page_numbers}')
+        record_token_usage('packed_page_analysis', response)
+        result = json.loads(response.choices[0].message.content)
+    except Exception as e:
+        logger.warning(f"Packed analysis of pages {page_numbers} failed, falling back to single pages: {e}")
+        record_stage_error('packed_page_analysis')
+        return {}
+    
+    if not isinstance(result, dict):
+        return {}
+    return {
+        page_num: result[str(page_num)]
+        for page_num in page_numbers
+        if isinstance(result.get(str(page_num)), dict)
+    }
+
+
+def analyze_page_group(
+    openai_client,
+    page_cache: Optional[PageAnalysisCache],
+    pages: List[Dict[str, Any]],
+    stats: Dict[str, int],
+    stats_lock: threading.Lock,
+    on_page_analyzed=None,
+    cancel_check: Optional[Callable[[], None]] = None
+) -> Dict[int, Dict[str, Any]]:
+    """Analyze a pack of pages, serving cached pages and falling back to single-page requests"""
+    results: Dict[int, Dict[str, Any]] = {}
+    uncached = []
+    
+    for page in pages:
+        cached = page_cache.get(page['text']) if page_cache is not None else None
+        if cached is not None:
+            logger.info(f"Page cache hit for page {page['page']}")
+            results[page['page']] = cached
+        else:
+            uncached.append(page)
+    
+    requests = 0
+    if len(uncached) > 1:
+        if cancel_check is not None:
+            cancel_check()
+        results.update(analyze_packed_pages_with_openai(openai_client, uncached))
+        requests += 1
+    
+    for page in uncached:
+        if page['page'] not in results:
+            if cancel_check is not None:
+                cancel_check()
+            results[page['page']] = analyze_page_with_openai(openai_client, page['text'], page['page'])
+            requests += 1
+        if page_cache is not None:
+            page_cache.put(page['text'], results[page['page']])
+    
+    if on_page_analyzed is not None:
+        for page in pages:
+            on_page_analyzed(page['page'], results[page['page']])
+    
+    with stats_lock:
+        stats['cacheHits'] += len(pages) - len(uncached)
+        stats['pagesSentToOpenAI'] += len(uncached)
+        stats['openaiRequests'] += requests
+    return results
+
+
+@instrumented_stage('analyze_pages')
+def analyze_pages_concurrently(
+    openai_client,
+    pages_data: List[Dict[str, Any]],
+    max_workers: int,
+    on_page_done=None,
+    page_cache: Optional[PageAnalysisCache] = None,
+    pack_token_budget: int = 0,
+    pack_max_pages: int = 8,
+    on_page_analyzed=None,
+    cancel_check: Optional[Callable[[], None]] = None
+) -> Dict[str, int]:
+    """Analyze pages in parallel with at most max_workers requests in flight.
+
+    Results are written back onto each entry of pages_data, so page order is
+    preserved regardless of completion order. A failing page is recorded as an
+    error analysis and does not cancel the remaining pages. on_page_done, if
+    given, is called from the calling thread with the number of completed pages.
+    Pages found in page_cache are not sent to OpenAI. With a pack_token_budget,
+    consecutive short pages share one request. on_page_analyzed, if given, is
+    called from the pool thread with (page number, analysis) as soon as a page
+    is done. cancel_check, if given, is called before every OpenAI request and
+    stops the analysis by raising JobCancelledError. Returns request statistics.
+    """
+    total_pages = len(pages_data)
+    completed = 0
+    stats = {'pages': total_pages, 'cacheHits': 0, 'pagesSentToOpenAI': 0, 'openaiRequests': 0}
+    stats_lock = threading.Lock()
+    
+    if pack_token_budget > 0:
+        groups = pack_pages(pages_data, pack_token_budget, pack_max_pages)
+    else:
+        groups = [[page_data] for page_data in pages_data]
+    
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='page-analysis') as executor:
+        futures = {
+            executor.submit(
+                analyze_page_group, openai_client, page_cache, group, stats, stats_lock, on_page_analyzed,
+                cancel_check
+            ): group
+            for group in groups
+        }
         
-        prompt = f"""Perform comprehensive underwriting analysis on this insurance application:
+        for future in as_completed(futures):
+            group = futures[future]
+            try:
+                results = future.result()
+            except JobCancelledError:
+                # Queued groups never start; running ones stop at their next check
+                for pending in futures:
+                    pending.cancel()
+                raise
+            except Exception as e:
+                logger.error(f"Analysis of pages {[page['page'] for page in group]} failed: {e}")
+                results = {}
+            
+            for page_data in group:
+                analysis = results.get(page_data['page'], {"error": "Page analysis failed"})
+                apply_page_analysis(page_data, analysis)
+                
+                completed += 1
+                logger.info(f"Analyzed page {page_data['page']} ({completed}/{total_pages} complete)")
+                if on_page_done is not None:
+                    on_page_done(completed)
+    
+    stats['requestsSaved'] = stats['pagesSentToOpenAI'] - stats['openaiRequests']
+    return stats
+
+
+# Output cap for one page-group digest in hierarchical comprehensive analysis
+DIGEST_MAX_TOKENS = 800
+
+
+def render_page_for_analysis(page: Dict[str, Any]) -> str:
+    """Render a page and its page-level findings as input for comprehensive analysis"""
+    page_analysis = page.get('analysis') or {}
+    findings = {
+        key: page_analysis[key]
+        for key in ('documentType', 'keyValues', 'riskFactors', 'concerns')
+        if key in page_analysis
+    }
+    section = f"Page {page['page']}:\n{page.get('text', '')[:PAGE_TEXT_CHAR_LIMIT]}"
+    if findings:
+        section += f"\nPage findings: {json.dumps(findings)}"
+    return section
+
+
+def truncate_to_tokens(text: str, token_budget: int) -> str:
+    """Cut text down to roughly token_budget tokens"""
+    return text[:token_budget * 4]
 
-{full_text[:8000]}
+
+def build_digest_messages(sections: List[str]) -> List[Dict[str, str]]:
+    """Build the chat messages that condense a group of pages or digests into one digest"""
+    content = "\n\n".join(sections)
+    prompt = f"""Condense this portion of an insurance application into a compact underwriting digest:
+
+{content}
+
+Return JSON with:
+1. pages: page numbers covered (e.g. "3-7")
+2. facts: key applicant, policy, medical, financial and lifestyle facts, each with its page number
+3. risks: Array of {{category, severity, description, page}}
+4. discrepancies: Array of {{description, page}}
+
+Keep every page number reference. Be terse. Return only valid JSON."""
+
+    return [
+        {"role": "system", "content": "You are an expert insurance underwriter. Summarize documents without losing risk-relevant detail."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+@instrumented_stage('digest')
+def summarize_sections_with_openai(openai_client, sections: List[str]) -> str:
+    """Condense a group of sections into one digest, falling back to truncation on failure"""
+    def summarize():
+        response = openai_client.chat.completions.create(
+            model=os.environ.get('AZURE_OPENAI_DEPLOYMENT', 'gpt-4'),
+            messages=build_digest_messages(sections),
+            temperature=0.2,
+            max_tokens=DIGEST_MAX_TOKENS
+        )
+        record_token_usage('digest', response)
+        return response.choices[0].message.content
+    
+    try:
+        return retry_call(summarize, 'openai', 'Digest generation')
+    except Exception as e:
+        logger.warning(f"Digest generation failed, keeping truncated sections instead: {e}")
+        record_stage_error('digest')
+        share = max(1, DIGEST_MAX_TOKENS // len(sections))
+        return "\n\n".join(truncate_to_tokens(section, share) for section in sections)
+
+
+@instrumented_stage('condense')
+def condense_sections(openai_client, sections: List[str], token_budget: int, max_workers: int):
+    """Summarize sections level by level until together they fit token_budget.
+
+    Each level groups consecutive sections up to the budget and digests the
+    groups in parallel, so the number of sequential levels grows with
+    log(pages) and every page contributes to some digest. Returns the
+    condensed sections and the number of levels used.
+    """
+    token_budget = max(token_budget, 2 * DIGEST_MAX_TOKENS)
+    sections = [truncate_to_tokens(section, token_budget) for section in sections]
+    levels = 0
+    
+    while len(sections) > 1 and sum(estimate_tokens(section) for section in sections) > token_budget:
+        groups = group_by_token_budget(sections, token_budget)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='digest') as executor:
+            sections = list(executor.map(lambda group: summarize_sections_with_openai(openai_client, group), groups))
+        levels += 1
+        logger.info(f"Digest level {levels}: condensed {len(groups)} group(s)")
+    
+    return sections, levels
+
+
+def build_comprehensive_analysis_messages(document_content: str, condensed: bool = False) -> List[Dict[str, str]]:
+    """Build the chat messages for the comprehensive underwriting analysis"""
+    source_note = ""
+    if condensed:
+        source_note = "\nThe application has been condensed into digests of page groups; keep their page references.\n"
+    
+    prompt = f"""Perform comprehensive underwriting analysis on this insurance application:
+{source_note}
+{document_content}
 
 Provide analysis as JSON with:
 1. summary: Brief overview of the application
@@ -351,170 +1181,773 @@ Provide analysis as JSON with:
 
 Focus on medical history, financial status, lifestyle factors, and any discrepancies."""
 
-        response = openai_client.chat.completions.create(
-            model=deployment_name,
-            messages=[
-                {"role": "system", "content": "You are an expert insurance underwriter. Analyze applications for risks and provide recommendations."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=2000
+    return [
+        {"role": "system", "content": "You are an expert insurance underwriter. Analyze applications for risks and provide recommendations."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+# Fields of the comprehensive analysis and the types the job record and UI expect
+COMPREHENSIVE_ANALYSIS_FIELDS = {'summary': str, 'risks': list, 'recommendations': list}
+
+# Top-level arrays whose entries are published one by one while the analysis streams
+STREAMED_ANALYSIS_ITEMS = ('risks', 'recommendations')
+
+
+def parse_comprehensive_analysis(result: str) -> Dict[str, Any]:
+    """Parse and validate the comprehensive analysis completion and stamp its completion time"""
+    try:
+        # Tolerate a markdown fence or preamble around the object
+        start, end = result.find('{'), result.rfind('}')
+        analysis = json.loads(result[start:end + 1] if 0 <= start < end else result)
+        if not isinstance(analysis, dict):
+            raise json.JSONDecodeError("Analysis is not a JSON object", result, 0)
+        for field, expected_type in COMPREHENSIVE_ANALYSIS_FIELDS.items():
+            if not isinstance(analysis.get(field), expected_type):
+                logger.warning(f"Analysis field {field} is missing or not a {expected_type.__name__}")
+                analysis[field] = expected_type()
+        analysis['completedAt'] = datetime.utcnow().isoformat()
+        return analysis
+    except json.JSONDecodeError:
+        logger.warning("Could not parse analysis as JSON")
+        return {
+            "summary": result,
+            "risks": [],
+            "recommendations": [],
+            "completedAt": datetime.utcnow().isoformat()
+        }
+
+
+@instrumented_stage('comprehensive_analysis')
+def perform_comprehensive_analysis(
+    openai_client,
+    extracted_data: List[Dict[str, Any]],
+    on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Perform comprehensive underwriting analysis over every page, condensing long documents first.
+    While the completion streams, on_partial receives the fields completed so far (summary,
+    then the risks one by one, ...); the returned analysis is parsed from the full text.
+    """
+    try:
+        deployment_name = os.environ.get('AZURE_OPENAI_DEPLOYMENT', 'gpt-4')
+        
+        sections, levels = condense_sections(
+            openai_client,
+            [render_page_for_analysis(page) for page in extracted_data],
+            token_budget=int(os.environ.get('COMPREHENSIVE_ANALYSIS_TOKEN_BUDGET', '6000')),
+            max_workers=page_analysis_workers()
         )
         
-        result = response.choices[0].message.content
+        messages = build_comprehensive_analysis_messages("\n\n".join(sections), condensed=levels > 0)
         
-        try:
-            analysis = json.loads(result)
-            analysis['completedAt'] = datetime.utcnow().isoformat()
-            return analysis
-        except json.JSONDecodeError:
-            logger.warning("Could not parse analysis as JSON")
-            return {
-                "summary": result,
-                "risks": [],
-                "recommendations": [],
-                "completedAt": datetime.utcnow().isoformat()
-            }
+        def analyze():
+            # A retried attempt starts from an empty partial result
+            partial: Dict[str, Any] = {}
+            
+            def collect(event: Event):
+                kind, field, value = event
+                if kind == 'item':
+                    partial.setdefault(field, []).append(value)
+                else:
+                    partial[field] = value
+                if on_partial is not None:
+                    on_partial(dict(partial))
+            
+            return chat_completion_text(
+                openai_client,
+                'comprehensive_analysis',
+                on_event=collect,
+                item_fields=STREAMED_ANALYSIS_ITEMS,
+                model=deployment_name,
+                messages=messages,
+                temperature=0.3,
+                max_tokens=2000
+            )
+        
+        analysis = parse_comprehensive_analysis(retry_call(analyze, 'openai', 'Comprehensive analysis'))
+        analysis['sourceCoverage'] = {'pages': len(extracted_data), 'digestLevels': levels}
+        return analysis
     
     except Exception as e:
         logger.error(f"Comprehensive analysis error: {e}")
         raise
 
 
+@instrumented_stage('dedup_lookup')
+def find_reusable_results(clients: AzureClients, document_hash: str, job_id: str) -> Optional[Dict[str, Any]]:
+    """Return a completed job with identical PDF bytes and pipeline version, if one is indexed"""
+    try:
+        entry = clients.get_fingerprints_container().read_item(item=document_hash, partition_key=document_hash)
+    except cosmos_exceptions.CosmosResourceNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Fingerprint lookup failed for {document_hash}: {e}")
+        return None
+    
+    if entry.get('pipelineVersion') != pipeline_version() or entry.get('jobId') == job_id:
+        return None
+    
+    try:
+        source_job = clients.get_cosmos_container().read_item(item=entry['jobId'], partition_key=entry['jobId'])
+    except cosmos_exceptions.CosmosResourceNotFoundError:
+        logger.info(f"Fingerprint {document_hash} points at deleted job {entry['jobId']}")
+        return None
+    
+    if source_job.get('status') != 'completed' or not (source_job.get('analysis') or source_job.get('analysisRef')):
+        return None
+    return source_job
+
+
+@instrumented_stage('fingerprint_write')
+def record_document_fingerprint(clients: AzureClients, document_hash: str, job_id: str):
+    """Index a completed job by its PDF hash so identical uploads can reuse its results"""
+    try:
+        clients.get_fingerprints_container().upsert_item({
+            'id': document_hash,
+            'jobId': job_id,
+            'pipelineVersion': pipeline_version(),
+            'createdAt': datetime.utcnow().isoformat(),
+            'ttl': int(os.environ.get('DOCUMENT_FINGERPRINT_TTL_SECONDS', str(7 * 24 * 3600)))
+        })
+    except Exception as e:
+        logger.warning(f"Failed to record fingerprint for job {job_id}: {e}")
+
+
+# Cosmos patch predicate that lets fan-out state be recorded only once per job
+FANOUT_UNSET_PREDICATE = "FROM c WHERE NOT IS_DEFINED(c.fanout)"
+
+# Per-range page analysis counters summed on the job document as ranges finish
+FANOUT_STAT_FIELDS = ('cacheHits', 'pagesSentToOpenAI', 'openaiRequests')
+
+
+def plan_page_ranges(total_pages: int, range_pages: int) -> List[Tuple[int, int]]:
+    """Split pages 1..total_pages into consecutive (first, last) ranges of at most range_pages"""
+    range_pages = max(1, range_pages)
+    return [
+        (first_page, min(first_page + range_pages - 1, total_pages))
+        for first_page in range(1, total_pages + 1, range_pages)
+    ]
+
+
+def range_key(index: int) -> str:
+    return f"r{index:04d}"
+
+
+def _patch_job_once(jobs_container, job_id: str, operations: List[Dict[str, Any]], filter_predicate: str,
+                    description: str) -> Optional[Dict[str, Any]]:
+    """Apply a guarded patch and return the updated job, or None if the predicate no longer holds"""
+    def patch():
+        try:
+            return jobs_container.patch_item(
+                item=job_id,
+                partition_key=job_id,
+                patch_operations=operations,
+                filter_predicate=filter_predicate
+            )
+        except cosmos_exceptions.CosmosHttpResponseError as e:
+            if e.status_code == 412:
+                return None
+            raise
+    
+    return retry_call(patch, 'cosmos', description)
+
+
+@instrumented_stage('fanout')
+def fan_out_job(clients: AzureClients, message_body: Dict[str, Any], total_pages: int, document_hash: str):
+    """Record the page ranges of a large document on its job and enqueue one sub-message per range"""
+    job_id = message_body['jobId']
+    jobs_container = clients.get_cosmos_container()
+    range_pages = int(os.environ.get('FANOUT_RANGE_PAGES', '50'))
+    ranges = plan_page_ranges(total_pages, range_pages)
+    
+    fanout = {
+        'ranges': len(ranges),
+        'rangePages': range_pages,
+        'totalPages': total_pages,
+        'documentHash': document_hash,
+        'completedRanges': 0,
+        'completedPages': 0,
+        'expiredRanges': 0,
+        'stats': {field: 0 for field in FANOUT_STAT_FIELDS},
+        'done': {}
+    }
+    job = _patch_job_once(
+        jobs_container, job_id, [{'op': 'set', 'path': '/fanout', 'value': fanout}],
+        FANOUT_UNSET_PREDICATE, f'Fan-out of job {job_id}'
+    )
+    if job is None:
+        # A redelivered message: the ranges are already recorded, re-send only the unfinished ones
+        fanout = jobs_container.read_item(item=job_id, partition_key=job_id)['fanout']
+        ranges = plan_page_ranges(fanout['totalPages'], fanout['rangePages'])
+    
+    # Ranges go to the lane their own size belongs in, not the lane of the whole document
+    lane = choose_lane(load_lanes(), page_count=ranges[0][1] - ranges[0][0] + 1)
+    messages = [
+        ServiceBusMessage(
+            body=json.dumps({
+                **message_body,
+                'lane': lane.name,
+                'pageRange': {'index': index, 'firstPage': first_page, 'lastPage': last_page}
+            }),
+            content_type="application/json"
+        )
+        for index, (first_page, last_page) in enumerate(ranges)
+        if range_key(index) not in fanout['done']
+    ]
+    
+    def send():
+        with clients.get_servicebus_client().get_queue_sender(lane.queue_name) as sender:
+            sender.send_messages(messages)
+    
+    if messages:
+        retry_call(send, 'servicebus', f'Enqueue of page ranges for job {job_id}')
+    logger.info(f"Job {job_id} fanned out into {len(ranges)} page ranges ({len(messages)} enqueued on lane {lane.name})")
+    
+    # Ranges that dead-letter or keep crashing never report in; the deadline message finishes without them
+    deadline_seconds = float(os.environ.get('FANOUT_DEADLINE_SECONDS', '14400'))
+    if messages and deadline_seconds > 0:
+        deadline = ServiceBusMessage(
+            body=json.dumps({**message_body, 'lane': lane.name, 'fanoutDeadline': True}),
+            content_type="application/json"
+        )
+        
+        def schedule():
+            with clients.get_servicebus_client().get_queue_sender(lane.queue_name) as sender:
+                sender.schedule_messages(deadline, datetime.now(timezone.utc) + timedelta(seconds=deadline_seconds))
+        
+        retry_call(schedule, 'servicebus', f'Scheduling of the fan-out deadline of job {job_id}')
+    
+    clients.get_progress_publisher().publish(job_id, 'processing', progress={
+        'message': f'Analyzing {total_pages} pages in {len(ranges)} page ranges',
+        'currentPage': fanout['completedPages'],
+        'totalPages': total_pages
+    })
+
+
+def process_page_range(clients: AzureClients, message_body: Dict[str, Any], pdf_content: bytes,
+                       cancel_check: Optional[Callable[[], None]] = None):
+    """
+    Analyze one page range of a fanned-out document. The range is counted on the job document
+    with a guarded patch, so a redelivered range is never counted twice and exactly one worker
+    sees the last range complete; that worker runs the comprehensive analysis.
+    """
+    job_id = message_body['jobId']
+    page_range = message_body['pageRange']
+    key = range_key(page_range['index'])
+    publisher = clients.get_progress_publisher()
+    page_cache = None if message_body.get('disablePageCache') else clients.get_page_cache()
+    
+    checkpoints = clients.get_page_checkpoint_store(job_id)
+    if checkpoints is None:
+        raise RuntimeError(f"Page range {key} of job {job_id} needs CHECKPOINT_BLOB_CONTAINER to store its results")
+    
+    pages_data = extract_text_from_page_range(pdf_content, page_range['firstPage'], page_range['lastPage'])
+    checkpointed = checkpoints.load(range(page_range['firstPage'], page_range['lastPage'] + 1))
+    pending_pages = [page_data for page_data in pages_data if page_data['page'] not in checkpointed]
+    beat_job()
+    
+    stats = analyze_pages_concurrently(
+        clients.get_openai_client(),
+        pending_pages,
+        max_workers=page_analysis_workers(),
+        on_page_done=lambda completed_pages: beat_job(),
+        page_cache=page_cache,
+        pack_token_budget=int(os.environ.get('PAGE_PACK_TOKEN_BUDGET', '1500')),
+        pack_max_pages=int(os.environ.get('PAGE_PACK_MAX_PAGES', '8')),
+        on_page_analyzed=checkpoints.save,
+        cancel_check=cancel_check
+    )
+    logger.info(f"Page range {key} of job {job_id} analyzed: {stats}")
+    
+    jobs_container = clients.get_cosmos_container()
+    job = count_page_range(jobs_container, job_id, key, len(pages_data), stats)
+    if job is None:
+        logger.info(f"Page range {key} of job {job_id} was already counted")
+        job = jobs_container.read_item(item=job_id, partition_key=job_id)
+    
+    fanout = job['fanout']
+    if fanout['completedRanges'] < fanout['ranges']:
+        publisher.publish(job_id, 'processing', progress={
+            'message': f"Analyzed {fanout['completedRanges']} of {fanout['ranges']} page ranges",
+            'currentPage': fanout['completedPages'],
+            'totalPages': fanout['totalPages']
+        })
+        return
+    
+    try:
+        run_aggregation(clients, job_id, pdf_content, fanout, checkpoints, cancel_check)
+    except JobCancelledError:
+        raise
+    except Exception as e:
+        publish_job_failure(publisher, job_id, e)
+        raise
+
+
+def count_page_range(jobs_container, job_id: str, key: str, page_count: int, stats: Dict[str, int],
+                     expired: bool = False) -> Optional[Dict[str, Any]]:
+    """Mark a page range done on the job, once; returns the updated job, or None if it was already counted"""
+    operations = [
+        {'op': 'set', 'path': f'/fanout/done/{key}', 'value': datetime.utcnow().isoformat()},
+        {'op': 'incr', 'path': '/fanout/completedRanges', 'value': 1},
+        {'op': 'incr', 'path': '/fanout/completedPages', 'value': page_count}
+    ] + [
+        {'op': 'incr', 'path': f'/fanout/stats/{field}', 'value': stats.get(field, 0)}
+        for field in FANOUT_STAT_FIELDS
+    ]
+    if expired:
+        operations.append({'op': 'incr', 'path': '/fanout/expiredRanges', 'value': 1})
+    return _patch_job_once(
+        jobs_container, job_id, operations, f"FROM c WHERE NOT IS_DEFINED(c.fanout.done.{key})",
+        f'Completion of page range {key} of job {job_id}'
+    )
+
+
+def run_aggregation(clients: AzureClients, job_id: str, pdf_content: bytes, fanout: Dict[str, Any],
+                    checkpoints: PageCheckpointStore, cancel_check: Optional[Callable[[], None]] = None):
+    """
+    Aggregate a fanned-out job if this worker wins the aggregation claim. The claim is a lease on
+    the job document, so a redelivered range or the deadline message cannot start a second
+    aggregation while one is running; a failed aggregation gives the claim back for its retry.
+    """
+    jobs_container = clients.get_cosmos_container()
+    now = time.time()
+    lease_seconds = float(os.environ.get('FANOUT_AGGREGATION_LEASE_SECONDS', '1800'))
+    claimed = _patch_job_once(
+        jobs_container, job_id, [{'op': 'set', 'path': '/fanout/aggregationClaimedAt', 'value': now}],
+        "FROM c WHERE c.status != 'completed' AND c.status != 'cancelled' AND "
+        f"(NOT IS_DEFINED(c.fanout.aggregationClaimedAt) OR c.fanout.aggregationClaimedAt < {now - lease_seconds})",
+        f'Aggregation claim of job {job_id}'
+    )
+    if claimed is None:
+        logger.info(f"Aggregation of job {job_id} is already running or done")
+        return
+    
+    try:
+        aggregate_page_ranges(clients, job_id, pdf_content, fanout, checkpoints, cancel_check)
+    except Exception:
+        try:
+            jobs_container.patch_item(
+                item=job_id, partition_key=job_id,
+                patch_operations=[{'op': 'remove', 'path': '/fanout/aggregationClaimedAt'}]
+            )
+        except Exception as e:
+            logger.warning(f"Could not release the aggregation claim of job {job_id}: {e}")
+        raise
+
+
+@instrumented_stage('fanout_deadline')
+def expire_page_ranges(clients: AzureClients, message_body: Dict[str, Any],
+                       cancel_check: Optional[Callable[[], None]] = None):
+    """
+    Handle a fanned-out job's deadline message: ranges that never reported in (dead-lettered, or
+    crashing on every delivery) are counted as done with error pages, and the job is aggregated.
+    """
+    job_id = message_body['jobId']
+    jobs_container = clients.get_cosmos_container()
+    job = jobs_container.read_item(item=job_id, partition_key=job_id)
+    fanout = job.get('fanout')
+    if fanout is None or job.get('status') in ('completed', 'cancelled'):
+        return
+    
+    ranges = plan_page_ranges(fanout['totalPages'], fanout['rangePages'])
+    missing = [index for index in range(len(ranges)) if range_key(index) not in fanout['done']]
+    if missing:
+        logger.warning(f"Fan-out deadline of job {job_id} passed with {len(missing)} of {len(ranges)} page ranges "
+                       f"unfinished; their pages are reported as failed")
+    for index in missing:
+        first_page, last_page = ranges[index]
+        count_page_range(jobs_container, job_id, range_key(index), last_page - first_page + 1, {}, expired=True)
+    
+    fanout = jobs_container.read_item(item=job_id, partition_key=job_id)['fanout']
+    pdf_content = download_pdf(clients.get_blob_service_client(), message_body['blobPath'])
+    run_aggregation(clients, job_id, pdf_content, fanout, clients.get_page_checkpoint_store(job_id), cancel_check)
+
+
+@instrumented_stage('aggregate_ranges')
+def aggregate_page_ranges(clients: AzureClients, job_id: str, pdf_content: bytes, fanout: Dict[str, Any],
+                          checkpoints: PageCheckpointStore, cancel_check: Optional[Callable[[], None]] = None):
+    """Reassemble every range's page analyses and finish the job with a comprehensive analysis"""
+    logger.info(f"All {fanout['ranges']} page ranges of job {job_id} are done; aggregating")
+    pages_data = extract_text_from_pdf(pdf_content)
+    checkpointed = checkpoints.load()
+    for page_data in pages_data:
+        # Failed page analyses are not checkpointed
+        apply_page_analysis(page_data, checkpointed.get(page_data['page'], {"error": "Page analysis failed"}))
+    
+    page_analysis_stats = {'pages': len(pages_data), **fanout['stats'], 'pageRanges': fanout['ranges']}
+    if fanout.get('expiredRanges'):
+        page_analysis_stats['expiredRanges'] = fanout['expiredRanges']
+    page_analysis_stats['requestsSaved'] = page_analysis_stats['pagesSentToOpenAI'] - page_analysis_stats['openaiRequests']
+    complete_job(clients, job_id, pages_data, fanout['documentHash'], page_analysis_stats, 0, checkpoints, cancel_check)
+
+
+def complete_job(
+    clients: AzureClients,
+    job_id: str,
+    pages_data: List[Dict[str, Any]],
+    document_hash: str,
+    page_analysis_stats: Dict[str, Any],
+    resumed_pages: int,
+    checkpoints: Optional[PageCheckpointStore],
+    cancel_check: Optional[Callable[[], None]] = None
+):
+    """Run the comprehensive analysis over analyzed pages and publish the completed job"""
+    publisher = clients.get_progress_publisher()
+    total_pages = len(pages_data)
+    if cancel_check is not None:
+        cancel_check()
+    
+    # Store extracted data
+    publisher.publish(job_id, 'processing',
+                      extracted_data=pages_data,
+                      progress={
+                          'message': 'Performing comprehensive analysis',
+                          'currentPage': total_pages,
+                          'totalPages': total_pages
+                      })
+    
+    # Perform comprehensive analysis, publishing fields as they stream in
+    def publish_partial_analysis(partial: Dict[str, Any]):
+        beat_job()
+        publisher.publish(job_id, 'processing', extra_fields={'partialAnalysis': partial})
+    
+    comprehensive_analysis = perform_comprehensive_analysis(
+        clients.get_openai_client(), pages_data, on_partial=publish_partial_analysis
+    )
+    
+    # Update job to completed
+    publisher.publish(
+        job_id,
+        'completed',
+        extracted_data=pages_data,
+        analysis=comprehensive_analysis,
+        extra_fields={
+            'documentHash': document_hash,
+            'pipelineVersion': pipeline_version(),
+            'pageAnalysisStats': page_analysis_stats,
+            'resumedPages': resumed_pages,
+            'partialAnalysis': None
+        }
+    )
+    record_document_fingerprint(clients, document_hash, job_id)
+    if checkpoints is not None:
+        checkpoints.clear()
+
+
+def publish_job_failure(publisher: ProgressPublisher, job_id: str, error: BaseException):
+    """Mark a job failed with the error that stopped it"""
+    publisher.publish(
+        job_id,
+        'failed',
+        error={
+            'message': str(error),
+            'timestamp': datetime.utcnow().isoformat()
+        }
+    )
+
+
+@instrumented_stage('job')
 def process_job(clients: AzureClients, message_body: Dict[str, Any]):
     """Process a single job"""
     job_id = message_body.get('jobId')
     blob_path = message_body.get('blobPath')
     filename = message_body.get('filename')
+    page_range = message_body.get('pageRange')
     
-    logger.info(f"Processing job {job_id}: {filename}")
+    if page_range is not None:
+        logger.info(f"Processing pages {page_range['firstPage']}-{page_range['lastPage']} of job {job_id}: {filename}")
+    else:
+        logger.info(f"Processing job {job_id}: {filename}")
     
-    jobs_container = clients.get_cosmos_container()
+    publisher = clients.get_progress_publisher()
     blob_service = clients.get_blob_service_client()
     openai_client = clients.get_openai_client()
+    page_cache = None if message_body.get('disablePageCache') else clients.get_page_cache()
+    cancel_check = CancellationCheck(clients.get_cosmos_container(), job_id)
     
     try:
+        # The deadline of a fanned-out document's page ranges
+        if message_body.get('fanoutDeadline'):
+            expire_page_ranges(clients, message_body, cancel_check)
+            return
+        
         # Update status to processing
-        update_job_status(jobs_container, job_id, 'processing', progress={
-            'message': 'Starting document processing',
-            'currentPage': 0,
-            'totalPages': 0
-        })
+        if page_range is None:
+            publisher.publish(job_id, 'processing', progress={
+                'message': 'Starting document processing',
+                'currentPage': 0,
+                'totalPages': 0
+            })
         
         # Download PDF
         pdf_content = download_pdf(blob_service, blob_path)
+        beat_job()
+        cancel_check()
+        
+        # A page range of a fanned-out document
+        if page_range is not None:
+            process_page_range(clients, message_body, pdf_content, cancel_check)
+            return
+        
+        document_hash = hashlib.sha256(pdf_content).hexdigest()
+        beat_job()
+        
+        # Reuse the results of an identical, already analyzed document
+        source_job = None if message_body.get('disableDedup') else find_reusable_results(clients, document_hash, job_id)
+        if source_job is not None:
+            logger.info(f"Job {job_id} reuses results of job {source_job['id']} (document {document_hash})")
+            # Artifacts are immutable, so stored results are shared by pointer rather than copied
+            reused_pointers = {
+                ref_field(field): source_job[ref_field(field)]
+                for field in ('extractedData', 'analysis')
+                if source_job.get(ref_field(field))
+            }
+            publisher.publish(
+                job_id,
+                'completed',
+                extracted_data=None if reused_pointers.get('extractedDataRef') else source_job.get('extractedData', []),
+                analysis=None if reused_pointers.get('analysisRef') else source_job['analysis'],
+                extra_fields={
+                    **reused_pointers,
+                    'documentHash': document_hash,
+                    'resultsReusedFrom': {
+                        'jobId': source_job['id'],
+                        'pipelineVersion': pipeline_version(),
+                        'reusedAt': datetime.utcnow().isoformat()
+                    }
+                }
+            )
+            return
+        
+        # Split large documents into page ranges that any worker can pick up
+        checkpoints = clients.get_page_checkpoint_store(job_id)
+        fanout_min_pages = int(os.environ.get('FANOUT_MIN_PAGES', '300'))
+        if fanout_min_pages > 0 and checkpoints is not None and not message_body.get('disableFanout'):
+            page_count = count_pdf_pages(pdf_content)
+            if page_count >= fanout_min_pages:
+                fan_out_job(clients, message_body, page_count, document_hash)
+                return
         
         # Extract text from pages
         pages_data = extract_text_from_pdf(pdf_content)
         total_pages = len(pages_data)
+        beat_job()
         
-        # Analyze each page with OpenAI
-        for i, page_data in enumerate(pages_data, start=1):
-            update_job_status(jobs_container, job_id, 'processing', progress={
-                'message': f'Analyzing page {i} of {total_pages}',
-                'currentPage': i,
-                'totalPages': total_pages
+        # Resume from pages checkpointed by an earlier delivery of this message
+        checkpointed = checkpoints.load() if checkpoints is not None else {}
+        pending_pages = []
+        for page_data in pages_data:
+            if page_data['page'] in checkpointed:
+                apply_page_analysis(page_data, checkpointed[page_data['page']])
+            else:
+                pending_pages.append(page_data)
+        resumed_pages = total_pages - len(pending_pages)
+        if resumed_pages:
+            logger.info(f"Job {job_id} resumes with {resumed_pages} of {total_pages} pages already analyzed")
+        
+        # Analyze pages with OpenAI, several requests in flight at once
+        def report_page_progress(completed_pages: int):
+            beat_job()
+            publisher.publish(job_id, 'processing', progress={
+                'message': f'Analyzed {resumed_pages + completed_pages} of {total_pages} pages',
+                'currentPage': resumed_pages + completed_pages,
+                'totalPages': total_pages,
+                'resumedPages': resumed_pages
             })
-            
-            analysis = analyze_page_with_openai(openai_client, page_data['text'], page_data['page'])
-            page_data['analysis'] = analysis
-            page_data['pageType'] = analysis.get('documentType', 'unknown')
-            page_data['keyValues'] = analysis.get('keyValues', {})
-        
-        # Store extracted data
-        update_job_status(jobs_container, job_id, 'processing', 
-                         extracted_data=pages_data,
-                         progress={
-                             'message': 'Performing comprehensive analysis',
-                             'currentPage': total_pages,
-                             'totalPages': total_pages
-                         })
-        
-        # Perform comprehensive analysis
-        comprehensive_analysis = perform_comprehensive_analysis(openai_client, pages_data)
-        
-        # Update job to completed
-        update_job_status(
-            jobs_container,
-            job_id,
-            'completed',
-            extracted_data=pages_data,
-            analysis=comprehensive_analysis
+        
+        page_analysis_stats = analyze_pages_concurrently(
+            openai_client,
+            pending_pages,
+            max_workers=page_analysis_workers(),
+            on_page_done=report_page_progress,
+            page_cache=page_cache,
+            pack_token_budget=int(os.environ.get('PAGE_PACK_TOKEN_BUDGET', '1500')),
+            pack_max_pages=int(os.environ.get('PAGE_PACK_MAX_PAGES', '8')),
+            on_page_analyzed=checkpoints.save if checkpoints is not None else None,
+            cancel_check=cancel_check
+        )
+        page_analysis_stats['resumedPages'] = resumed_pages
+        concurrency_limiter = getattr(openai_client, 'concurrency_limiter', None)
+        if concurrency_limiter is not None:
+            page_analysis_stats['concurrencyLimit'] = concurrency_limiter.limit
+        logger.info(f"Page analysis stats for job {job_id}: {page_analysis_stats}")
+        if page_cache is not None:
+            logger.info(f"Page cache stats: {page_cache.stats()}")
+        
+        complete_job(
+            clients, job_id, pages_data, document_hash, page_analysis_stats, resumed_pages, checkpoints, cancel_check
         )
         
         logger.info(f"Successfully completed job {job_id}")
+        logger.info(f"Retry stats: {retry_stats()}")
+    
+    except JobCancelledError:
+        # The API already marked the job cancelled; settle the message without retrying
+        logger.info(f"Stopped job {job_id}: cancelled")
+        checkpoints = clients.get_page_checkpoint_store(job_id)
+        if checkpoints is not None:
+            checkpoints.clear()
     
     except Exception as e:
         logger.error(f"Error processing job {job_id}: {e}", exc_info=True)
+        logger.info(f"Retry stats: {retry_stats()}")
         
-        # Update job to failed
-        update_job_status(
-            jobs_container,
-            job_id,
-            'failed',
-            error={
-                'message': str(e),
-                'timestamp': datetime.utcnow().isoformat()
-            }
-        )
+        # A failed page range is retried on its own; only the parent job or the aggregation fails the job
+        if page_range is None:
+            publish_job_failure(publisher, job_id, e)
         raise
 
 
-def update_liveness_probe():
-    """Update liveness probe file for Kubernetes"""
-    try:
-        with open('/tmp/worker_alive', 'w') as f:
-            f.write(datetime.utcnow().isoformat())
-    except Exception as e:
-        logger.warning(f"Failed to update liveness probe: {e}")
+# Service Bus lock renewal counters (renewals performed, locks lost mid-job)
+lock_renewal_stats = {'renewals': 0, 'lost': 0}
+_lock_renewal_stats_lock = threading.Lock()
+
+
+def record_lock_event(kind: str):
+    """Increment a lock renewal counter"""
+    with _lock_renewal_stats_lock:
+        lock_renewal_stats[kind] += 1
+
+
+class MessageLockRenewer:
+    """Keeps a PEEK_LOCK message locked on a background thread while its job runs"""
+    
+    def __init__(self, receiver, message, interval: float):
+        self.receiver = receiver
+        self.message = message
+        self.interval = interval
+        self.lock_lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='lock-renewer', daemon=True)
+    
+    def __enter__(self):
+        # A prefetched message has been locked since it was buffered, not since it was received;
+        # refresh the lock up front so an expired one is caught before any work is done
+        if self._renew():
+            self._thread.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        if self._thread.ident is not None:
+            self._thread.join()
+        return False
+    
+    def _renew(self) -> bool:
+        try:
+            self.receiver.renew_message_lock(self.message)
+            record_lock_event('renewals')
+            logger.debug(f"Renewed lock for message {self.message.message_id}")
+            return True
+        except Exception as e:
+            self.lock_lost = True
+            record_lock_event('lost')
+            logger.error(f"Lost lock for message {self.message.message_id}: {e}")
+            return False
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self._renew():
+                return
 
 
 def main():
     """Main worker loop"""
     logger.info("Starting document processing worker...")
+    start_health_server(health_state, int(os.environ.get('HEALTH_PORT', '8081')))
+    loop_timeout = float(os.environ.get('LIVENESS_TIMEOUT_SECONDS', '120'))
+    job_timeout = float(os.environ.get('JOB_HEARTBEAT_TIMEOUT_SECONDS', '900'))
     
     # Initialize clients
     clients = AzureClients()
+    clients.get_cosmos_container()
     
     # Get Service Bus receiver
     servicebus_client = clients.get_servicebus_client()
-    queue_name = os.environ.get('SERVICE_BUS_QUEUE_NAME', 'document-extraction')
+    health_state.set_condition('clients', None)
+    lanes = load_lanes()
+    scheduler = LaneScheduler(lanes)
+    prefetch_count = int(os.environ.get('SERVICE_BUS_PREFETCH_COUNT', '0'))
+    lock_renew_interval = float(os.environ.get('SERVICE_BUS_LOCK_RENEW_INTERVAL', '20'))
     
-    logger.info(f"Listening to queue: {queue_name}")
+    logger.info(f"Listening to lanes: {lanes} (prefetch {prefetch_count})")
     
-    with servicebus_client.get_queue_receiver(
-        queue_name=queue_name,
-        receive_mode=ServiceBusReceiveMode.PEEK_LOCK,
-        max_wait_time=30
-    ) as receiver:
+    start_metrics_server(
+        int(os.environ.get('METRICS_PORT', '9090')),
+        WorkerStatsCollector(
+            lock_stats=lambda: dict(lock_renewal_stats),
+            page_cache_stats=lambda: clients._page_cache.stats() if clients._page_cache is not None else None,
+            concurrency_limiter=lambda: getattr(clients._openai_client, 'concurrency_limiter', None),
+            lane_stats=scheduler.stats
+        )
+    )
+    
+    with contextlib.ExitStack() as stack:
+        receivers = {
+            lane.name: stack.enter_context(servicebus_client.get_queue_receiver(
+                queue_name=lane.queue_name,
+                receive_mode=ServiceBusReceiveMode.PEEK_LOCK,
+                max_wait_time=30,
+                prefetch_count=prefetch_count
+            ))
+            for lane in lanes
+        }
         
         while not shutdown_flag:
             try:
-                # Update liveness probe
-                update_liveness_probe()
+                health_state.beat('receive-loop', loop_timeout)
                 
-                # Receive messages
-                messages = receiver.receive_messages(max_message_count=1, max_wait_time=30)
+                # Receive messages from the next lane due a poll
+                lane, messages = scheduler.receive(receivers, max_message_count=1, max_wait_time=30)
                 
                 for message in messages:
+                    receiver = receivers[lane.name]
+                    record_queue_receive_latency(message, lane.name)
+                    
+                    # Keep the lock alive for as long as the job runs
+                    renewer = MessageLockRenewer(receiver, message, lock_renew_interval)
+                    JOBS_IN_FLIGHT.inc()
                     try:
                         # Parse message body
                         message_body = json.loads(str(message))
                         logger.info(f"Received message: {message_body}")
                         
-                        # Process job
-                        process_job(clients, message_body)
+                        # Process job; the job beats instead of the receive loop while it runs
+                        health_state.stop('receive-loop')
+                        health_state.set_condition('accepting', 'busy')
+                        with renewer, monitored_job(message_body, job_timeout):
+                            if not renewer.lock_lost:
+                                process_job(clients, message_body)
+                        
+                        if renewer.lock_lost:
+                            logger.warning("Message lock was lost during processing; it will be redelivered")
+                            JOBS.labels(outcome='lock_lost').inc()
+                            continue
                         
                         # Complete message
                         receiver.complete_message(message)
+                        JOBS.labels(outcome='completed').inc()
                         logger.info("Message completed successfully")
                     
                     except Exception as e:
                         logger.error(f"Error processing message: {e}", exc_info=True)
+                        JOBS.labels(outcome='failed').inc()
+                        
+                        if renewer.lock_lost:
+                            logger.warning("Message lock was lost; skipping abandon")
+                            continue
                         
                         # Abandon message (will be retried)
                         receiver.abandon_message(message)
                         logger.info("Message abandoned for retry")
+                    
+                    finally:
+                        JOBS_IN_FLIGHT.dec()
+                        health_state.beat('receive-loop', loop_timeout)
+                        if not shutdown_flag:
+                            health_state.set_condition('accepting', None)
+                        logger.info(f"Lock renewal stats: {lock_renewal_stats}")
             
             except KeyboardInterrupt:
                 logger.info("Received keyboard interrupt")
@@ -523,6 +1956,8 @@ def main():
                 logger.error(f"Error in main loop: {e}", exc_info=True)
                 time.sleep(5)  # Wait before retrying
     
+    clients.close()
+    shutdown_extraction_pool()
     logger.info("Worker shutting down gracefully")
 
 
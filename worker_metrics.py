@@ -0,0 +1,168 @@
+"""
+Prometheus metrics for the GenAI Underwriting Workbench worker (Azure version)
+Stage latency histograms and error counters for the functions in worker.py, OpenAI token
+usage, Service Bus receive latency per priority lane and in-flight jobs, plus collectors that
+export the lock renewal, page cache, retry, lane poll and adaptive concurrency counters kept
+by other modules.
+Served over HTTP by start_metrics_server on METRICS_PORT.
+"""
+
+import time
+import logging
+import functools
+from typing import Any, Callable, Dict, Optional
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY, start_http_server
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from retry_policy import retry_stats
+
+logger = logging.getLogger(__name__)
+
+# Stages range from millisecond Cosmos patches to multi-minute comprehensive analyses
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+STAGE_DURATION = Histogram(
+    'uw_worker_stage_duration_seconds',
+    'Wall time of one pipeline stage call',
+    ['stage'],
+    buckets=STAGE_BUCKETS
+)
+STAGE_ERRORS = Counter(
+    'uw_worker_stage_errors_total',
+    'Pipeline stage calls that failed',
+    ['stage']
+)
+OPENAI_TOKENS = Counter(
+    'uw_worker_openai_tokens_total',
+    'Tokens reported in Azure OpenAI usage',
+    ['stage', 'kind']
+)
+QUEUE_RECEIVE_LATENCY = Histogram(
+    'uw_worker_queue_receive_latency_seconds',
+    'Time between a message being enqueued and the worker receiving it',
+    ['lane'],
+    buckets=STAGE_BUCKETS
+)
+JOBS_IN_FLIGHT = Gauge(
+    'uw_worker_jobs_in_flight',
+    'Jobs currently being processed'
+)
+JOBS = Counter(
+    'uw_worker_jobs_total',
+    'Jobs finished, by outcome',
+    ['outcome']
+)
+
+
+def record_stage_error(stage: str):
+    """Count a failure in a stage that handles its own exceptions"""
+    STAGE_ERRORS.labels(stage=stage).inc()
+
+
+def record_token_usage(stage: str, response: Any):
+    """Add the prompt and completion tokens of a chat completion to the token counters"""
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return
+    for kind in ('prompt_tokens', 'completion_tokens'):
+        tokens = getattr(usage, kind, None)
+        if tokens:
+            OPENAI_TOKENS.labels(stage=stage, kind=kind.split('_')[0]).inc(tokens)
+
+
+def record_queue_receive_latency(message, lane: str = 'standard'):
+    """Observe how long a Service Bus message waited in its lane's queue"""
+    enqueued = getattr(message, 'enqueued_time_utc', None)
+    if enqueued is None:
+        return
+    QUEUE_RECEIVE_LATENCY.labels(lane=lane).observe(max(0.0, time.time() - enqueued.timestamp()))
+
+
+def instrumented_stage(stage: str):
+    """Decorator timing every call of a stage function and counting its errors"""
+    def decorate(func):
+        histogram = STAGE_DURATION.labels(stage=stage)
+        errors = STAGE_ERRORS.labels(stage=stage)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started)
+        return wrapper
+
+    return decorate
+
+
+class WorkerStatsCollector:
+    """Exports counters kept elsewhere in the worker at scrape time"""
+
+    def __init__(
+        self,
+        lock_stats: Callable[[], Dict[str, int]],
+        page_cache_stats: Callable[[], Optional[Dict[str, int]]],
+        concurrency_limiter: Callable[[], Any],
+        lane_stats: Optional[Callable[[], Dict[str, Dict[str, int]]]] = None
+    ):
+        self.lock_stats = lock_stats
+        self.page_cache_stats = page_cache_stats
+        self.concurrency_limiter = concurrency_limiter
+        self.lane_stats = lane_stats
+
+    def collect(self):
+        lock_stats = self.lock_stats()
+        yield CounterMetricFamily('uw_worker_lock_renewals', 'Service Bus lock renewals performed',
+                                  value=lock_stats.get('renewals', 0))
+        yield CounterMetricFamily('uw_worker_locks_lost', 'Service Bus message locks lost mid-job',
+                                  value=lock_stats.get('lost', 0))
+
+        cache_events = CounterMetricFamily('uw_worker_page_cache_events', 'Page analysis cache lookups and writes',
+                                           labels=['event'])
+        for event, count in (self.page_cache_stats() or {}).items():
+            cache_events.add_metric([event], count)
+        yield cache_events
+
+        retry_events = CounterMetricFamily('uw_worker_retry_events', 'Retry policy events per downstream',
+                                           labels=['downstream', 'event'])
+        circuit_open = GaugeMetricFamily('uw_worker_circuit_open', '1 while the downstream circuit is not closed',
+                                         labels=['downstream'])
+        for downstream, counters in retry_stats().items():
+            for event, count in counters.items():
+                if event == 'circuitState':
+                    circuit_open.add_metric([downstream], 0 if count == 'closed' else 1)
+                else:
+                    retry_events.add_metric([downstream, event], count)
+        yield retry_events
+        yield circuit_open
+
+        if self.lane_stats is not None:
+            lane_polls = CounterMetricFamily('uw_worker_lane_polls', 'Priority lane polls by outcome '
+                                             '(served, empty, promoted past its weight as overdue)',
+                                             labels=['lane', 'outcome'])
+            for lane, counters in self.lane_stats().items():
+                for outcome, count in counters.items():
+                    lane_polls.add_metric([lane, outcome], count)
+            yield lane_polls
+
+        limiter = self.concurrency_limiter()
+        if limiter is not None:
+            yield GaugeMetricFamily('uw_worker_openai_concurrency_limit', 'Adaptive limit on OpenAI calls in flight',
+                                    value=limiter.limit)
+            yield GaugeMetricFamily('uw_worker_openai_calls_in_flight', 'OpenAI calls currently in flight',
+                                    value=limiter.in_flight)
+
+
+def start_metrics_server(port: int, collector: Optional[WorkerStatsCollector] = None):
+    """Serve /metrics on port (0 disables the server)"""
+    if not port:
+        return
+    if collector is not None:
+        REGISTRY.register(collector)
+    start_http_server(port)
+    logger.info(f"Serving Prometheus metrics on port {port}")